@@ -0,0 +1,68 @@
+# bench_indicators.py
+# FeatureEngineer motorlarının ("ta" / "numpy") 10 yıllık veri üzerindeki hız karşılaştırması.
+# Panel modu için 500 sembollük evren de ölçülür.
+# Kullanım: python debug/bench_indicators.py [tekrar_sayısı] [panel_sembol_sayısı]
+
+import sys
+import os
+import time
+
+# Python path ayarı (src modülünü bulması için)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core import indicator_kernels
+from test_indicator_parity import synthetic_ohlcv
+
+
+def bench(fe: FeatureEngineer, df, repeats: int) -> float:
+    fe.create_features(df)  # Isınma (numba derlemesi / önbellek)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fe.create_features(df)
+    return (time.perf_counter() - started) / repeats
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    df = synthetic_ohlcv(2520)  # ~10 yıl işlem günü
+    print(f"Veri: {len(df)} gün, {repeats} tekrar\n")
+
+    has_numba = indicator_kernels.NUMBA_AVAILABLE
+    t_ta = bench(FeatureEngineer(engine="ta"), df, repeats)
+    print(f"ta               : {t_ta * 1000:8.2f} ms")
+
+    indicator_kernels.NUMBA_AVAILABLE = False
+    t_np = bench(FeatureEngineer(engine="numpy"), df, repeats)
+    print(f"numpy (numba yok): {t_np * 1000:8.2f} ms  ({t_ta / t_np:.1f}x)")
+
+    indicator_kernels.NUMBA_AVAILABLE = has_numba
+    if has_numba:
+        t_nb = bench(FeatureEngineer(engine="numpy"), df, repeats)
+        print(f"numpy + numba    : {t_nb * 1000:8.2f} ms  ({t_ta / t_nb:.1f}x)")
+
+    # PANEL: (sembol x gün) dizileri üzerinde tek seferde
+    n_symbols = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    fe = FeatureEngineer(engine="numpy")
+    frames = {f"S{i}": synthetic_ohlcv(2520, seed=i) for i in range(n_symbols)}
+    symbols, dates, arrays = fe.build_panel(frames)
+
+    fe.create_panel_features(symbols[:2], dates, {k: v[:2] for k, v in arrays.items()})  # Isınma
+    started = time.perf_counter()
+    panel = fe.create_panel_features(symbols, dates, arrays, output="long")
+    t_panel = time.perf_counter() - started
+    started = time.perf_counter()
+    fe.create_panel_features(symbols, dates, arrays, output="3d")
+    t_cube = time.perf_counter() - started
+
+    print(f"\nPanel ({n_symbols} sembol x {len(dates)} gün, {len(panel)} satır):")
+    print(f"  uzun biçim : {t_panel * 1000:8.1f} ms  (~{t_panel / t_ta:.1f} tekil 'ta' çağrısı, "
+          f"sembol başına {t_panel / n_symbols * 1000:.2f} ms)")
+    print(f"  3B tensör  : {t_cube * 1000:8.1f} ms")
+    print(f"  tekil 'ta' ile tahmini süre: {t_ta * n_symbols:8.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# test_cross_asset.py
+# CrossAssetFeatures'ın referans serilerini ileriye bakmadan birleştirdiğini ve
+# verisi olmayan referans/sektör üyelerinde çökmeden NaN sütun ürettiğini doğrular.
+# Kullanım: python debug/test_cross_asset.py  (ağ erişimi gerekmez)
+
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Python path ayarı (src modülünü bulması için)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from test_indicator_parity import synthetic_ohlcv
+from src.ai_core.cross_asset import CrossAssetFeatures
+from src.ai_core.data_processor import DataProcessor
+from src.ai_core.price_sources import PriceSource
+from src.infrastructure.external_services.recorded_provider import RecordedMarketDataProvider
+
+
+class _NoDatabase(PriceSource):
+    """Veritabanı olmadan çalışmak için boş kaynak."""
+
+    def load_many(self, symbols):
+        return {}
+
+
+def make_processor(frames: dict) -> DataProcessor:
+    """Sadece verilen sembolleri (kaydedilmiş yanıt olarak) bilen çevrimdışı DataProcessor."""
+    tmp = tempfile.mkdtemp(prefix="cross_asset_")
+    recordings = {s: df.set_index("Date") for s, df in frames.items()}
+    return DataProcessor(raw_data_dir=os.path.join(tmp, "raw"), store_dir=os.path.join(tmp, "store"),
+                         provider=RecordedMarketDataProvider(recordings), price_source=_NoDatabase())
+
+
+def check(name: str, ok: bool, detail: str = "") -> bool:
+    print(f"  {'✅' if ok else '❌'} {name}{': ' + detail if detail else ''}")
+    return ok
+
+
+def main():
+    end = pd.Timestamp.today().normalize()
+    stock = synthetic_ohlcv(300, seed=1)
+    stock["Date"] = pd.bdate_range(end=end, periods=300)
+    index = synthetic_ohlcv(300, seed=2)
+    index["Date"] = stock["Date"]
+
+    all_ok = True
+
+    print("--- tüm referanslar mevcut ---")
+    cross = CrossAssetFeatures(make_processor({"XU100": index, "USDTRY": index, "AAA": stock}),
+                               sectors={"banka": ["AAA", "BBB"]}, ttl=0)
+    joined = cross.join("AAA", stock)
+    expected = np.log(index["Close"] / index["Close"].shift(1)).to_numpy()
+    all_ok &= check("xu100_ret_1 endeks getirisiyle aynı",
+                    np.allclose(joined["xu100_ret_1"].to_numpy()[1:], expected[1:]))
+    all_ok &= check("sektör sepeti (BBB verisiz) AAA getirisi",
+                    np.allclose(joined["sector_ret_1"].to_numpy()[1:],
+                                np.log(stock["Close"] / stock["Close"].shift(1)).to_numpy()[1:]))
+
+    print("--- verisi olmayan referans (USDTRY) ve sektör üyeleri ---")
+    cross = CrossAssetFeatures(make_processor({"XU100": index}), sectors={"banka": ["BBB", "CCC"]}, ttl=0)
+    try:
+        joined = cross.join("BBB", stock)
+        all_ok &= check("sütunlar eksiksiz", list(joined.columns[-len(cross.columns):]) == cross.columns)
+        all_ok &= check("usdtry_* ve sector_* tamamen NaN",
+                        joined[[c for c in cross.columns if not c.startswith("xu100")]].isna().all().all())
+        all_ok &= check("xu100_ret_1 dolu", joined["xu100_ret_1"].notna().sum() == len(stock) - 1)
+    except Exception as e:
+        all_ok &= check("join", False, f"{type(e).__name__}: {e}")
+
+    print("--- hiçbir referansın verisi yok ---")
+    cross = CrossAssetFeatures(make_processor({}), sectors={}, ttl=0)
+    try:
+        joined = cross.join("AAA", stock)
+        all_ok &= check("tüm sütunlar NaN", joined[cross.columns].isna().all().all())
+    except Exception as e:
+        all_ok &= check("join", False, f"{type(e).__name__}: {e}")
+
+    print(f"\nSONUÇ: {'BAŞARILI' if all_ok else 'BAŞARISIZ'}")
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
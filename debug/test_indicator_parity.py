@@ -0,0 +1,177 @@
+# test_indicator_parity.py
+# FeatureEngineer "numpy" motorunun `ta` motoruyla aynı sütunları ürettiğini doğrular.
+# Kullanım: python debug/test_indicator_parity.py [SEMBOL ...]
+#   Sembol verilirse dataSets/store altındaki gerçek veri de karşılaştırılır.
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Python path ayarı (src modülünü bulması için)
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.incremental_features import IncrementalFeatureEngineer
+from src.ai_core.indicator_kernels import NUMBA_AVAILABLE
+from src.ai_core import indicator_kernels
+
+RTOL = 1e-9
+ATOL = 1e-8
+
+
+def synthetic_ohlcv(days: int = 2520, seed: int = 42) -> pd.DataFrame:
+    """~10 yıllık rastgele yürüyüş OHLCV verisi (düz günler ve sıfır hacim dahil)."""
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    close[days // 2:days // 2 + 5] = close[days // 2 - 1]  # Değişmeyen fiyat (RSI/CCI sınır durumları)
+    spread = np.abs(rng.normal(0, 0.01, days)) * close
+    volume = rng.integers(1e5, 5e6, days).astype(float)
+    volume[days // 3] = 0.0
+    return pd.DataFrame({
+        "Date": pd.bdate_range("2015-01-01", periods=days),
+        "Open": close * (1 + rng.normal(0, 0.005, days)),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Adj Close": close,
+        "Volume": volume,
+    })
+
+
+def compare(name: str, df: pd.DataFrame, use_lags: bool) -> bool:
+    expected = FeatureEngineer(use_lags=use_lags, engine="ta").create_features(df)
+    actual = FeatureEngineer(use_lags=use_lags, engine="numpy").create_features(df)
+
+    ok = True
+    if list(expected.columns) != list(actual.columns):
+        print(f"  ❌ {name}: sütun sırası farklı\n     ta:    {list(expected.columns)}\n     numpy: {list(actual.columns)}")
+        return False
+    if not expected.index.equals(actual.index):
+        print(f"  ❌ {name}: satırlar farklı (ta: {len(expected)}, numpy: {len(actual)})")
+        return False
+
+    for col in expected.columns:
+        if col == "Date":
+            continue
+        e = expected[col].to_numpy(dtype=np.float64)
+        a = actual[col].to_numpy(dtype=np.float64)
+        if not np.allclose(a, e, rtol=RTOL, atol=ATOL, equal_nan=True):
+            err = np.nanmax(np.abs(a - e) / np.maximum(np.abs(e), 1e-12))
+            print(f"  ❌ {name}: {col} (maks. göreli hata {err:.2e})")
+            ok = False
+
+    if ok:
+        print(f"  ✅ {name}: {len(actual.columns)} sütun, {len(actual)} satır eşleşti")
+    return ok
+
+
+def compare_incremental(name: str, df: pd.DataFrame, new_bars: int = 5) -> bool:
+    """Durum geçmişten kurulup son barlar tek tek eklendiğinde satırlar batch sonucuyla aynı olmalı."""
+    expected = FeatureEngineer(use_lags=True, engine="ta").create_features(df).tail(new_bars)
+    inc = IncrementalFeatureEngineer(use_lags=True)
+    inc.latest_row(name, df.iloc[:-new_bars])
+    rows = [inc.update(name, bar) for bar in df.iloc[-new_bars:].to_dict("records")]
+    actual = pd.concat(rows, ignore_index=True)
+
+    cols = [c for c in expected.columns if c != "Date"]
+    if list(actual.columns) != list(expected.columns) or not np.allclose(
+            actual[cols].to_numpy(dtype=np.float64), expected[cols].to_numpy(dtype=np.float64),
+            rtol=RTOL, atol=ATOL, equal_nan=True):
+        print(f"  ❌ {name} (artımlı): son {new_bars} bar eşleşmedi")
+        return False
+    print(f"  ✅ {name} (artımlı): son {new_bars} bar eşleşti")
+    return True
+
+
+def compare_panel(n_symbols: int = 6) -> bool:
+    """Panel sonucu, farklı tarihlerde listelenen her sembol için tekil create_features ile aynı olmalı."""
+    full = synthetic_ohlcv(800, seed=3)
+    frames = {f"S{i}": synthetic_ohlcv(800 - 90 * i, seed=10 + i).assign(Date=full["Date"].iloc[90 * i:].values)
+              for i in range(n_symbols)}
+
+    fe = FeatureEngineer(use_lags=True, engine="numpy")
+    symbols, dates, arrays = fe.build_panel(frames)
+    panel = fe.create_panel_features(symbols, dates, arrays, output="long")
+    cube = fe.create_panel_features(symbols, dates, arrays, output="3d")
+
+    ok = True
+    for symbol, df in frames.items():
+        expected = FeatureEngineer(use_lags=True, engine="ta").create_features(df)
+        actual = panel[panel["Symbol"] == symbol].drop(columns="Symbol")
+        cols = [c for c in expected.columns if c != "Date"]
+        if list(actual.columns) != list(expected.columns) or len(actual) != len(expected) or not np.allclose(
+                actual[cols].to_numpy(), expected[cols].to_numpy(), rtol=RTOL, atol=ATOL):
+            print(f"  ❌ panel {symbol}: tekil sonuçla eşleşmedi")
+            ok = False
+
+    valid_cells = int((~np.isnan(cube["tensor"]).any(axis=-1)).sum())
+    if valid_cells != len(panel):
+        print(f"  ❌ panel: 3B tensör ({valid_cells}) ile uzun biçim ({len(panel)}) satır sayısı farklı")
+        ok = False
+    if ok:
+        print(f"  ✅ panel: {n_symbols} sembol, {len(panel)} satır tekil sonuçlarla eşleşti")
+    return ok
+
+
+def compare_subset(name: str, df: pd.DataFrame, schema: list) -> bool:
+    """Şemadaki sütunlar tam hesaplamayla aynı olmalı; sadece ısınma kadar satır atılmalı."""
+    fe = FeatureEngineer(features=schema)
+    actual = fe.create_features(df)
+    expected = FeatureEngineer(use_lags=True, engine="ta").create_features(df)
+
+    cols = [c for c in schema if c in actual.columns]
+    common = actual.index.intersection(expected.index)
+    dropped = len(df) - len(actual)
+    if set(actual.columns) != set(df.columns) | set(schema) or dropped != fe.min_history() - 1 \
+            or not np.allclose(actual.loc[common, cols].to_numpy(dtype=np.float64),
+                               expected.loc[common, cols].to_numpy(dtype=np.float64), rtol=RTOL, atol=ATOL):
+        print(f"  ❌ {name} {schema}: atılan {dropped} satır (beklenen {fe.min_history() - 1})")
+        return False
+    print(f"  ✅ {name} {schema}: {len(actual)} satır (min. geçmiş {fe.min_history()})")
+    return True
+
+
+def main():
+    datasets = {"sentetik_10y": synthetic_ohlcv(), "kisa_60g": synthetic_ohlcv(60, seed=7)}
+
+    for symbol in sys.argv[1:]:
+        from src.ai_core.price_store import PriceStore
+        df = PriceStore(os.path.join(project_root, "dataSets", "store")).read(symbol)
+        if df is None:
+            print(f"⚠️ {symbol} depoda bulunamadı, atlanıyor.")
+            continue
+        datasets[symbol] = df
+
+    modes = [False, True] if NUMBA_AVAILABLE else [False]
+    all_ok = True
+    for use_numba in modes:
+        # Motor seçimini modül düzeyinde zorla (numba'lı / numba'sız yol)
+        indicator_kernels.NUMBA_AVAILABLE = use_numba
+        print(f"--- numba {'açık' if use_numba else 'kapalı'} ---")
+        for name, df in datasets.items():
+            for use_lags in (True, False):
+                all_ok &= compare(f"{name} (lags={use_lags})", df, use_lags)
+    indicator_kernels.NUMBA_AVAILABLE = NUMBA_AVAILABLE
+
+    print("--- panel ---")
+    for use_numba in modes:
+        indicator_kernels.NUMBA_AVAILABLE = use_numba
+        all_ok &= compare_panel()
+    indicator_kernels.NUMBA_AVAILABLE = NUMBA_AVAILABLE
+
+    print("--- özellik alt kümesi ---")
+    for schema in (["Open", "Volume", "rsi", "macd_diff"], ["atr", "lag_close_1", "pct_change"], ["cci", "vwap", "lag_rsi_1"]):
+        all_ok &= compare_subset("sentetik_10y", datasets["sentetik_10y"], schema)
+
+    print("--- artımlı (IncrementalFeatureEngineer) ---")
+    for name, df in datasets.items():
+        all_ok &= compare_incremental(name, df)
+
+    print("\nSONUÇ:", "BAŞARILI" if all_ok else "BAŞARISIZ")
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
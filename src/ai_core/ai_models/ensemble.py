@@ -46,4 +46,33 @@ class EnsembleModel:
             if signal == "AL": signal = "RİSKLİ AL"
             elif signal == "SAT": signal = "RİSKLİ SAT"
             
-        return signal, change_pct
\ No newline at end of file
+        return signal, change_pct
+
+    def combine_many(self, predictions: dict) -> np.ndarray:
+        """
+        `combine_predictions`'ın vektör hali: {"xgboost": dizi, "prophet": dizi}
+        -> sembol başına birleşik tahmin dizisi.
+        """
+        arrays = {name: np.asarray(values, dtype=np.float64) for name, values in predictions.items()}
+        weighted = [(arrays[name], w) for name, w in self.weights.items() if name in arrays]
+        total_weight = sum(w for _, w in weighted)
+        if total_weight == 0:
+            return np.mean(list(arrays.values()), axis=0)
+        return sum(values * w for values, w in weighted) / total_weight
+
+    def generate_signals(self, current_prices, predicted_prices, volatilities):
+        """
+        `generate_signal`'ın vektör hali (aynı eşikler).
+        Returns:
+            (sinyal dizisi, değişim yüzdesi dizisi)
+        """
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        change_pct = (np.asarray(predicted_prices, dtype=np.float64) - current_prices) / current_prices * 100
+        risky = np.asarray(volatilities, dtype=np.float64) > 2.5
+
+        signals = np.select(
+            [(change_pct > 1.5) & risky, change_pct > 1.5, (change_pct < -1.5) & risky, change_pct < -1.5],
+            ["RİSKLİ AL", "AL", "RİSKLİ SAT", "SAT"],
+            default="TUT"
+        ).astype(object)
+        return signals, change_pct
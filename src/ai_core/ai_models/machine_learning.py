@@ -1,33 +1,55 @@
 import pandas as pd
 import numpy as np
 import joblib
+import xgboost
 from xgboost import XGBRegressor
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import TimeSeriesSplit, RandomizedSearchCV
 from src.ai_core.base import BaseModel
+from src.ai_core.feature_engineering import feature_matrix
+from src.core.config import settings
 
 class XGBoostModel(BaseModel):
     """
     Extreme Gradient Boosting Regressor.
     Yapılandırılmış (Tabular) verilerde ve zaman serilerinde SOTA (State-of-the-Art) performans gösterir.
     """
-    def __init__(self, model_name: str = "XGBoost", params=None, optimize=False):
+    def __init__(self, model_name: str = "XGBoost", params=None, optimize=False, compact: bool = None,
+                 n_jobs: int = None):
+        """
+        Args:
+            compact (bool): Özellikler DataFrame yerine sütun sıralı float32 ndarray olarak
+                verilir (ara kopya yok). None -> settings.FEATURE_COMPACT.
+            n_jobs (int): XGBoost (ve hiperparametre aramasının) kullanacağı iş parçacığı
+                sayısı. None -> tüm çekirdekler; paralel eğitimde süreç başına pay verilir.
+        """
         super().__init__(model_name, params)
         self.optimize = optimize
-        self.model = XGBRegressor(objective='reg:squarederror')
-        
-    def train(self, data: pd.DataFrame, target_col: str) -> None:
-        # Tarih sütunu varsa indexe al veya düşür (ML tarih string'i anlamaz)
-        if 'Date' in data.columns:
-            data = data.set_index('Date')
+        self.compact = settings.FEATURE_COMPACT if compact is None else compact
+        self.n_jobs = n_jobs
+        self.model = XGBRegressor(objective='reg:squarederror', n_jobs=n_jobs)
         
+    def train(self, data: pd.DataFrame, target_col: str, features: list = None) -> None:
+        """
+        Args:
+            features: Özellik olarak kullanılacak sütunlar (ör. etiket sütunları eklenmiş
+                ortak bir matriste). None -> hedef ve Date dışındaki tüm sütunlar.
+        """
         # Özellikler (X) ve Hedef (y) ayrımı
         # Hedef bugünün kapanışı, özellikler dünün verileri olmalı (Shift edilmiş veriler FeatureEngineer'dan gelir)
         # FeatureEngineer zaten lag verilerini eklediği için direkt kullanabiliriz.
         # Ancak target_col (Close) özellik olarak GİRMEMELİ, çünkü o tahmin edilecek şey.
-        
-        X = data.drop(columns=[target_col], errors='ignore')
-        y = data[target_col]
+        if self.compact:
+            # Tarih (ML tarih string'i anlamaz) ve hedef dışındaki sütunlar tek bir float32 matrise yazılır
+            columns = features or [col for col in data.columns if col not in (target_col, 'Date')]
+            X = feature_matrix(data, columns)
+            y = data[target_col].to_numpy(dtype=np.float32)
+        else:
+            # Tarih sütunu varsa indexe al veya düşür (ML tarih string'i anlamaz)
+            if 'Date' in data.columns:
+                data = data.set_index('Date')
+            X = data[features] if features else data.drop(columns=[target_col], errors='ignore')
+            y = data[target_col]
         
         if self.optimize:
             self._optimize_hyperparameters(X, y)
@@ -36,7 +58,54 @@ class XGBoostModel(BaseModel):
             if self.params:
                 self.model.set_params(**self.params)
             self.model.fit(X, y)
+
+        if self.compact:
+            # ndarray'de isim yoktur; şema (feature_schema) booster'a yazılır ve modelle kaydedilir
+            self.model.get_booster().feature_names = columns
             
+    def update(self, data: pd.DataFrame, target_col: str, num_boost_round: int = 10,
+               refresh_leaf: bool = False) -> None:
+        """
+        Kayıtlı booster'dan devam ederek günceller (günlük yeni barlar için sıfırdan
+        eğitim yapılmaz).
+
+        Args:
+            data: Yeni satırları içeren son pencere; özellikler modelin şemasından seçilir.
+            num_boost_round: Mevcut ağaçların üzerine eklenecek boosting turu.
+            refresh_leaf: True ise ağaç eklenmez; mevcut ağaçların yaprak değerleri ve
+                düğüm istatistikleri verilen satırlarla yeniden hesaplanır (yapı korunur).
+                Hiç satır düşmeyen yapraklar sıfırlanacağından kısa bir pencere değil,
+                tüm geçmiş (yeni satırlar dahil) verilmelidir; tek geçiştir, bölme aranmaz.
+
+        Her çağrı `incremental_rounds` sayacını bir artırır (booster'da saklanır, modelle
+        kaydedilir); `train` ile tam yeniden eğitimde sayaç sıfırlanır.
+        """
+        if 'Date' in data.columns:
+            data = data.set_index('Date')
+        schema = self.feature_schema
+        X = feature_matrix(data, schema) if self.compact else data[schema]
+        dtrain = xgboost.DMatrix(X, label=data[target_col].to_numpy(dtype=np.float32), feature_names=schema)
+
+        booster = self.model.get_booster()
+        params = {key: value for key, value in self.model.get_xgb_params().items() if value is not None}
+        if refresh_leaf:
+            # Güncelleme modunda tur sayısı mevcut ağaç sayısıdır (her ağaç bir kez yenilenir)
+            params.update(process_type='update', updater='refresh', refresh_leaf=True)
+            num_boost_round = booster.num_boosted_rounds()
+
+        booster = xgboost.train(params, dtrain, num_boost_round=num_boost_round, xgb_model=booster)
+        booster.set_attr(incremental_rounds=str(self.incremental_rounds + 1))
+        # Sklearn sarmalayıcısı (parametreler, feature_names_in_) korunarak yeni booster yüklenir
+        self.model.load_model(bytearray(booster.save_raw('ubj')))
+
+    @property
+    def incremental_rounds(self) -> int:
+        """Son tam eğitimden bu yana yapılan `update` sayısı."""
+        try:
+            return int(self.model.get_booster().attr('incremental_rounds') or 0)
+        except Exception:  # Eğitilmemiş model
+            return 0
+
     def _optimize_hyperparameters(self, X, y):
         """
         Zaman serisine uygun Cross-Validation ile en iyi parametreleri bulur.
@@ -51,6 +120,11 @@ class XGBoostModel(BaseModel):
         
         # TimeSeriesSplit veriyi karıştırmaz, sırayla böler (Çok Önemli!)
         tscv = TimeSeriesSplit(n_splits=3)
+
+        # İş parçacığı bütçesi verilmişse paralellik adaylar arasında kullanılır
+        # (aday başına tek iş parçacığı; n_jobs x n_jobs aşırı abonelik olmaz)
+        if self.n_jobs:
+            self.model.set_params(n_jobs=1)
         
         search = RandomizedSearchCV(
             estimator=self.model,
@@ -59,10 +133,11 @@ class XGBoostModel(BaseModel):
             scoring='neg_mean_squared_error',
             cv=tscv,
             verbose=1,
-            n_jobs=-1
+            n_jobs=self.n_jobs or -1
         )
         search.fit(X, y)
         self.model = search.best_estimator_
+        self.model.set_params(n_jobs=self.n_jobs)
         print(f"XGBoost Optimized Params: {search.best_params_}")
 
     def predict(self, data: pd.DataFrame, steps: int = 1) -> pd.DataFrame:
@@ -70,20 +145,41 @@ class XGBoostModel(BaseModel):
         ML modelleri iteratif tahmin (Recursive Forecasting) yapar.
         T+1'i tahmin eder, onu veri setine ekler, T+2'yi tahmin eder...
         """
-        # Veri hazırlığı
-        if 'Date' in data.columns:
-            data = data.set_index('Date')
-            
-        # Sadece son satırı alıp tahmin döngüsüne gireceğiz
+        # Sadece son satırı alıp tahmin döngüsüne gireceğiz (tüm matris kopyalanmaz)
         # NOT: Gerçek recursive tahmin için feature'ları yeniden hesaplamak gerekir.
         # Basitlik ve hız için burada sadece T+1 (Yarın) tahmini döndürüyoruz.
         # Eğer steps > 1 ise daha karmaşık bir feature update döngüsü gerekir.
-        
-        latest_features = data.drop(columns=['Close'], errors='ignore').iloc[[-1]] # Son satır (DataFrame olarak)
+        latest = data.iloc[[-1]]
+        if 'Date' in latest.columns:
+            latest = latest.set_index('Date')
+
+        # Eğitimdeki sütunlar (ve sıraları) seçilir; fazladan hesaplanmış sütunlar modele girmez
+        schema = self.feature_schema
+        if self.compact:
+            latest_features = feature_matrix(latest, schema)
+        else:
+            latest_features = latest[schema] if schema else latest.drop(columns=['Close'], errors='ignore')
         
         prediction = self.model.predict(latest_features)
         
-        return pd.DataFrame({'predicted_price': prediction}, index=[data.index[-1] + pd.Timedelta(days=1)])
+        return pd.DataFrame({'predicted_price': prediction}, index=[latest.index[-1] + pd.Timedelta(days=1)])
+
+    def predict_batch(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Her satır için tek adımlık tahmin; tüm satırlar tek bir matris çağrısıyla
+        tahmin edilir (ör. birçok sembolün son satırları alt alta).
+        """
+        schema = self.feature_schema
+        if self.compact:
+            X = feature_matrix(data, schema)
+        else:
+            X = data[schema] if schema else data.drop(columns=['Close', 'Date'], errors='ignore')
+        return self.model.predict(X)
+
+    @property
+    def feature_schema(self) -> list:
+        """Modelin eğitildiği özellik sütunları (sırasıyla); eğitilmemişse boş liste."""
+        return list(getattr(self.model, 'feature_names_in_', []))
 
     def save(self, path: str) -> None:
         joblib.dump(self.model, path)
@@ -97,9 +193,9 @@ class RandomForestModel(BaseModel):
     Random Forest Regressor.
     Overfit olmaya karşı daha dirençlidir ve gürültülü verilerde stabil çalışır.
     """
-    def __init__(self, model_name: str = "RandomForest", params=None):
+    def __init__(self, model_name: str = "RandomForest", params=None, n_jobs: int = -1):
         super().__init__(model_name, params)
-        self.model = RandomForestRegressor(n_jobs=-1)
+        self.model = RandomForestRegressor(n_jobs=n_jobs)
 
     def train(self, data: pd.DataFrame, target_col: str) -> None:
         if 'Date' in data.columns:
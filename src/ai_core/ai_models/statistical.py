@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import joblib
 from prophet import Prophet
+from prophet.make_holidays import make_holidays_df
 from arch import arch_model
 from src.ai_core.base import BaseModel
 import warnings
@@ -14,11 +15,20 @@ class ProphetModel(BaseModel):
     Facebook Prophet tabanlı Zaman Serisi Modeli.
     Trend ve Mevsimsellik (Haftalık/Yıllık) yakalamada çok iyidir.
     """
+    COUNTRY = 'TR'
+    _holidays = {}  # (ülke, ilk yıl, son yıl) -> tatil çerçevesi; süreçteki tüm modeller paylaşır
+
     def __init__(self, model_name: str = "Prophet", params=None):
         super().__init__(model_name, params)
         self.model = None
 
-    def train(self, data: pd.DataFrame, target_col: str = 'Close') -> None:
+    def train(self, data: pd.DataFrame, target_col: str = 'Close', warm_start: "ProphetModel" = None) -> None:
+        """
+        Args:
+            warm_start: Önceki fit (ör. kayıttaki sürüm). Stan optimizasyonu onun
+                parametrelerinden başlar; boyutu değişen parametreler (ör. yeni tatil)
+                Prophet'in varsayılan başlangıcına döner.
+        """
         # Prophet 'ds' (Tarih) ve 'y' (Hedef) sütun isimlerini zorunlu kılar
         df_prophet = data.copy()
         
@@ -37,31 +47,53 @@ class ProphetModel(BaseModel):
         # Tarih formatını garantiye al
         df_prophet['ds'] = pd.to_datetime(df_prophet['ds'], dayfirst=True)
 
-        # Modeli başlat ve eğit
+        # Modeli başlat ve eğit (Türkiye tatilleri önbellekteki çerçeveden; her fit'te yeniden üretilmez)
         self.model = Prophet(
             daily_seasonality=True, 
             yearly_seasonality=True,
             weekly_seasonality=True,
-            changepoint_prior_scale=self.params.get('changepoint_prior_scale', 0.05)
+            changepoint_prior_scale=self.params.get('changepoint_prior_scale', 0.05),
+            holidays=self.holidays_frame(df_prophet['ds'])
         )
-        self.model.add_country_holidays(country_name='TR') # Türkiye tatillerini ekle
-        self.model.fit(df_prophet)
+        init = warm_start.stan_init() if warm_start is not None and warm_start.model is not None else None
+        self.model.fit(df_prophet, **({'init': init} if init else {}))
 
     def predict(self, data: pd.DataFrame = None, steps: int = 1) -> pd.DataFrame:
         """
         Prophet, tahmin için 'data'ya ihtiyaç duymaz, kendi takvimini oluşturur.
-        Ancak interface uyumu için data parametresi tutulmuştur.
+        'data' verilirse tahmin, eğitimin değil verinin son tarihinden sonraki günler içindir
+        (model eğitimden sonra yeni barlar geldiyse).
         """
         if self.model is None:
             raise Exception("Model eğitilmeden tahmin yapılamaz.")
-            
-        future = self.model.make_future_dataframe(periods=steps)
+
+        # Sadece gelecek tarihler tahmin edilir (tüm geçmiş yeniden hesaplanıp kırpılmaz)
+        if data is None:
+            future = self.model.make_future_dataframe(periods=steps, include_history=False)
+        else:
+            last_date = pd.to_datetime(data['Date'] if 'Date' in data.columns else data.index, dayfirst=True).max()
+            future = pd.DataFrame({'ds': pd.date_range(last_date + pd.Timedelta(days=1), periods=steps, freq='D')})
         forecast = self.model.predict(future)
         
-        # Sadece geleceği ve önemli sütunları döndür
-        result = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(steps)
+        # Önemli sütunları döndür
+        result = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
         return result
 
+    def stan_init(self) -> dict:
+        """Fit parametreleri, bir sonraki fit'in başlangıç noktası olarak (Prophet `init` biçimi)."""
+        params = self.model.params
+        init = {name: float(params[name][0][0]) for name in ('k', 'm', 'sigma_obs')}
+        init.update({name: params[name][0] for name in ('delta', 'beta')})
+        return init
+
+    @classmethod
+    def holidays_frame(cls, dates: pd.Series) -> pd.DataFrame:
+        """Verinin yılları (ve tahmin için sonraki yıl) için tatil çerçevesi; yıl aralığı başına bir kez üretilir."""
+        key = (cls.COUNTRY, int(dates.min().year), int(dates.max().year) + 1)
+        if key not in cls._holidays:
+            cls._holidays[key] = make_holidays_df(year_list=list(range(key[1], key[2] + 1)), country=cls.COUNTRY)
+        return cls._holidays[key]
+
     def save(self, path: str) -> None:
         # Prophet modeli pickle/joblib ile serileştirilebilir
         joblib.dump(self.model, path)
@@ -91,6 +123,18 @@ class GarchModel(BaseModel):
         self.model = arch_model(returns, vol='Garch', p=p, q=q, dist='Normal')
         self.res = self.model.fit(disp='off')
 
+    def update(self, data: pd.DataFrame, target_col: str = 'Close') -> None:
+        """
+        Parametreler korunur (optimizasyon yapılmaz); koşullu varyans yeni getirilerle
+        yeniden hesaplanır, böylece volatilite tahmini son bara kadar ilerler.
+        """
+        if self.res is None:
+            raise Exception("Model eğitilmeden güncellenemez.")
+        returns = 100 * data[target_col].pct_change().dropna()
+        volatility = self.res.model.volatility
+        self.model = arch_model(returns, vol='Garch', p=volatility.p, q=volatility.q, dist='Normal')
+        self.res = self.model.fix(self.res.params)
+
     def predict(self, data: pd.DataFrame = None, steps: int = 1) -> pd.DataFrame:
         if self.res is None:
             raise Exception("Model eğitilmeden tahmin yapılamaz.")
@@ -104,6 +148,38 @@ class GarchModel(BaseModel):
         dates = pd.date_range(start=pd.Timestamp.now(), periods=steps, freq='B')
         return pd.DataFrame({'predicted_volatility': volatility}, index=dates)
 
+    @staticmethod
+    def one_step_volatility(models: list) -> np.ndarray:
+        """
+        Birden çok modelin T+1 volatilitesini tek bir vektör işlemiyle hesaplar
+        (model başına forecast nesnesi kurulmaz):
+
+            sigma2[T+1] = omega + sum(alpha_i * eps[T+1-i]^2) + sum(beta_j * sigma2[T+1-j])
+
+        Not: arch'ın forecast'ı varyans yolunu baştan (yeniden hesaplanan başlangıç
+        değeriyle) kurar; fit'teki koşullu volatiliteyi kullanan bu sonuç
+        `predict(steps=1)` ile ~1e-5 göreli farkla aynıdır.
+        """
+        if not models:
+            return np.empty(0)
+        orders = [(m.res.model.volatility.p, m.res.model.volatility.q) for m in models]
+        width = 1 + max(p for p, _ in orders) + max(q for _, q in orders)
+        max_p = max(p for p, _ in orders)
+
+        # Satır başına [omega, alpha..., beta...] katsayıları ve [1, eps^2..., sigma2...] durumu (eksik gecikmeler 0)
+        coef = np.zeros((len(models), width))
+        state = np.zeros((len(models), width))
+        for i, (model, (p, q)) in enumerate(zip(models, orders)):
+            params = model.res.params
+            resid = model.res.resid.to_numpy()
+            cond_vol = model.res.conditional_volatility.to_numpy()
+            coef[i, 0], state[i, 0] = params['omega'], 1.0
+            coef[i, 1:1 + p] = [params[f'alpha[{k}]'] for k in range(1, p + 1)]
+            state[i, 1:1 + p] = resid[:-p - 1:-1] ** 2
+            coef[i, 1 + max_p:1 + max_p + q] = [params[f'beta[{k}]'] for k in range(1, q + 1)]
+            state[i, 1 + max_p:1 + max_p + q] = cond_vol[:-q - 1:-1] ** 2
+        return np.sqrt(np.einsum('ij,ij->i', coef, state))
+
     def save(self, path: str) -> None:
         # GARCH sonucunu kaydetmek biraz tricklidir, joblib iş görür
         joblib.dump(self.res, path)
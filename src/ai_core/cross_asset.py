@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from src.core.config import settings
+
+
+class CrossAssetFeatures:
+    """
+    Sembolün kendi OHLCV'si dışındaki referans serilerden (BIST100 endeksi, USD/TRY
+    kuru, sektör sepeti) özellik üretir ve sembolün takvimine "as-of" birleştirir:
+    her gün için o gün veya öncesindeki son referans değeri kullanılır (ileriye bakış yok).
+
+    Referans serileri bir kez yüklenir (DataProcessor.load_many; depo ve önbellek
+    üzerinden) ve `ttl` saniye boyunca tüm semboller arasında paylaşılır. Aynı
+    takvime (tarih dizisine) sahip semboller için hizalanmış tablo da yeniden
+    kullanılır; toplu eğitimde endeks her sembol için tekrar indirilmez/hizalanmaz.
+
+    Üretilen sütunlar: `<ad>_ret_1` ve `<ad>_ret_5` (1 ve 5 günlük log getiri).
+    Referansın eksik olduğu günler NaN kalır (XGBoost eksik değerleri doğal olarak işler).
+    """
+    RETURN_WINDOWS = (1, 5)
+
+    def __init__(self, processor, references: Dict[str, str] = None, sectors: Dict[str, List[str]] = None,
+                 tolerance_days: int = 7, ttl: float = None):
+        """
+        Args:
+            processor: Referans serilerini yükleyecek DataProcessor.
+            references: {özellik adı: sembol}; varsayılan BIST100 (XU100) ve USD/TRY.
+            sectors: {sektör adı: [üye semboller]}; verilmezse settings.SECTOR_BASKETS_PATH
+                (JSON) okunur. Sektör sepeti üyelerin (sembolün kendisi dahil) günlük log
+                getirilerinin eşit ağırlıklı ortalamasıdır.
+            tolerance_days: As-of birleştirmede kabul edilen en eski referans değeri (gün).
+            ttl: Yüklenen referansların yeniden kontrol edilmeden kullanılacağı süre (saniye).
+        """
+        self.processor = processor
+        self.references = references or {"xu100": "XU100", "usdtry": "USDTRY"}
+        self.sectors = self._load_sectors() if sectors is None else sectors
+        self.tolerance = pd.Timedelta(days=tolerance_days)
+        self.ttl = settings.CROSS_ASSET_TTL if ttl is None else ttl
+
+        self._sector_of = {member: name for name, members in self.sectors.items() for member in members}
+        self._table = None        # Date + tüm referans özellikleri (tarihe göre sıralı)
+        self._loaded_at = None
+        self._aligned = OrderedDict()  # takvim özeti -> hizalanmış özellikler
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self) -> List[str]:
+        """Eklenen sütunlar (sabit sıra; referans yüklenemese de şema değişmez)."""
+        names = list(self.references) + (["sector"] if self.sectors else [])
+        return [f"{name}_ret_{window}" for name in names for window in self.RETURN_WINDOWS]
+
+    def signature(self) -> dict:
+        """Üretilen sütunları belirleyen ayar (model kaydındaki uyumluluk kontrolü için)."""
+        return {"references": dict(self.references), "sector": bool(self.sectors)}
+
+    def preload(self) -> None:
+        """Referans serilerini (gerekirse) yükler; toplu işlerden önce bir kez çağrılabilir."""
+        self._reference_table()
+
+    def join(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        `df`'e (Date sütunu veya index'i olan) referans özelliklerini ekler.
+        Sektör sütunları sadece sembolün kendi sektörü için dolar.
+        """
+        dates = pd.DatetimeIndex(df['Date'] if 'Date' in df.columns else df.index)
+        aligned = self._align(dates)
+
+        result = df.copy()
+        for col in self.columns:
+            if col.startswith("sector_"):
+                sector = self._sector_of.get(symbol)
+                values = aligned.get(f"{sector}_{col}") if sector else None
+            else:
+                values = aligned.get(col)
+            result[col] = values if values is not None else np.nan
+        return result
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._table = None
+            self._aligned.clear()
+
+    def _align(self, dates: pd.DatetimeIndex) -> Dict[str, np.ndarray]:
+        """Referans tablosunu verilen takvime as-of hizalar (aynı takvim için önbellekten)."""
+        table = self._reference_table()
+        key = hashlib.sha1(dates.asi8.tobytes()).hexdigest()
+        with self._lock:
+            if key in self._aligned:
+                self._aligned.move_to_end(key)
+                return self._aligned[key]
+
+        left = pd.DataFrame({'Date': dates.values.astype('datetime64[ns]'), '_pos': np.arange(len(dates))})
+        merged = pd.merge_asof(left.sort_values('Date'), table, on='Date',
+                               direction='backward', tolerance=self.tolerance).sort_values('_pos')
+        aligned = {col: merged[col].to_numpy() for col in table.columns if col != 'Date'}
+
+        with self._lock:
+            self._aligned[key] = aligned
+            while len(self._aligned) > 16:
+                self._aligned.popitem(last=False)
+        return aligned
+
+    def _reference_table(self) -> pd.DataFrame:
+        with self._lock:
+            if self._table is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._table
+
+        members = sorted({m for names in self.sectors.values() for m in names})
+        try:
+            # Verisi olmayan semboller (ulaşılamayan kur, işlemden kalkan üye) sonuçta yer almaz
+            frames = self.processor.load_many(sorted(set(self.references.values())) + members)
+        except Exception as e:
+            print(f"⚠️ Referans serileri yüklenemedi: {e}. Çapraz varlık özellikleri NaN kalacak.")
+            frames = {}
+
+        returns = {}
+        for name, symbol in self.references.items():
+            returns[name] = self._log_returns(frames.get(symbol))
+        for sector, names in self.sectors.items():
+            member_returns = [r for r in (self._log_returns(frames.get(m)) for m in names) if r is not None]
+            if member_returns:
+                # Eşit ağırlıklı sepet: o gün işlem gören üyelerin ortalama getirisi
+                returns[f"{sector}_sector"] = pd.concat(member_returns, axis=1).mean(axis=1)
+
+        columns = {}
+        for name, ret in returns.items():
+            if ret is None:
+                continue
+            for window in self.RETURN_WINDOWS:
+                columns[f"{name}_ret_{window}"] = ret.rolling(window).sum() if window > 1 else ret
+
+        table = pd.DataFrame(columns).sort_index() if columns else pd.DataFrame(index=pd.DatetimeIndex([]))
+        table = table.rename_axis('Date').reset_index()
+        table['Date'] = table['Date'].astype('datetime64[ns]')
+
+        with self._lock:
+            self._table = table
+            self._loaded_at = time.monotonic()
+            self._aligned.clear()
+        return table
+
+    @staticmethod
+    def _log_returns(df: pd.DataFrame):
+        if df is None or df.empty or 'Date' not in df.columns or 'Close' not in df.columns:
+            return None
+        close = df.set_index('Date')['Close'].astype(np.float64)
+        close = close[~close.index.duplicated(keep='last')].sort_index()
+        return np.log(close / close.shift(1)).dropna()
+
+    @staticmethod
+    def _load_sectors() -> Dict[str, List[str]]:
+        path = settings.SECTOR_BASKETS_PATH
+        if not path or not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
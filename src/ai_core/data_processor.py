@@ -1,150 +1,333 @@
 import pandas as pd
 import numpy as np
 import os
-import yfinance as yf
+from collections import defaultdict
 from datetime import datetime, timedelta
+from src.ai_core.frame_cache import FrameCache, invalidate_frame_caches
+from src.ai_core.price_sources import PriceSource, DatabasePriceSource
+from src.ai_core.price_store import PriceStore
+from src.core.config import settings
+from src.core.trading_calendar import bist_calendar
+from src.infrastructure.external_services.market_data_provider import MarketDataProvider
 
 class DataProcessor:
     """
     Veri yükleme, temizleme, güncelleme ve ön işleme sınıfı.
     Otomatik olarak Yahoo Finance üzerinden eksik verileri tamamlar.
+    Öncelikli kaynak veritabanıdır (price_history, MarketService tarafından doldurulur);
+    veritabanındaki geçmiş kısaysa kolon bazlı depoyla (Parquet) birleştirilir, orada
+    bulunmayan semboller için depo ve CSV yedek olarak kullanılır.
     """
-    def __init__(self, raw_data_dir="dataSets/raw"):
+    REQUIRED_COLS = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+    def __init__(self, raw_data_dir="dataSets/raw", store_dir="dataSets/store", provider=None,
+                 price_source: PriceSource = None, frame_cache: FrameCache = None):
         self.raw_data_dir = raw_data_dir
         os.makedirs(raw_data_dir, exist_ok=True)
+        self.store = PriceStore(store_dir)
+        # Test/çevrimdışı kullanım için kayıtlı yanıt sağlayıcı verilebilir
+        self.provider = provider or MarketDataProvider()
+        self.calendar = bist_calendar
+        # Birincil veri kaynağı; None ise sadece yerel depo + Yahoo kullanılır
+        if price_source is None and settings.AI_PRICE_SOURCE == "db":
+            price_source = DatabasePriceSource()
+        self.price_source = price_source
+        # Temizlenmiş verilerin (sembol, veri sürümü) anahtarlı LRU önbelleği
+        self.frame_cache = frame_cache or FrameCache(
+            max_entries=settings.FRAME_CACHE_MAX_ENTRIES,
+            max_bytes=settings.FRAME_CACHE_MAX_MB * 1024 * 1024,
+            version_ttl=settings.FRAME_CACHE_VERSION_TTL
+        )
+
+    def load_data(self, symbol: str, fresh: bool = False) -> pd.DataFrame:
+        """
+        Belirtilen sembolün verisini yükler.
+        Veritabanı ve yerel depodan okur, eskiyse Yahoo Finance'den günceller.
+
+        Args:
+            fresh: True ise önbellek kaydı sürümü yeniden sorgulanmadan (TTL içinde bile)
+                kullanılmaz; yeni barlara göre iş yapan çağıranlar (eğitim, güncelleme) içindir.
+        """
+        # 0. ÖNBELLEK (Veri değişmediyse tekrar okuma/temizleme yapılmaz)
+        cached, versions = self._get_cached([symbol], fresh)
+        if symbol in cached:
+            return cached[symbol]
 
-    def load_data(self, symbol: str) -> pd.DataFrame:
-        """
-        Belirtilen sembolün verisini yükler. 
-        Eğer veri eskiyse Yahoo Finance'den günceller.
-        """
-        file_path = os.path.join(self.raw_data_dir, f"{symbol}.csv")
-        df = None
-        
-        # 1. MEVCUT DOSYAYI OKU (VARSA)
-        if os.path.exists(file_path):
-            try:
-                # DÜZELTME 1: encoding='utf-8-sig' (Türkçe karakterler için)
-                df = pd.read_csv(file_path, encoding='utf-8-sig')
-                
-                # Sütun isimlerini İngilizce/Standart formata çevir
-                column_map = {
-                    'Tarih': 'Date', 'Açılış': 'Open', 'Yüksek': 'High', 
-                    'Düşük': 'Low', 'Kapanış': 'Close', 'Hacim': 'Volume',
-                    'Düzeltilmiş_Kapanış': 'Adj Close'
-                }
-                df.rename(columns=column_map, inplace=True)
-                
-                # Tarih formatını düzelt
-                if 'Date' in df.columns:
-                    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
-                    df.sort_values('Date', inplace=True)
-            except Exception as e:
-                print(f"⚠️ CSV okuma hatası: {e}. Dosya yeniden oluşturulacak.")
-                df = None
+        # 1. MEVCUT VERİYİ OKU (Birincil kaynak/veritabanı + yerel depo)
+        df = self._combine_with_local(symbol, self._load_from_source([symbol]).get(symbol))
 
         # 2. GÜNCELLEME KONTROLÜ
         # Eğer df yoksa veya son tarih eskiyse güncelle
-        df = self._update_with_live_data(symbol, df, file_path)
-        
+        df = self._update_with_live_data(symbol, df)
+
         # 3. SON TEMİZLİK
+        df = self._remember({symbol: self._clean(df)}, versions)[symbol]
+        if df.empty:
+            raise ValueError(f"{symbol} için veri bulunamadı (veritabanı, yerel depo ve sağlayıcı boş).")
+        return df
+
+    def load_many(self, symbols: list, fresh: bool = False) -> dict:
+        """
+        Birden fazla sembolü yükler. Veritabanındaki semboller tek sorguyla okunur
+        ve gerekirse yerel depoyla birleştirilir; güncellenmesi gerekenler ihtiyaç
+        duydukları başlangıç tarihine göre gruplanır ve her grup tek bir
+        çoklu-hisse isteğiyle indirilir.
+
+        Args:
+            fresh: Bkz. `load_data`.
+        Returns:
+            dict: {sembol: temizlenmiş DataFrame}; hiçbir kaynakta verisi bulunamayan
+            semboller sonuçta yer almaz (toplu yükleme tek sembol yüzünden kesilmez).
+        """
+        cached, versions = self._get_cached(symbols, fresh)
+        pending = [symbol for symbol in symbols if symbol not in cached]
+
+        from_source = self._load_from_source(pending)
+        local = {symbol: self._combine_with_local(symbol, from_source.get(symbol)) for symbol in pending}
+
+        # Aynı tarihten itibaren veri isteyen sembolleri grupla
+        groups = defaultdict(list)
+        for symbol, df in local.items():
+            start_date = self._required_start(df)
+            if start_date is not None:
+                groups[start_date.date()].append(symbol)
+
+        end_date = (datetime.now() + timedelta(days=1)).date()
+        for start_date, group in groups.items():
+            print(f"🌍 {len(group)} sembol için toplu veri indiriliyor ({start_date} - Bugün)...")
+            frames = self.provider.get_history_many(group, start=start_date, end=end_date)
+            for symbol in group:
+                local[symbol] = self._merge_new_bars(symbol, local[symbol], frames.get(symbol))
+
+        loaded = self._remember({symbol: self._clean(local[symbol]) for symbol in pending}, versions)
+        frames = {symbol: cached[symbol] if symbol in cached else loaded[symbol] for symbol in symbols}
+        return {symbol: df for symbol, df in frames.items() if not df.empty}
+
+    def export_csv(self, symbol: str, csv_path: str = None) -> str:
+        """
+        Depodaki veriyi Türkçe başlıklı CSV olarak dışa aktarır.
+        """
+        csv_path = csv_path or os.path.join(self.raw_data_dir, f"{symbol}.csv")
+        self.store.export_csv(symbol, csv_path)
+        return csv_path
+
+    def cache_stats(self) -> dict:
+        """Temizlenmiş veri önbelleğinin isabet istatistikleri."""
+        return self.frame_cache.stats()
+
+    def _data_versions(self, symbols: list) -> dict:
+        """
+        Sembollerin veri sürüm damgaları: veritabanı damgası ve yerel depo dosyalarının
+        mtime/boyutları (veri ikisinin birleşimi olabilir). Verisi olmayan semboller yer almaz.
+        """
+        versions = {}
+        if self.price_source is not None:
+            versions = {s: ("db",) + tuple(v) for s, v in self.price_source.versions(symbols).items()}
+
+        for symbol in symbols:
+            stamp = self.store.version(symbol)
+            if stamp:
+                versions[symbol] = versions.get(symbol, ()) + ("file",) + stamp
+        return versions
+
+    def _get_cached(self, symbols: list, fresh: bool = False):
+        """
+        Önbellekte güncel sürümü bulunan ve son tamamlanan seansı içeren sembollerin
+        temizlenmiş verisini döner. Seansı eksik bir kayıt, sürümü değişmemiş olsa da
+        kullanılmaz (canlı veriyle tamamlanmak üzere yeniden yüklenir).
+
+        Returns:
+            (bulunanlar, sürümler): sürümler, bulunamayan sembollerin yüklemeden ÖNCE
+            okunan damgalarıdır; `_remember` bunlarla kaydeder (yükleme sırasında gelen
+            bir yazım bir sonraki çağrıda fark edilir).
+        """
+        found = {}
+        if not fresh:
+            for symbol in symbols:
+                df = self.frame_cache.get_recent(symbol)
+                if df is not None and self._is_current(df):
+                    found[symbol] = df
+
+        pending = [symbol for symbol in symbols if symbol not in found]
+        versions = self._data_versions(pending) if pending else {}
+        for symbol in pending:
+            df = self.frame_cache.get(symbol, versions.get(symbol))
+            if df is not None and self._is_current(df):
+                found[symbol] = df
+        return found, {symbol: version for symbol, version in versions.items() if symbol not in found}
+
+    def _is_current(self, df: pd.DataFrame) -> bool:
+        return not df.empty and self.calendar.is_up_to_date(df['Date'].iloc[-1])
+
+    def _remember(self, frames: dict, versions: dict) -> dict:
+        """Yeni yüklenen verileri yüklemeden önce okunan sürüm damgalarıyla önbelleğe koyar."""
+        for symbol, df in frames.items():
+            if not df.empty and versions.get(symbol) is not None:
+                self.frame_cache.put(symbol, versions[symbol], df)
+        return frames
+
+    def _load_from_source(self, symbols: list) -> dict:
+        """Birincil kaynaktaki (boş olmayan) verileri döner."""
+        if self.price_source is None:
+            return {}
+        frames = self.price_source.load_many(symbols)
+        return {s: df for s, df in frames.items() if df is not None and not df.empty}
+
+    def _combine_with_local(self, symbol: str, source_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Birincil kaynaktaki veriyi yerel depoyla birleştirir.
+        Kaynak, depodaki geçmişin başından son tamamlanan seansa kadar uzanıyorsa tek
+        başına kullanılır. Değilse (MarketService yalnızca 2 yıl doldurur, yeni
+        sembollerde birkaç satır olabilir) çakışan günlerde kaynak esas alınarak depoyla
+        birleştirilir ve depodaki son tarihten sonraki kaynak barları depoya eklenir;
+        kalan eksik günleri canlı güncelleme tamamlar.
+        """
+        local_df = self._read_local(symbol)
+        if source_df is None:
+            return local_df
+
+        if local_df is None or local_df.empty:
+            return source_df
+        if (self.calendar.is_up_to_date(source_df['Date'].iloc[-1])
+                and source_df['Date'].iloc[0] <= local_df['Date'].iloc[0]):
+            return source_df
+
+        newer = source_df[source_df['Date'] > local_df['Date'].iloc[-1]]
+        if not newer.empty:
+            self.store.append(symbol, newer)
+            invalidate_frame_caches([symbol])
+
+        older = local_df[~local_df['Date'].isin(source_df['Date'])]
+        combined = pd.concat([older, source_df], ignore_index=True)
+        return combined.sort_values('Date', ignore_index=True)
+
+    def _read_local(self, symbol: str) -> pd.DataFrame:
+        """Depodaki veriyi okur; depoda yoksa eski CSV'yi bir kereye mahsus içe aktarır."""
+        try:
+            df = self.store.read(symbol)
+
+            csv_path = os.path.join(self.raw_data_dir, f"{symbol}.csv")
+            if df is None and os.path.exists(csv_path):
+                print(f"📦 {symbol} CSV verisi kolon bazlı depoya aktarılıyor...")
+                df = self.store.import_csv(symbol, csv_path)
+            return df
+        except Exception as e:
+            print(f"⚠️ Veri okuma hatası: {e}. Veri yeniden oluşturulacak.")
+            return None
+
+    def _clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Veri yoksa (veya Date sütunu yoksa) boş ama tipli bir çerçeve döner
+        if df is None or df.empty or 'Date' not in df.columns:
+            return self._empty_frame()
+
         # Düzeltilmiş kapanış yoksa Close'u kopyala (Garanti olsun)
         if 'Adj Close' not in df.columns and 'Close' in df.columns:
              df['Adj Close'] = df['Close']
 
+        # Kaynaktan bağımsız olarak aynı sütun sırası (model öznitelik sırası buna bağlı)
+        if all(c in df.columns for c in self.REQUIRED_COLS):
+            df = df[self.REQUIRED_COLS + [c for c in df.columns if c not in self.REQUIRED_COLS]]
+
         df.fillna(method='ffill', inplace=True)
         df.dropna(inplace=True)
         df.sort_values('Date', inplace=True)
         df.reset_index(drop=True, inplace=True)
-        
+
         return df
 
-    def _update_with_live_data(self, symbol: str, df: pd.DataFrame, file_path: str) -> pd.DataFrame:
-        """
-        Yahoo Finance API kullanarak eksik günleri tamamlar ve CSV'yi günceller.
-        """
+    def _empty_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame({col: pd.Series(dtype='float64') for col in self.REQUIRED_COLS})
+        frame['Date'] = frame['Date'].astype('datetime64[ns]')
+        return frame
+
+    def _required_start(self, df: pd.DataFrame):
+        """Verinin güncellenmesi gerekiyorsa indirmenin başlayacağı tarihi, gerekmiyorsa None döner."""
         today = datetime.now()
-        
-        # BIST hisseleri için .IS uzantısı ekle
-        yf_symbol = f"{symbol}.IS" if not symbol.endswith(".IS") else symbol
-        
-        start_date = None
-        
-        # Başlangıç tarihini belirle
+
         if df is not None and not df.empty:
             last_date = df['Date'].iloc[-1]
-            if last_date.date() < today.date():
-                start_date = last_date + timedelta(days=1)
-            else:
-                return df
-        else:
-            # Dosya yoksa son 10 yılı çek
-            start_date = today - timedelta(days=365*10)
+            # Hafta sonu, resmi tatil veya seans kapanmadan önce yeni bar yoktur
+            if self.calendar.is_up_to_date(last_date):
+                return None
+            return last_date + timedelta(days=1)
+
+        # Dosya yoksa son 10 yılı çek
+        return today - timedelta(days=365*10)
+
+    def _update_with_live_data(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Yahoo Finance API kullanarak eksik günleri tamamlar ve depoyu günceller.
+        """
+        start_date = self._required_start(df)
+        if start_date is None:
+            return df
 
         print(f"🌍 {symbol} için güncel veriler indiriliyor ({start_date.date()} - Bugün)...")
-        
+
+        end_date = (datetime.now() + timedelta(days=1)).date()
+        new_data = self.provider.get_history(symbol, start=start_date.date(), end=end_date)
+        return self._merge_new_bars(symbol, df, new_data)
+
+    def _merge_new_bars(self, symbol: str, df: pd.DataFrame, new_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sağlayıcıdan gelen yeni barları standart formata getirir, depoya ekler
+        ve mevcut veriyle birleştirilmiş halini döndürür.
+        """
         try:
-            # Yahoo Finance'den çek
-            new_data = yf.download(
-                yf_symbol, 
-                start=start_date, 
-                end=today + timedelta(days=1),
-                progress=False
-            )
-            
-            if new_data.empty:
+            if new_data is None or new_data.empty:
                 print(f"⚠️ {symbol} için yeni veri bulunamadı. Mevcut veriyle devam ediliyor.")
                 return df if df is not None else pd.DataFrame()
 
-            new_data.reset_index(inplace=True)
-            
-            # DÜZELTME 2: 'Adj Close' EKLENDİ
-            required_cols = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
-            
+            if 'Date' not in new_data.columns:
+                new_data = new_data.rename_axis('Date').reset_index()
+
             # Sütun isimleri bazen ('Close', 'ASELS.IS') gibi tuple gelir, düzelt:
             if isinstance(new_data.columns, pd.MultiIndex):
                 # Sütun isimlerini düzleştir
                 new_data.columns = [col[0] if isinstance(col, tuple) else col for col in new_data.columns]
-            
+
             # Sadece ihtiyacımız olan sütunları al (Eğer Adj Close gelmezse hata vermesin diye intersection yapıyoruz)
-            available_cols = list(set(required_cols) & set(new_data.columns))
-            new_data = new_data[available_cols]
+            available_cols = [c for c in self.REQUIRED_COLS if c in new_data.columns]
+            new_data = new_data[available_cols].copy()
+            if 'Adj Close' not in new_data.columns:
+                new_data['Adj Close'] = new_data['Close']
+
+            # Sağlayıcı saat dilimli tarih döndürebilir; depo saf (naive) tarih tutar
+            dates = pd.to_datetime(new_data['Date'])
+            if dates.dt.tz is not None:
+                dates = dates.dt.tz_localize(None)
+            new_data['Date'] = dates.dt.normalize()
+
+            # Seansı kapanmamış günün barı (kısmi kapanış) depoya yazılmaz; yazılsaydı
+            # veri güncel sayılır ve kapanıştan sonra o bar hiç düzeltilmezdi
+            new_data = new_data[new_data['Date'] <= pd.Timestamp(self.calendar.last_completed_session())]
+            if new_data.empty:
+                return df if df is not None else pd.DataFrame()
+
+            # Sadece gerçekten yeni olan barları tut (Mevcut geçmişe dokunulmaz)
+            if df is not None and not df.empty:
+                new_data = new_data[new_data['Date'] > df['Date'].iloc[-1]]
+                if new_data.empty:
+                    return df
+
+            # YENİ BARLARI DEPOYA EKLE (APPEND-ONLY)
+            # Tüm geçmiş yeniden yazılmaz; yeni barlar küçük bir ek parça olarak saklanır.
+            self.store.append(symbol, new_data)
+            invalidate_frame_caches([symbol])
 
-            # Birleştirme (Concat)
             if df is not None:
-                # Sütun uyumsuzluğunu önlemek için
-                # Eski veride Adj Close yoksa NaN ile oluştur
+                # Eski veride Adj Close yoksa Close ile oluştur
                 if 'Adj Close' not in df.columns:
-                    df['Adj Close'] = df['Close'] 
-                
+                    df['Adj Close'] = df['Close']
+
                 updated_df = pd.concat([df, new_data], ignore_index=True)
             else:
                 updated_df = new_data
 
-            # Tekrar eden tarihleri temizle
-            updated_df.drop_duplicates(subset=['Date'], keep='last', inplace=True)
-            
-            # 4. GÜNCEL VERİYİ CSV OLARAK KAYDET (CACHE)
-            save_df = updated_df.copy()
-            
-            # Tarihi string formata çevir
-            save_df['Date'] = save_df['Date'].dt.strftime('%d/%m/%Y')
-            
-            # Türkçe başlıklarla kaydet
-            reverse_map = {
-                'Date': 'Tarih', 'Open': 'Açılış', 'High': 'Yüksek', 
-                'Low': 'Düşük', 'Close': 'Kapanış', 'Volume': 'Hacim',
-                'Adj Close': 'Düzeltilmiş_Kapanış' # <-- Burası artık çalışacak
-            }
-            save_df.rename(columns=reverse_map, inplace=True)
-            
-            # DÜZELTME 3: encoding='utf-8-sig' (Excel/Windows uyumluluğu için BOM ekler)
-            save_df.to_csv(file_path, index=False, encoding='utf-8-sig')
-            
             print(f"✅ {symbol} verileri güncellendi ve kaydedildi.")
-            
+
             return updated_df
 
         except Exception as e:
             print(f"❌ Veri güncelleme hatası: {e}")
-            return df if df is not None else pd.DataFrame()
\ No newline at end of file
+            return df if df is not None else pd.DataFrame()
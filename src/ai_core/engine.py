@@ -1,65 +1,189 @@
 import pandas as pd
+import numpy as np
+import copy
 import os
+import time
+from collections import defaultdict
 from src.ai_core.data_processor import DataProcessor
-from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.feature_engineering import FeatureEngineer, feature_matrix
+from src.ai_core.feature_cache import FeatureCache, StaleFeaturesError
+from src.ai_core.cross_asset import CrossAssetFeatures
+from src.ai_core.labels import LabelGenerator
 from src.ai_core.ai_models.statistical import ProphetModel, GarchModel
 from src.ai_core.ai_models.machine_learning import XGBoostModel
 from src.ai_core.ai_models.ensemble import EnsembleModel
-from src.ai_core.explainability.shap_explainer import ModelExplainer
+from src.ai_core.model_registry import ModelRegistry, ModelBundle, ModelNotFoundError
+from src.core.config import settings
 
 class AIEngine:
-    def __init__(self,models_dir="models"):
+    def __init__(self,models_dir="models", price_source=None, feature_columns=None, cross_asset: bool = None,
+                 horizons=None, n_jobs: int = None):
+        """
+        Args:
+            feature_columns (list): Modellerin eğitileceği özellik alt kümesi
+                (FeatureEngineer `features`); None -> tüm özellikler.
+            cross_asset (bool): BIST100 / USDTRY / sektör sepeti özellikleri eklensin mi.
+                None -> settings.CROSS_ASSET_FEATURES.
+            horizons (tuple): Getiri modellerinin ufukları (bar); None -> settings.AI_HORIZONS.
+            n_jobs (int): Eğitimde XGBoost'un kullanacağı iş parçacığı sayısı; None -> tüm
+                çekirdekler (paralel eğitimde TrainingOrchestrator süreç başına payı verir).
+        """
         self.models_dir = models_dir
+        self.n_jobs = n_jobs
  
         os.makedirs(self.models_dir, exist_ok=True)
         
         # Alt Modüller
-        self.processor = DataProcessor()
-        self.fe = FeatureEngineer(use_lags=True)
+        self.processor = DataProcessor(price_source=price_source)
+        self.fe = FeatureEngineer(use_lags=True, features=feature_columns)
+        # Eğitim, tahmin ve XAI aynı özellik matrisini kullanır; yeni barlarda
+        # sadece eklenen satırlar (artımlı indikatör durumuyla) hesaplanır
+        self.features = FeatureCache(self.fe, cache_dir=os.path.join(models_dir, "feature_cache"))
+        self._schema_features = {}
+        # Referans serileri bir kez yüklenir ve bu motorla işlenen tüm sembollerde paylaşılır
+        if cross_asset is None:
+            cross_asset = settings.CROSS_ASSET_FEATURES
+        self.cross_asset = CrossAssetFeatures(self.processor) if cross_asset else None
         self.ensemble = EnsembleModel(weights={"xgboost": 0.6, "prophet": 0.4})
         
-        # Modeller
-        self.xgb = XGBoostModel()
-        self.prophet = ProphetModel()
-        self.garch = GarchModel()
-        self.explainer = None
+        # Modeller sembol bazında sürümlü kayıtta tutulur; soğuk süreçte de
+        # tahmin yeniden eğitim yapmadan kayıttan (tembel) yüklenir
+        self.registry = ModelRegistry(os.path.join(models_dir, "registry"), cross_asset=self._cross_asset_signature())
+        # Ufuk modelleri (T+h log getiri); hepsi aynı özellik matrisiyle eğitilir
+        horizons = settings.AI_HORIZONS if horizons is None else horizons
+        self.labels = LabelGenerator(horizons) if horizons else None
 
     def train_full_pipeline(self, symbol: str):
         print(f"🚀 {symbol} için Eğitim Başlıyor...")
         
-        # 1. Veri Yükle
-        df = self.processor.load_data(symbol)
+        # 1. Veri Yükle (önbellek sürümü doğrulanır; yeni barlar kaçırılmaz)
+        df = self.processor.load_data(symbol, fresh=True)
         
         # 2. Feature Engineering
-        df_ml = self.fe.create_features(df)
+        df_ml = self._with_cross_asset(symbol, self.features.get_features(symbol, df))
         
-        # 3. Eğitim
+        # 3. Eğitim (her sembolün kendi model örnekleri)
         print("   -> Modeller eğitiliyor...")
-        self.xgb.train(df_ml, target_col='Close')
-        self.prophet.train(df, target_col='Close') # Ham veri
-        self.garch.train(df, target_col='Close')   # Ham veri
+        xgb, prophet, garch = XGBoostModel(n_jobs=self.n_jobs), ProphetModel(), GarchModel()
+        xgb.train(df_ml, target_col='Close')
+        # Ham veri; önceki sürüm varsa Stan onun parametrelerinden başlar (warm-start)
+        prophet.train(df, target_col='Close', warm_start=self._previous_prophet(symbol))
+        garch.train(df, target_col='Close')   # Ham veri
+        horizon_models = self._train_horizon_models(df, df_ml)
         
-        # 4. XAI Hazırlığı (Son 200 gün referans)
-        X_train = df_ml.drop(columns=['Close', 'Date'], errors='ignore')
-        self.explainer = ModelExplainer(self.xgb.model, X_train.tail(200))
+        # 4. XAI Hazırlığı (Son 200 gün referans; sadece bu satırlar kopyalanır)
+        background, schema = self._model_inputs(xgb, df_ml.tail(200))
         
-        # 5. Kaydet
-        self.xgb.save(f"{self.models_dir}/{symbol}_xgb.pkl")
-        self.prophet.save(f"{self.models_dir}/{symbol}_prophet.pkl")
-        print("✅ Eğitim tamamlandı.")
+        # 5. Kaydet (yeni sürüm; tahminler bir sonraki istekte bunu kullanır)
+        bundle = ModelBundle.from_models(
+            symbol, xgb, prophet, garch, background={"X": background, "feature_names": schema},
+            feature_config=self.fe.config_key(), horizon_models=horizon_models, data_end=df['Date'].iloc[-1],
+            cross_asset=self._cross_asset_signature()
+        )
+        version = self.registry.save(bundle)
+        print(f"✅ Eğitim tamamlandı (sürüm v{version}).")
+        return bundle
+
+    def update_models(self, symbols: list = None, refresh_leaf: bool = False) -> dict:
+        """
+        Kayıtlı modelleri yeni barlarla günceller (günlük bakım; sıfırdan eğitim yok).
+
+        - XGBoost ve ufuk modelleri son `XGB_UPDATE_WINDOW` satırda kaldıkları yerden
+          boosting'e devam eder (refresh_leaf=True: ağaç eklenmez, mevcut ağaçların
+          yaprakları tüm geçmişle tek geçişte yenilenir).
+        - GARCH parametreleri korunur, volatilite durumu yeni getirilerle ilerletilir.
+        - Prophet bir sonraki tam eğitime kadar aynı kalır (dosyası yeni sürüme kopyalanır;
+          tahmini yine verinin son barından sonraki gün içindir).
+        Artımlı güncelleme sayısı `XGB_REFIT_AFTER`'a ulaşan, kaydı olmayan veya eğitim
+        bitiş tarihi bilinmeyen semboller tam olarak yeniden eğitilir.
+
+        Args:
+            symbols: Güncellenecek semboller; None -> kayıttaki tüm semboller.
+        Returns:
+            dict: updated / refit / current (yeni bar yok) listeleri, failed {sembol: hata}
+            (verisi bulunamayan/yüklenemeyen semboller dahil), elapsed.
+        """
+        started = time.perf_counter()
+        symbols = list(dict.fromkeys(symbols)) if symbols is not None else self.registry.symbols()
+        summary = {"updated": [], "refit": [], "current": [], "failed": {}}
+        try:
+            frames, load_error = self.processor.load_many(symbols, fresh=True), None
+        except Exception as e:
+            # Toplu yükleme çökerse de özet sembol bazında hata olarak döner
+            frames, load_error = {}, f"Veri yüklenemedi: {e}"
+
+        for symbol in symbols:
+            try:
+                df = frames.get(symbol)
+                if df is None:
+                    raise ValueError(load_error or f"{symbol} için veri bulunamadı.")
+                try:
+                    bundle = self.registry.load(symbol)
+                except ModelNotFoundError:
+                    bundle = None
+                data_end = bundle.manifest.get("data_end") if bundle else None
+
+                if data_end is None or bundle.xgb.incremental_rounds >= settings.XGB_REFIT_AFTER:
+                    self.train_full_pipeline(symbol)
+                    summary["refit"].append(symbol)
+                elif df['Date'].iloc[-1] <= pd.Timestamp(data_end):
+                    summary["current"].append(symbol)
+                else:
+                    self.registry.save(self._update_bundle(bundle, df, refresh_leaf))
+                    summary["updated"].append(symbol)
+            except Exception as e:
+                summary["failed"][symbol] = str(e)
+
+        summary["elapsed"] = time.perf_counter() - started
+        print(f"✅ Güncelleme: {len(summary['updated'])} artımlı, {len(summary['refit'])} tam eğitim, "
+              f"{len(summary['current'])} güncel, {len(summary['failed'])} hata ({summary['elapsed']:.1f} sn)")
+        return summary
+
+    def _update_bundle(self, bundle: ModelBundle, df: pd.DataFrame, refresh_leaf: bool) -> ModelBundle:
+        """Yayındaki sürüm değiştirilmez: modellerin kopyaları güncellenip yeni sürüm olarak döner."""
+        symbol = bundle.symbol
+        df_ml = self._with_cross_asset(symbol, self._features_for(bundle.feature_schema).get_features(symbol, df))
+        # Yaprak yenileme tüm geçmişi ister (pencere dışındaki yapraklar sıfırlanmasın)
+        window = df_ml if refresh_leaf else df_ml.tail(settings.XGB_UPDATE_WINDOW)
+        options = {"num_boost_round": settings.XGB_UPDATE_ROUNDS, "refresh_leaf": refresh_leaf}
+
+        xgb = copy.deepcopy(bundle.xgb)
+        xgb.update(window, target_col='Close', **options)
+
+        horizon_models = {}
+        if bundle.horizon_models:
+            # Ufuk etiketleri sadece geleceği bilinen satırlarda vardır (son h satır NaN)
+            frame = window.join(LabelGenerator(bundle.horizon_models).generate(df), how='inner')
+            for h, model in bundle.horizon_models.items():
+                target = f"target_return_{h}"
+                horizon_models[h] = copy.deepcopy(model)
+                horizon_models[h].update(frame.dropna(subset=[target]), target_col=target, **options)
+
+        garch = copy.deepcopy(bundle.garch)
+        garch.update(df, target_col='Close')
+
+        background, schema = self._model_inputs(xgb, df_ml.tail(200))
+        components = {"xgb": xgb, "garch": garch, "background": {"X": background, "feature_names": schema}}
+        components.update({f"xgb_h{h}": model for h, model in horizon_models.items()})
+        return bundle.updated(components, data_end=str(df['Date'].iloc[-1]))
 
     def predict_next_day(self, symbol: str):
         """
         Canlı/Güncel tahmin üretir.
         """
-        # 1. Güncel veriyi yükle (Normalde canlı API'den gelir, şimdilik CSV)
+        # 0. Modeller (kayıtta yoksa ModelNotFoundError -> önce eğitim gerekir)
+        bundle = self.registry.load(symbol)
+
+        # 1. Güncel veriyi yükle (Veritabanından, yoksa yerel depodan)
         df = self.processor.load_data(symbol)
-        df_ml = self.fe.create_features(df)
+        # Sadece son günün ve modelin şemasındaki özellikler gerekir:
+        # önbellekteki matris yeni barlarla uzatılır (son bar için satır yoksa StaleFeaturesError)
+        latest = self._with_cross_asset(symbol, self._features_for(bundle.feature_schema).get_latest(symbol, df))
         
         # 2. Tahminler
-        price_xgb = self.xgb.predict(df_ml).iloc[0]['predicted_price']
-        price_pro = self.prophet.predict(steps=1).iloc[0]['yhat']
-        volatility = self.garch.predict(steps=1).iloc[0]['predicted_volatility']
+        price_xgb = bundle.xgb.predict(latest).iloc[0]['predicted_price']
+        price_pro = bundle.prophet.predict(df, steps=1).iloc[0]['yhat']
+        volatility = bundle.garch.predict(steps=1).iloc[0]['predicted_volatility']
         
         # 3. Ensemble (Birleştirme)
         preds = {"xgboost": price_xgb, "prophet": price_pro}
@@ -70,8 +194,17 @@ class AIEngine:
         signal, change_pct = self.ensemble.generate_signal(current_price, final_price, volatility)
         
         # XAI
-        latest_features = df_ml.drop(columns=['Close', 'Date'], errors='ignore').iloc[[-1]]
-        explanations = self.explainer.explain_prediction(latest_features)
+        latest_features, _ = self._model_inputs(bundle.xgb, latest)
+        explanations = bundle.explainer.explain_prediction(latest_features)
+
+        # Ufuk tahminleri (modeller log getiri tahmin eder)
+        horizons = {}
+        for h, model in bundle.horizon_models.items():
+            expected_return = float(model.predict(latest).iloc[0]['predicted_price'])
+            horizons[h] = {
+                "predicted_price": float(current_price * np.exp(expected_return)),
+                "change_pct": float(np.expm1(expected_return) * 100)
+            }
         
         return {
             "symbol": symbol,
@@ -80,5 +213,157 @@ class AIEngine:
             "change_pct": change_pct,
             "volatility": volatility,
             "signal": signal,
-            "reasons": explanations['reasons']
-        }
\ No newline at end of file
+            "reasons": explanations['reasons'],
+            "horizons": horizons
+        }
+
+    def predict_many(self, symbols: list) -> pd.DataFrame:
+        """
+        İzleme listesinin tamamı için T+1 tahmini. Veri tek `load_many` çağrısıyla
+        yüklenir; aynı modeli paylaşan sembollerin son satırları tek matris çağrısıyla
+        tahmin edilir; GARCH volatiliteleri ve sinyaller dizi üzerinde hesaplanır.
+        SHAP açıklamaları üretilmez (gerekirse `predict_next_day`).
+
+        Returns:
+            DataFrame (index: sembol): current_price, predicted_price, change_pct, volatility,
+            signal, xgboost, prophet ve her ufuk için predicted_price_h / change_pct_h.
+            attrs['timings']: aşama süreleri (saniye); attrs['missing']: kayıtlı modeli veya verisi
+            olmayan (tahmin edilmeyen) semboller;
+            attrs['stale']: son barı için özellik satırı üretilemeyen (tahmin edilmeyen) semboller.
+        """
+        timings = {}
+        started = stage = time.perf_counter()
+
+        def lap(name):
+            nonlocal stage
+            now = time.perf_counter()
+            timings[name] = now - stage
+            stage = now
+
+        # 1. Modeller (kayıttan; sıcak olanlar diskten okunmaz)
+        bundles, missing = {}, []
+        for symbol in dict.fromkeys(symbols):
+            try:
+                bundles[symbol] = self.registry.load(symbol)
+            except ModelNotFoundError:
+                missing.append(symbol)
+        symbols = list(bundles)
+        lap("models")
+
+        # 2. Veri (tek toplu yükleme) ve her sembolün son özellik satırı
+        frames = self.processor.load_many(symbols)
+        missing += [symbol for symbol in symbols if symbol not in frames]
+        symbols = [symbol for symbol in symbols if symbol in frames]
+        lap("data")
+        latest, stale = {}, []
+        for symbol in symbols:
+            try:
+                row = self._features_for(bundles[symbol].feature_schema).get_latest(symbol, frames[symbol])
+            except StaleFeaturesError:
+                stale.append(symbol)
+                continue
+            latest[symbol] = self._with_cross_asset(symbol, row)
+        symbols = list(latest)
+        lap("features")
+
+        # 3. Tahminler
+        price_xgb = self._batch_predict({s: bundles[s].xgb for s in symbols}, latest)
+        horizon_returns = {}
+        for h in sorted({h for bundle in bundles.values() for h in bundle.manifest.get("horizons", [])}):
+            models = {s: bundles[s].horizon_models[h] for s in symbols if h in bundles[s].manifest.get("horizons", [])}
+            horizon_returns[h] = self._batch_predict(models, latest)
+        lap("xgboost")
+        price_pro = np.array([bundles[s].prophet.predict(frames[s], steps=1).iloc[0]['yhat'] for s in symbols],
+                             dtype=np.float64)
+        lap("prophet")
+        volatility = GarchModel.one_step_volatility([bundles[s].garch for s in symbols])
+        lap("garch")
+
+        # 4. Ensemble ve sinyaller (vektörel)
+        current = np.array([frames[s]['Close'].iloc[-1] for s in symbols], dtype=np.float64)
+        xgb_values = np.array([price_xgb[s] for s in symbols], dtype=np.float64)
+        final = self.ensemble.combine_many({"xgboost": xgb_values, "prophet": price_pro})
+        signals, change_pct = self.ensemble.generate_signals(current, final, volatility)
+
+        result = pd.DataFrame({
+            "current_price": current,
+            "predicted_price": final,
+            "change_pct": change_pct,
+            "volatility": volatility,
+            "signal": signals,
+            "xgboost": xgb_values,
+            "prophet": price_pro,
+        }, index=pd.Index(symbols, name="symbol"))
+        for h, returns in horizon_returns.items():
+            expected = np.array([returns.get(s, np.nan) for s in symbols], dtype=np.float64)
+            result[f"predicted_price_{h}"] = current * np.exp(expected)
+            result[f"change_pct_{h}"] = np.expm1(expected) * 100
+        lap("ensemble")
+
+        timings["total"] = time.perf_counter() - started
+        result.attrs["timings"] = timings
+        result.attrs["missing"] = missing
+        result.attrs["stale"] = stale
+        return result
+
+    @staticmethod
+    def _batch_predict(models: dict, rows: dict) -> dict:
+        """{sembol: model} ve {sembol: son satır} -> {sembol: tahmin}; aynı model örneğini
+        paylaşan semboller tek `predict_batch` çağrısında tahmin edilir."""
+        groups = defaultdict(list)
+        for symbol, model in models.items():
+            groups[id(model)].append(symbol)
+
+        predictions = {}
+        for group in groups.values():
+            values = models[group[0]].predict_batch(pd.concat([rows[s] for s in group]))
+            predictions.update(zip(group, values.astype(np.float64)))
+        return predictions
+
+    def _previous_prophet(self, symbol: str):
+        """Kayıttaki son sürümün Prophet modeli (warm-start için); yoksa None."""
+        try:
+            return self.registry.load(symbol).prophet
+        except (ModelNotFoundError, OSError):
+            return None
+
+    def _train_horizon_models(self, df: pd.DataFrame, df_ml: pd.DataFrame) -> dict:
+        """Etiketler tek geçişte üretilir; her ufuk modeli aynı özellik matrisini kullanır."""
+        if self.labels is None:
+            return {}
+        features = [col for col in df_ml.columns if col != 'Date']  # Close da (bugünkü fiyat) özelliktir
+        frame = df_ml.join(self.labels.generate(df), how='inner')
+        models = {}
+        for h in self.labels.horizons:
+            target = f"target_return_{h}"
+            models[h] = XGBoostModel(n_jobs=self.n_jobs)
+            models[h].train(frame.dropna(subset=[target]), target_col=target, features=features)
+        return models
+
+    @staticmethod
+    def _model_inputs(xgb: XGBoostModel, data: pd.DataFrame):
+        """XGB şemasındaki sütunlar: kompakt modda float32 ndarray, değilse DataFrame."""
+        schema = xgb.feature_schema
+        if xgb.compact:
+            return feature_matrix(data, schema), schema
+        return data[schema], schema
+
+    def _cross_asset_signature(self):
+        return self.cross_asset.signature() if self.cross_asset else None
+
+    def _with_cross_asset(self, symbol: str, df_ml: pd.DataFrame) -> pd.DataFrame:
+        if self.cross_asset is None:
+            return df_ml
+        return self.cross_asset.join(symbol, df_ml)
+
+    def _features_for(self, feature_schema: list) -> FeatureCache:
+        """Modelin eğitildiği şemadaki özellikleri (ve bağımlılıklarını) hesaplayan önbellek."""
+        external = set(self.cross_asset.columns) if self.cross_asset else set()
+        schema = [col for col in feature_schema if col not in external]
+        fe = FeatureEngineer(features=schema or None)
+        if fe.config_key() == self.fe.config_key():
+            return self.features
+        key = fe.config_key()
+        if key not in self._schema_features:
+            self._schema_features[key] = FeatureCache(fe, cache_dir=os.path.join(self.models_dir, "feature_cache"))
+        return self._schema_features[key]
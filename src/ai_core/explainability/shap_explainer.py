@@ -9,22 +9,26 @@ class ModelExplainer:
     Modelin tahminlerinin nedenlerini açıklayan (XAI) modül.
     SHAP (SHapley Additive exPlanations) kullanır.
     """
-    def __init__(self, model, X_train: pd.DataFrame):
+    def __init__(self, model, X_train, feature_names: list = None):
         """
         Args:
             model: Eğitilmiş sklearn/xgboost modeli.
-            X_train: Modelin eğitildiği veri seti (SHAP referans alacak).
+            X_train: Modelin eğitildiği veri seti (SHAP referans alacak). DataFrame veya
+                sütunları `feature_names` sırasında olan ndarray (kompakt mod, kopya oluşmaz).
+            feature_names: ndarray girdilerde sütun isimleri (DataFrame'de sütunlardan alınır).
         """
         self.model = model
         self.X_train = X_train
+        self.feature_names = list(X_train.columns) if isinstance(X_train, pd.DataFrame) else list(feature_names)
         
         # TreeExplainer, Ağaç tabanlı modeller (XGB, RF) için çok hızlıdır.
         # check_additivity=False, bazen hassasiyet hatalarını görmezden gelir.
         self.explainer = shap.TreeExplainer(model)
 
-    def explain_prediction(self, X_latest: pd.DataFrame, top_n: int = 3) -> dict:
+    def explain_prediction(self, X_latest, top_n: int = 3) -> dict:
         """
         Son yapılan tahminin en etkili sebeplerini döndürür.
+        X_latest: DataFrame veya `feature_names` sırasında ndarray.
         """
         # SHAP değerlerini hesapla
         shap_values = self.explainer.shap_values(X_latest)
@@ -39,12 +43,17 @@ class ModelExplainer:
         else:
             shap_vals = shap_values
 
-        feature_names = X_latest.columns
+        if isinstance(X_latest, pd.DataFrame):
+            feature_names = X_latest.columns
+            latest_values = X_latest.iloc[-1]
+        else:
+            feature_names = self.feature_names
+            latest_values = np.atleast_2d(X_latest)[-1]
         
         # Özellikleri etkilerine göre (mutlak değerce) sırala
         # (Özellik Adı, Etki Değeri, Özelliğin O Anki Değeri)
         contributions = []
-        for name, shap_val, actual_val in zip(feature_names, shap_vals, X_latest.iloc[-1]):
+        for name, shap_val, actual_val in zip(feature_names, shap_vals, latest_values):
             contributions.append({
                 "feature": name,
                 "impact": shap_val, # + ise fiyatı artırıyor, - ise düşürüyor
@@ -68,7 +77,7 @@ class ModelExplainer:
         """Genel model davranışını (Feature Importance) çizer."""
         shap_values = self.explainer.shap_values(self.X_train)
         plt.figure()
-        shap.summary_plot(shap_values, self.X_train, show=False)
+        shap.summary_plot(shap_values, self.X_train, feature_names=self.feature_names, show=False)
         plt.tight_layout()
         plt.savefig("reports/shap_summary.png")
         plt.close()
\ No newline at end of file
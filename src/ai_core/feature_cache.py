@@ -0,0 +1,155 @@
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import joblib
+import numpy as np
+import pandas as pd
+from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.incremental_features import IncrementalFeatureEngineer
+
+
+class StaleFeaturesError(ValueError):
+    """Son bar için özellik satırı üretilemedi (ör. son barda eksik değer); tahmin eski tarihe ait olurdu."""
+
+
+class FeatureCache:
+    """
+    İçerik adresli özellik matrisi önbelleği.
+
+    Anahtar: sembol + özellik ayarları (FeatureEngineer.config_key) + girdi düzeni.
+    Her kayıt, matrisin üretildiği OHLCV girdisinin satır bazlı hash'lerini tutar:
+      - Hash'ler birebir aynıysa matris olduğu gibi döner.
+      - Eski girdi yeni girdinin ön ekiyse (sadece yeni barlar eklenmiş) sadece
+        yeni satırlar artımlı indikatör durumuyla hesaplanıp matrise eklenir.
+      - Aksi halde (geçmiş düzeltilmiş vb.) matris baştan hesaplanır.
+
+    Bellekte LRU olarak tutulur; `cache_dir` verilirse matris Parquet, hash ve
+    indikatör durumu joblib olarak diske de yazılır (süreçler arası paylaşım).
+    """
+
+    def __init__(self, fe: FeatureEngineer, cache_dir: str = None, max_entries: int = 32):
+        self.fe = fe
+        self.incremental = IncrementalFeatureEngineer(use_lags=fe.use_lags)
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+
+    def get_features(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """`fe.create_features(df)` ile aynı matrisi (kopya olarak) döner."""
+        return self._materialize(symbol, df).copy()
+
+    def get_latest(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Matrisin son satırı (tek satırlık DataFrame); tahmin için tüm matrisi kopyalamaz.
+
+        Raises:
+            StaleFeaturesError: Son satır verinin son barına ait değilse (dropna son
+                barları düşürmüşse) eski bir günün özellikleri döndürülmez.
+        """
+        latest = self._materialize(symbol, df).iloc[[-1]]
+        if 'Date' in latest.columns and 'Date' in df.columns and latest['Date'].iloc[0] != df['Date'].iloc[-1]:
+            raise StaleFeaturesError(
+                f"{symbol}: son bar ({df['Date'].iloc[-1]}) için özellik yok; "
+                f"son geçerli satır {latest['Date'].iloc[0]}."
+            )
+        return latest.copy()
+
+    def stats(self) -> dict:
+        total = self.hits + self.extensions + self.misses
+        return {
+            "hits": self.hits,
+            "extensions": self.extensions,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.extensions) / total if total else 0.0,
+            "entries": len(self._entries)
+        }
+
+    def invalidate(self, symbol: str = None) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if symbol is None or k.startswith(f"{symbol}_")]:
+                del self._entries[key]
+
+    def _materialize(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        key = self._key(symbol, df)
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+
+        with self._lock:
+            entry = self._entries.get(key) or self._load(key)
+            if entry is not None:
+                cached = entry["row_hashes"]
+                if len(cached) == len(row_hashes) and np.array_equal(cached, row_hashes):
+                    self.hits += 1
+                    self._remember(key, entry, persist=False)
+                    return entry["features"]
+
+                if 0 < len(cached) < len(row_hashes) and np.array_equal(cached, row_hashes[:len(cached)]):
+                    self.extensions += 1
+                    entry = self._extend(entry, df, row_hashes)
+                    self._remember(key, entry, persist=True)
+                    return entry["features"]
+
+            self.misses += 1
+            entry = {
+                "row_hashes": row_hashes,
+                "features": self.fe.create_features(df),
+                "state": self.incremental.build_state(df)
+            }
+            self._remember(key, entry, persist=True)
+            return entry["features"]
+
+    def _extend(self, entry: dict, df: pd.DataFrame, row_hashes: np.ndarray) -> dict:
+        """Sadece yeni barların özellik satırlarını hesaplayıp mevcut matrise ekler."""
+        n_old = len(entry["row_hashes"])
+        new_bars = df.iloc[n_old:]
+        if 'Date' not in new_bars.columns:
+            new_bars = new_bars.reset_index()
+
+        # Durum kayıtta paylaşılmasın diye kopyası üzerinde ilerlenir
+        state = copy.deepcopy(entry["state"])
+        rows = self.incremental.advance(state, new_bars)
+
+        features = entry["features"]
+        new_rows = pd.DataFrame(rows, index=df.index[n_old:]).reindex(columns=features.columns).dropna()
+        return {
+            "row_hashes": row_hashes,
+            "features": pd.concat([features, new_rows.astype(features.dtypes.to_dict())]),
+            "state": state
+        }
+
+    def _key(self, symbol: str, df: pd.DataFrame) -> str:
+        layout = f"{self.fe.config_key()}|{list(df.columns)}|{df.index.name}"
+        return f"{symbol}_{hashlib.sha1(layout.encode('utf-8')).hexdigest()[:12]}"
+
+    def _remember(self, key: str, entry: dict, persist: bool) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        if persist and self.cache_dir:
+            base = os.path.join(self.cache_dir, key)
+            entry["features"].to_parquet(f"{base}.parquet.tmp")
+            os.replace(f"{base}.parquet.tmp", f"{base}.parquet")
+            joblib.dump({"row_hashes": entry["row_hashes"], "state": entry["state"]}, f"{base}.meta.pkl")
+
+    def _load(self, key: str):
+        if not self.cache_dir:
+            return None
+        base = os.path.join(self.cache_dir, key)
+        if not (os.path.exists(f"{base}.parquet") and os.path.exists(f"{base}.meta.pkl")):
+            return None
+        try:
+            meta = joblib.load(f"{base}.meta.pkl")
+            features = pd.read_parquet(f"{base}.parquet")
+        except Exception:
+            return None
+        return {"row_hashes": meta["row_hashes"], "features": features, "state": meta["state"]}
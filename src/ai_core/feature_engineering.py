@@ -1,9 +1,13 @@
+import hashlib
 import pandas as pd
 import numpy as np
+from typing import Dict, List
 from ta.momentum import RSIIndicator, StochRSIIndicator
 from ta.trend import MACD, SMAIndicator, EMAIndicator, CCIIndicator
 from ta.volatility import BollingerBands, AverageTrueRange
 from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
+from src.ai_core.feature_registry import DEFAULT_REGISTRY, LAG_FEATURES, RAW_FIELDS
+from src.core.config import settings
 
 class FeatureEngineer:
     """
@@ -11,14 +15,68 @@ class FeatureEngineer:
     ve zaman serisi özellikleri (Lag Features) üretir.
     """
     
-    def __init__(self, use_lags: bool = True):
+    ENGINES = ("ta", "numpy")
+
+    def __init__(self, use_lags: bool = True, engine: str = None, features: List[str] = None,
+                 compact: bool = None):
+        """
+        Args:
+            use_lags (bool): Gecikmeli (lag) özellikler eklensin mi.
+            engine (str): "ta" (pandas tabanlı `ta` kütüphanesi) veya "numpy"
+                (indicator_kernels; numba varsa derlenmiş). Aynı sütunları üretirler.
+            features (list): Sadece bu özellikler (ve bağımlılıkları) hesaplanır; ör. eğitilmiş
+                modelin şeması (XGBoostModel.feature_schema). Ham OHLCV alanları olduğu gibi
+                geçer. Verilirse use_lags dikkate alınmaz. None -> tüm özellikler.
+            compact (bool): Özellik sütunları float32 tutulur (hedef olan Close float64 kalır);
+                bellek yaklaşık yarıya iner. None -> settings.FEATURE_COMPACT.
+        """
+        self.registry = DEFAULT_REGISTRY
         self.use_lags = use_lags
+        self.engine = engine or settings.FEATURE_ENGINE
+        self.compact = settings.FEATURE_COMPACT if compact is None else compact
+        self.dtype = np.float32 if self.compact else np.float64
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Bilinmeyen indikatör motoru: {self.engine}. Seçenekler: {self.ENGINES}")
+
+        self.features = None
+        self.columns = self._default_columns(use_lags)
+        if features is not None:
+            unknown = [name for name in features if name not in self.registry and name not in RAW_FIELDS]
+            if unknown:
+                raise ValueError(f"Tanımsız özellik(ler): {unknown}")
+            self.columns = [name for name in self.registry.columns() if name in set(features)]
+            self.use_lags = any(name in LAG_FEATURES for name in self.columns)
+            # Tam küme istenmişse varsayılan yol (ve ortak önbellek anahtarı) kullanılır
+            if self.columns != self._default_columns(self.use_lags):
+                self.features = list(features)
+
+    # Özellik tanımları değiştiğinde artırılır (önbellekteki eski matrisler geçersiz olur)
+    FEATURE_VERSION = 2
+
+    def config_key(self) -> str:
+        """Üretilen sütunları belirleyen ayarların özeti (motor sonucu değiştirmez)."""
+        if self.features is None:
+            key = f"v{self.FEATURE_VERSION}|lags={int(self.use_lags)}"
+        else:
+            key = f"v{self.FEATURE_VERSION}|cols={hashlib.sha1(','.join(self.columns).encode('utf-8')).hexdigest()[:12]}"
+        return f"{key}|f32" if self.compact else key
+
+    def min_history(self) -> int:
+        """Tüm özelliklerin dolu olduğu ilk satır için gereken bar sayısı (ör. SMA 50 -> 50)."""
+        return self.registry.min_history(self.columns)
+
+    def _default_columns(self, use_lags: bool) -> List[str]:
+        return [name for name in self.registry.columns() if use_lags or name not in LAG_FEATURES]
 
     def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Verilen DataFrame'e teknik analiz indikatörleri ekler.
         Orijinal veri bozulmaz, kopya üzerinde çalışılır.
+        Özellik alt kümesi seçildiyse sadece o sütunlar çekirdeklerle hesaplanır.
         """
+        if self.engine == "numpy" or self.features is not None:
+            return self._compact(self._create_features_numpy(df))
+
         # Veri kopyası al (Data Integrity)
         data = df.copy()
         
@@ -84,4 +142,100 @@ class FeatureEngineer:
         # İndikatör hesaplamaları (özellikle SMA_50) ilk satırlarda NaN oluşturur.
         data.dropna(inplace=True)
         
-        return data
\ No newline at end of file
+        return self._compact(data)
+
+    def _create_features_numpy(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Seçili sütunları kayıttaki tanımlarla bitişik float64 diziler üzerinde hesaplar.
+        Tüm yeni sütunlar tek seferde eklenir (sütun sütun DataFrame kopyası oluşmaz).
+        """
+        raw = {field: df[field].to_numpy(dtype=np.float64) for field in RAW_FIELDS if field in df.columns}
+        features = self.registry.compute(raw, self.columns)
+
+        data = pd.concat([df, pd.DataFrame(features, index=df.index)], axis=1)
+        if self.features is None:
+            data.dropna(inplace=True)
+        else:
+            # Sadece istenen sütunlardaki eksikler satır kaybettirir
+            required = ['Close'] + [name for name in self.features if name in data.columns]
+            data.dropna(subset=list(dict.fromkeys(required)), inplace=True)
+
+        return data
+
+    def _compact(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Kompakt modda Close dışındaki sayısal sütunları float32'ye çevirir."""
+        if not self.compact:
+            return data
+        numeric = data.select_dtypes(include='number').columns.drop('Close', errors='ignore')
+        return data.astype({col: np.float32 for col in numeric})
+
+    # --- PANEL (ÇOKLU SEMBOL) MODU ---
+    PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+    @classmethod
+    def build_panel(cls, frames: Dict[str, pd.DataFrame]):
+        """
+        Sembol bazlı OHLCV DataFrame'lerini tarih ekseninde hizalar.
+
+        Returns:
+            (symbols, dates, arrays): arrays her alan için (sembol x gün) float64 dizisidir.
+            Sembol listelenmeden önceki günler NaN kalır; sonrasındaki boşluklar
+            (işlem durdurma vb.) DataProcessor'daki gibi ileri doldurulur.
+        """
+        symbols = list(frames)
+        long_df = pd.concat(
+            [f.set_index('Date')[cls.PANEL_FIELDS] if 'Date' in f.columns else f[cls.PANEL_FIELDS] for f in frames.values()],
+            keys=symbols, names=['Symbol', 'Date']
+        )
+        dates = long_df.index.get_level_values('Date').unique().sort_values()
+
+        arrays = {}
+        for field in cls.PANEL_FIELDS:
+            wide = long_df[field].unstack('Symbol').reindex(index=dates, columns=symbols).ffill()
+            arrays[field] = np.ascontiguousarray(wide.to_numpy(dtype=np.float64).T)
+        return symbols, dates, arrays
+
+    def create_panel_features(self, symbols: List[str], dates, arrays: Dict[str, np.ndarray],
+                              output: str = "long"):
+        """
+        Hizalanmış (sembol x gün) OHLCV dizileri için tüm özellikleri tek seferde,
+        eksen boyunca vektörel olarak hesaplar. Her sembolün satırları
+        create_features ile aynıdır (ilk geçerli gününden itibaren).
+
+        Args:
+            output: "long" -> Symbol, Date ve create_features sütunlarını içeren uzun DataFrame
+                    (eksik özellikli satırlar atılır).
+                    "3d"   -> {"tensor": (sembol x gün x özellik), "symbols", "dates", "columns"};
+                    eksik özellikli hücrelerin tüm satırı NaN'dır.
+            Kompakt modda değerler (Close dahil) float32'dir.
+        """
+        if output not in ("long", "3d"):
+            raise ValueError(f"Bilinmeyen çıktı biçimi: {output}. Seçenekler: ('long', '3d')")
+
+        columns = {field: arrays[field] for field in self.PANEL_FIELDS}
+        columns.update(self.registry.compute(arrays, self.columns))
+
+        names = list(columns)
+        tensor = np.stack([columns[name] for name in names], axis=-1, dtype=self.dtype)
+        valid = ~np.isnan(tensor).any(axis=-1)
+
+        if output == "3d":
+            tensor[~valid] = np.nan
+            return {"tensor": tensor, "symbols": list(symbols), "dates": pd.DatetimeIndex(dates), "columns": names}
+
+        sym_idx, day_idx = np.nonzero(valid)
+        result = pd.DataFrame(tensor[sym_idx, day_idx], columns=names)
+        result.insert(0, 'Date', pd.DatetimeIndex(dates)[day_idx])
+        result.insert(0, 'Symbol', pd.Categorical.from_codes(sym_idx, categories=list(symbols)))
+        return result
+
+
+def feature_matrix(data: pd.DataFrame, columns: List[str], dtype=np.float32) -> np.ndarray:
+    """
+    Verilen sütunları bu sırayla tek bir C-sıralı (satır bitişik) ndarray'e yazar.
+    Ara DataFrame (drop/seçim kopyası) oluşmaz; modellere doğrudan verilebilir.
+    """
+    out = np.empty((len(data), len(columns)), dtype=dtype)
+    for j, col in enumerate(columns):
+        out[:, j] = data[col].to_numpy()
+    return out
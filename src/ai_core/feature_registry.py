@@ -0,0 +1,169 @@
+"""
+FeatureEngineer özelliklerinin bildirimsel kaydı.
+
+Her özellik girdilerini (ham OHLCV alanları veya başka özellikler), penceresini
+ve ısınma uzunluğunu (serinin başında NaN kalan satır sayısı) bildirir.
+`FeatureRegistry.compute` sadece istenen sütunları ve onların bağımlılıklarını
+bağımlılık sırasıyla hesaplar; ortak ara değerler (MACD'nin kullandığı EMA'lar,
+Bollinger ve SMA'nın paylaştığı kayan istatistikler vb.) bir kez hesaplanır.
+Hesaplamalar indicator_kernels üzerinden yapılır; 1B ve 2B (sembol x gün) girdi kabul eder.
+"""
+from typing import Callable, Dict, Iterable, List, Sequence
+import numpy as np
+from src.ai_core import indicator_kernels as kernels
+
+RAW_FIELDS = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume')
+
+
+class FeatureSpec:
+    """Tek bir özelliğin (veya ara değerin) tanımı."""
+
+    def __init__(self, name: str, inputs: Sequence[str], compute: Callable, window: int = 1,
+                 warmup: int = None, public: bool = True):
+        """
+        Args:
+            inputs: Girdi adları (ham alanlar veya kayıttaki diğer özellikler), compute'a bu sırayla verilir.
+            window: Özelliğin baktığı bar sayısı.
+            warmup: Girdiler hazır olduktan sonra NaN kalan satır sayısı (varsayılan window - 1).
+            public: False ise sadece ara değerdir, çıktıya sütun olarak eklenmez.
+        """
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.compute = compute
+        self.window = window
+        self.warmup = window - 1 if warmup is None else warmup
+        self.public = public
+
+    def __repr__(self):
+        return f"<Feature: {self.name} <- {', '.join(self.inputs)}>"
+
+
+class FeatureRegistry:
+    """Özellik tanımları ve bağımlılık grafiği üzerinde tembel hesaplama."""
+
+    def __init__(self, specs: Iterable[FeatureSpec] = ()):
+        self._specs: Dict[str, FeatureSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: FeatureSpec) -> None:
+        if spec.name in self._specs or spec.name in RAW_FIELDS:
+            raise ValueError(f"Özellik zaten tanımlı: {spec.name}")
+        unknown = [name for name in spec.inputs if name not in self._specs and name not in RAW_FIELDS]
+        if unknown:
+            # Girdiler önce kaydedilmeli; bu aynı zamanda döngüsel bağımlılığı engeller
+            raise ValueError(f"{spec.name} için tanımsız girdi(ler): {unknown}")
+        self._specs[spec.name] = spec
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def columns(self) -> List[str]:
+        """Tüm çıktı sütunları (kayıt sırasıyla)."""
+        return [name for name, spec in self._specs.items() if spec.public]
+
+    def resolve(self, names: Iterable[str]) -> List[str]:
+        """İstenen özellikler ve bağımlılıkları, her biri bir kez ve bağımlılık sırasıyla."""
+        order, seen = [], set()
+
+        def visit(name):
+            if name in seen or name in RAW_FIELDS:
+                return
+            if name not in self._specs:
+                raise KeyError(f"Tanımsız özellik: {name}")
+            seen.add(name)
+            for dep in self._specs[name].inputs:
+                visit(dep)
+            order.append(name)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def warmup(self, name: str) -> int:
+        """Özelliğin tam bir seride başta NaN kalan satır sayısı (girdilerin ısınması dahil)."""
+        if name in RAW_FIELDS:
+            return 0
+        spec = self._specs[name]
+        return max((self.warmup(dep) for dep in spec.inputs), default=0) + spec.warmup
+
+    def min_history(self, names: Iterable[str]) -> int:
+        """İstenen özelliklerin hepsinin dolu olduğu ilk satır için gereken bar sayısı."""
+        return max((self.warmup(name) for name in names), default=0) + 1
+
+    def compute(self, raw: Dict[str, np.ndarray], names: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        `raw` ham alan dizilerinden (son eksen zaman) istenen özellikleri hesaplar.
+        Sadece istenen isimler döner; ara değerler atılır.
+        """
+        names = [name for name in names if name not in RAW_FIELDS]
+        values = {}
+        for name in self.resolve(names):
+            spec = self._specs[name]
+            args = [raw[dep] if dep in RAW_FIELDS else values[dep] for dep in spec.inputs]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values[name] = spec.compute(*args)
+        return {name: values[name] for name in names}
+
+
+def _lag(periods: int) -> Callable:
+    return lambda x: kernels.shift(x, periods)
+
+
+def _atr(high, low, close, window: int) -> np.ndarray:
+    """ta ile aynı ATR; ilk `window` bar (ta'nın 0 yazdığı satırlar ve tohum) NaN olur."""
+    out = np.array(kernels.atr(high, low, close, window), dtype=np.float64)
+    rows = out.reshape(-1, out.shape[-1])
+    rows[np.arange(rows.shape[-1]) < kernels.first_valid(rows)[:, None] + window] = np.nan
+    return out
+
+
+def _build_default_registry() -> FeatureRegistry:
+    """FeatureEngineer'ın ürettiği sütunlar (create_features ile aynı isim, tanım ve sırayla)."""
+    f = FeatureSpec
+    return FeatureRegistry([
+        # Ara değerler
+        f('_close_stats_20', ['Close'], lambda c: kernels.rolling_stats(c, 20), window=20, public=False),
+        f('_typical_price', ['High', 'Low', 'Close'], lambda h, l, c: (h + l + c) / 3.0, public=False),
+        f('_typical_stats_20', ['_typical_price'], lambda tp: kernels.rolling_stats(tp, 20), window=20, public=False),
+        f('_prev_close', ['Close'], _lag(1), window=2, public=False),
+
+        # 1. TREND
+        f('sma_20', ['_close_stats_20'], lambda s: s[0]),
+        f('sma_50', ['Close'], lambda c: kernels.rolling_mean(c, 50), window=50),
+        f('ema_12', ['Close'], lambda c: kernels.ema(c, 12), window=12),
+        f('ema_26', ['Close'], lambda c: kernels.ema(c, 26), window=26),
+        f('macd', ['ema_12', 'ema_26'], lambda fast, slow: fast - slow),
+        f('macd_signal', ['macd'], lambda m: kernels.ema(m, 9), window=9),
+        f('macd_diff', ['macd', 'macd_signal'], lambda m, s: m - s),
+
+        # 2. MOMENTUM
+        f('rsi', ['Close'], lambda c: kernels.rsi(c, 14), window=14),
+        f('cci', ['_typical_price', '_typical_stats_20'], lambda tp, s: (tp - s[0]) / (0.015 * s[2])),
+
+        # 3. VOLATİLİTE
+        f('bb_high', ['_close_stats_20'], lambda s: s[0] + 2 * s[1]),
+        f('bb_low', ['_close_stats_20'], lambda s: s[0] - 2 * s[1]),
+        f('bb_width', ['bb_high', 'bb_low', 'Close'], lambda hi, lo, c: (hi - lo) / c),
+        # ATR ilk 14 barda tanımsızdır (ta 0 yazar); NaN olduğundan alt küme şemalarında da atılır
+        f('atr', ['High', 'Low', 'Close'], lambda h, l, c: _atr(h, l, c, 14), window=14, warmup=14),
+
+        # 4. HACİM
+        f('obv', ['Close', 'Volume'], kernels.obv),
+        f('vwap', ['_typical_price', 'Volume'],
+          lambda tp, v: kernels.rolling_mean(tp * v, 14) / kernels.rolling_mean(v, 14), window=14),
+
+        # 5. GECİKMELER
+        f('lag_close_1', ['_prev_close'], lambda p: p),
+        f('lag_close_2', ['Close'], _lag(2), window=3),
+        f('lag_close_5', ['Close'], _lag(5), window=6),
+        f('lag_vol_1', ['Volume'], _lag(1), window=2),
+        f('lag_rsi_1', ['rsi'], _lag(1), window=2),
+        f('pct_change', ['Close', '_prev_close'], lambda c, p: c / p - 1),
+        f('log_return', ['Close', '_prev_close'], lambda c, p: np.log(c / p)),
+    ])
+
+
+LAG_FEATURES = ['lag_close_1', 'lag_close_2', 'lag_close_5', 'lag_vol_1', 'lag_rsi_1', 'pct_change', 'log_return']
+
+DEFAULT_REGISTRY = _build_default_registry()
@@ -0,0 +1,112 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import pandas as pd
+
+
+class FrameCache:
+    """
+    Temizlenmiş OHLCV DataFrame'leri için sınırlı (LRU) bellek içi önbellek.
+
+    Anahtar (sembol, veri sürümü) çiftidir: veri değiştiğinde sürüm damgası da
+    değişir ve eski kayıt kendiliğinden geçersiz olur. Kayıt sayısı ve toplam
+    bellek sınırı aşılınca en uzun süredir kullanılmayan kayıtlar atılır.
+
+    `version_ttl` saniye içinde sürümü doğrulanmış bir kayıt, sürüm tekrar
+    sorgulanmadan (hiç G/Ç yapmadan) döndürülür. Aynı süreçteki yazıcılar
+    (MarketService, DataProcessor'ın depo yazımları) kayıtları `invalidate_frame_caches`
+    ile hemen düşürür; başka süreçlerin yazımları en geç bu süre sonunda görülür.
+    Yeni barlara göre iş yapan çağıranlar bu kısayolu kullanmaz (DataProcessor `fresh`).
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024,
+                 version_ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version_ttl = version_ttl
+
+        self._entries = OrderedDict()  # symbol -> (version, frame, nbytes, validated_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _caches.add(self)
+
+    def get_recent(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Sürümü `version_ttl` içinde doğrulanmış kaydı döner (sürüm kontrolü yapmadan)."""
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or time.monotonic() - entry[3] > self.version_ttl:
+                return None
+            return self._hit(symbol, entry)
+
+    def get(self, symbol: str, version: Hashable) -> Optional[pd.DataFrame]:
+        """Sürümü eşleşen kaydın kopyasını döner; yoksa veya sürüm eskiyse None."""
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+
+            self._entries[symbol] = (entry[0], entry[1], entry[2], time.monotonic())
+            return self._hit(symbol, entry)
+
+    def put(self, symbol: str, version: Hashable, df: pd.DataFrame) -> None:
+        frame = df.copy()
+        nbytes = int(frame.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            self._discard(symbol)
+            self._entries[symbol] = (version, frame, nbytes, time.monotonic())
+            self._bytes += nbytes
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, symbol: str = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                self._discard(symbol)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes
+            }
+
+    def _hit(self, symbol: str, entry: tuple) -> pd.DataFrame:
+        self.hits += 1
+        self._entries.move_to_end(symbol)
+        # Çağıranlar DataFrame'i değiştirebilir; önbellekteki kopya korunur
+        return entry[1].copy()
+
+    def _discard(self, symbol: str) -> None:
+        entry = self._entries.pop(symbol, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+# Süreçteki tüm önbellekler (yazıcılar hangi motorun önbelleği olduğunu bilmeden düşürebilsin)
+_caches = weakref.WeakSet()
+
+
+def invalidate_frame_caches(symbols=None) -> None:
+    """Süreçteki tüm FrameCache'lerden verilen sembolleri (None -> hepsini) düşürür."""
+    for cache in list(_caches):
+        if symbols is None:
+            cache.invalidate()
+        else:
+            for symbol in symbols:
+                cache.invalidate(symbol)
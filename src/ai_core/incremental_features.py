@@ -0,0 +1,284 @@
+import math
+import os
+from collections import deque
+import joblib
+import numpy as np
+import pandas as pd
+from src.ai_core import indicator_kernels as kernels
+
+
+class _EwmState:
+    """pandas `ewm(alpha, adjust=False, min_periods)` özyinelemesinin tek adımlık hali."""
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.weighted = math.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        is_obs = x == x
+        if is_obs:
+            self.nobs += 1
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_obs:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * x) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_obs:
+            self.weighted = x
+        return self.weighted if self.nobs >= self.min_periods else math.nan
+
+
+class _SymbolState:
+    """Bir sembolün indikatör durumu (halka tamponları ve özyinelemeli ortalamalar)."""
+
+    def __init__(self):
+        self.last_date = None
+        self.last_close = math.nan
+        self.last_row = None
+
+        self.closes = deque(maxlen=50)       # SMA 20/50, Bollinger, kapanış gecikmeleri
+        self.typical = deque(maxlen=20)      # CCI
+        self.pv = deque(maxlen=14)           # VWAP pay
+        self.volumes = deque(maxlen=14)      # VWAP payda
+
+        self.ema_12 = _EwmState(2.0 / 13.0, 12)
+        self.ema_26 = _EwmState(2.0 / 27.0, 26)
+        self.macd_signal = _EwmState(2.0 / 10.0, 9)
+        self.rsi_up = _EwmState(1.0 / 14.0, 14)
+        self.rsi_down = _EwmState(1.0 / 14.0, 14)
+
+        self.tr_seed = []                    # ATR ilk pencere
+        self.atr = 0.0
+        self.obv = 0.0
+
+        self.prev_volume = math.nan
+        self.prev_rsi = math.nan
+
+
+class IncrementalFeatureEngineer:
+    """
+    FeatureEngineer ile aynı özellik satırını, her yeni bar için tüm geçmişi
+    yeniden hesaplamadan (O(1)) üretir.
+
+    Sembol başına durum (EMA'lar, RSI kazanç/kayıp ortalamaları, ATR, OBV, SMA
+    halka tamponları ve gecikme değerleri) bellekte tutulur ve `state_dir`
+    verilirse diske (joblib) kaydedilir. İlk kullanımda durum geçmiş veriden
+    aynı güncelleme adımları tekrar oynatılarak kurulur.
+    """
+    ATR_WINDOW = 14
+    SEED_MIN_ROWS = 60  # Daha kısa geçmişlerde durum bar bar kurulur
+
+    def __init__(self, use_lags: bool = True, state_dir: str = None):
+        self.use_lags = use_lags
+        self.state_dir = state_dir
+        self._states = {}
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def update(self, symbol: str, bar) -> pd.DataFrame:
+        """
+        Sembole yeni bir bar (Date/Open/High/Low/Close/Volume içeren dict veya Series)
+        ekler ve o barın özellik satırını tek satırlık DataFrame olarak döner.
+        Isınma süresince (ör. ilk 50 bar) bazı değerler NaN olabilir.
+        """
+        state = self._states.get(symbol)
+        if state is None:
+            state = self.load_state(symbol) or _SymbolState()
+            self._states[symbol] = state
+
+        row = self._step(state, dict(bar))
+        return pd.DataFrame([row])
+
+    def latest_row(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        `df`'in son satırı için özellik satırını döner. Durum `df` ile uyumluysa
+        sadece yeni barlar işlenir; değilse (ilk kullanım, geçmiş değişmiş) durum
+        baştan kurulur. Sonuçta durum diske kaydedilir.
+        """
+        state = self._states.get(symbol) or self.load_state(symbol)
+        if not self._is_consistent(state, df):
+            # Son bar hariç geçmişten durumu kur, son barı işleyerek satırı üret
+            state = self.build_state(df.iloc[:-1])
+            new_bars = df.iloc[-1:]
+        else:
+            new_bars = df[df['Date'] > state.last_date]
+
+        self.advance(state, new_bars)
+
+        self._states[symbol] = state
+        if len(new_bars):
+            self.save_state(symbol)
+        return pd.DataFrame([state.last_row], index=[df.index[-1]])
+
+    def build_state(self, df: pd.DataFrame) -> _SymbolState:
+        """
+        Geçmiş veriden (df'in son barından sonrası için) durumu kurar.
+        Uzun ve eksiksiz geçmişlerde özyinelemeli değerler vektörel çekirdeklerle
+        tek seferde hesaplanır; aksi halde barlar tek tek işlenir.
+        """
+        state = _SymbolState()
+        close = df['Close'].to_numpy(dtype=np.float64)
+        if len(df) < self.SEED_MIN_ROWS or not np.isfinite(close).all():
+            self.advance(state, df)
+            return state
+
+        high = df['High'].to_numpy(dtype=np.float64)
+        low = df['Low'].to_numpy(dtype=np.float64)
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+
+        ema_12 = kernels.ema(close, 12)
+        ema_26 = kernels.ema(close, 26)
+        macd = ema_12 - ema_26
+        diff = close - kernels.shift(close, 1)
+        up = kernels.ewm_mean(np.where(diff > 0, diff, 0.0), 1.0 / 14, 14)
+        down = kernels.ewm_mean(np.where(diff < 0, -diff, 0.0), 1.0 / 14, 14)
+
+        seeds = (
+            (state.ema_12, ema_12, len(close)),
+            (state.ema_26, ema_26, len(close)),
+            (state.macd_signal, kernels.ema(macd, 9), int(np.count_nonzero(~np.isnan(macd)))),
+            (state.rsi_up, up, len(close)),
+            (state.rsi_down, down, len(close)),
+        )
+        for ewm, values, nobs in seeds:
+            ewm.weighted = float(values[-1])
+            ewm.nobs = nobs
+
+        state.tr_seed = list(kernels.true_range(high, low, close)[:self.ATR_WINDOW])
+        state.atr = float(kernels.atr(high, low, close, self.ATR_WINDOW)[-1])
+        state.obv = float(kernels.obv(close, volume)[-1])
+
+        typical = (high + low + close) / 3.0
+        state.closes.extend(close[-50:].tolist())
+        state.typical.extend(typical[-20:].tolist())
+        state.pv.extend((typical * volume)[-14:].tolist())
+        state.volumes.extend(volume[-14:].tolist())
+
+        state.last_date = df['Date'].iloc[-1] if 'Date' in df.columns else df.index[-1]
+        state.last_close = float(close[-1])
+        state.prev_volume = float(volume[-1])
+        up_last, down_last = float(up[-1]), float(down[-1])
+        state.prev_rsi = 100.0 if down_last == 0 else 100.0 - 100.0 / (1.0 + up_last / down_last)
+        return state
+
+    def advance(self, state: _SymbolState, bars: pd.DataFrame) -> list:
+        """Barları sırayla duruma işler ve her birinin özellik satırını (dict) döner."""
+        return [self._step(state, bar) for bar in bars.to_dict('records')]
+
+    def save_state(self, symbol: str) -> None:
+        if self.state_dir and symbol in self._states:
+            joblib.dump({"use_lags": self.use_lags, "state": self._states[symbol]}, self._state_path(symbol))
+
+    def load_state(self, symbol: str):
+        """Diskteki anlık görüntüyü yükler; yoksa veya ayarlar uyuşmuyorsa None döner."""
+        if not self.state_dir or not os.path.exists(self._state_path(symbol)):
+            return None
+        try:
+            snapshot = joblib.load(self._state_path(symbol))
+        except Exception:
+            return None
+        if snapshot.get("use_lags") != self.use_lags:
+            return None
+        return snapshot["state"]
+
+    def reset(self, symbol: str) -> None:
+        self._states.pop(symbol, None)
+        if self.state_dir and os.path.exists(self._state_path(symbol)):
+            os.remove(self._state_path(symbol))
+
+    def _state_path(self, symbol: str) -> str:
+        return os.path.join(self.state_dir, f"{symbol}_features.pkl")
+
+    @staticmethod
+    def _is_consistent(state: _SymbolState, df: pd.DataFrame) -> bool:
+        """Durumun son barı df'te aynı kapanışla duruyorsa kaldığı yerden devam edilebilir."""
+        if state is None or state.last_date is None or df.empty:
+            return False
+        match = df.loc[df['Date'] == state.last_date, 'Close']
+        return len(match) == 1 and np.isclose(float(match.iloc[0]), state.last_close)
+
+    def _step(self, state: _SymbolState, bar: dict) -> dict:
+        """Bir barı duruma işler ve FeatureEngineer sütun sırasıyla özellik satırını döner."""
+        high, low = float(bar['High']), float(bar['Low'])
+        close, volume = float(bar['Close']), float(bar['Volume'])
+        prev_close = state.last_close
+
+        state.closes.append(close)
+        typical = (high + low + close) / 3.0
+        state.typical.append(typical)
+        state.pv.append(typical * volume)
+        state.volumes.append(volume)
+
+        closes = np.fromiter(state.closes, dtype=np.float64)
+        f = {}
+
+        # TREND
+        f['sma_20'] = closes[-20:].mean() if len(closes) >= 20 else math.nan
+        f['sma_50'] = closes.mean() if len(closes) >= 50 else math.nan
+        f['ema_12'] = state.ema_12.update(close)
+        f['ema_26'] = state.ema_26.update(close)
+        f['macd'] = f['ema_12'] - f['ema_26']
+        f['macd_signal'] = state.macd_signal.update(f['macd'])
+        f['macd_diff'] = f['macd'] - f['macd_signal']
+
+        # MOMENTUM
+        diff = close - prev_close
+        up = state.rsi_up.update(diff if diff > 0 else 0.0)
+        down = state.rsi_down.update(-diff if diff < 0 else 0.0)
+        f['rsi'] = 100.0 if down == 0 else (100.0 - 100.0 / (1.0 + up / down) if down == down else math.nan)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if len(state.typical) == 20:
+                tp = np.fromiter(state.typical, dtype=np.float64)
+                mean = tp.mean()
+                f['cci'] = float(np.float64(typical - mean) / np.float64(0.015 * np.abs(tp - mean).mean()))
+            else:
+                f['cci'] = math.nan
+
+            # VOLATİLİTE
+            if len(closes) >= 20:
+                std = closes[-20:].std()
+                f['bb_high'] = f['sma_20'] + 2 * std
+                f['bb_low'] = f['sma_20'] - 2 * std
+            else:
+                f['bb_high'] = f['bb_low'] = math.nan
+            f['bb_width'] = (f['bb_high'] - f['bb_low']) / close
+
+        tr = np.fmax(np.fmax(high - low, abs(high - prev_close)), abs(low - prev_close))
+        if len(state.tr_seed) < self.ATR_WINDOW:
+            state.tr_seed.append(tr)
+            if len(state.tr_seed) == self.ATR_WINDOW:
+                state.atr = float(np.nanmean(state.tr_seed))
+            # İlk pencere (tohum dahil) ısınmadır; toplu hesapla aynı şekilde NaN
+            f['atr'] = math.nan
+        else:
+            state.atr = (state.atr * (self.ATR_WINDOW - 1) + tr) / self.ATR_WINDOW
+            f['atr'] = state.atr
+
+        # HACİM
+        state.obv += -volume if close < prev_close else volume
+        f['obv'] = state.obv
+        f['vwap'] = sum(state.pv) / sum(state.volumes) if len(state.volumes) == 14 and sum(state.volumes) else math.nan
+
+        # GECİKMELER
+        if self.use_lags:
+            f['lag_close_1'] = prev_close
+            f['lag_close_2'] = closes[-3] if len(closes) >= 3 else math.nan
+            f['lag_close_5'] = closes[-6] if len(closes) >= 6 else math.nan
+            f['lag_vol_1'] = state.prev_volume
+            f['lag_rsi_1'] = state.prev_rsi
+            f['pct_change'] = close / prev_close - 1
+            f['log_return'] = math.log(close / prev_close) if prev_close > 0 else math.nan
+
+        state.last_date = bar.get('Date')
+        state.last_close = close
+        state.prev_volume = volume
+        state.prev_rsi = f['rsi']
+
+        row = {**bar, **{k: float(v) for k, v in f.items()}}
+        state.last_row = row
+        return row
@@ -0,0 +1,206 @@
+"""
+FeatureEngineer'ın `ta` kütüphanesiyle ürettiği indikatörlerin NumPy karşılıkları.
+
+Tüm çekirdekler float64 dizilerle son eksen (zaman) boyunca çalışır; 1B (tek sembol)
+ve 2B (sembol x gün) girdiyi aynı şekilde kabul eder. Sonuçlar `ta` ile aynı
+tanımları kullanır (EMA: adjust=False, min_periods=pencere; ATR: ilk pencere
+ortalamasıyla başlayan Wilder ortalaması, öncesi 0; RSI: alpha=1/pencere).
+numba varsa özyinelemeli ve kayan pencere döngüleri derlenir, yoksa aynı
+sonuçlar pandas/NumPy ile hesaplanır.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba opsiyoneldir; yoksa NumPy/pandas yolu kullanılır
+    NUMBA_AVAILABLE = False
+
+
+# --- NUMBA ÇEKİRDEKLERİ ---
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _ewm_rows_nb(x, alpha, min_periods):
+        # pandas ewm(adjust=False, ignore_na=False).mean() ile aynı özyineleme
+        rows, n = x.shape
+        out = np.full((rows, n), np.nan)
+        old_wt_factor = 1.0 - alpha
+        for r in range(rows):
+            weighted = np.nan
+            old_wt = 1.0
+            nobs = 0
+            for i in range(n):
+                cur = x[r, i]
+                is_obs = cur == cur
+                if is_obs:
+                    nobs += 1
+                if weighted == weighted:
+                    old_wt *= old_wt_factor
+                    if is_obs:
+                        if weighted != cur:
+                            weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                        old_wt = 1.0
+                elif is_obs:
+                    weighted = cur
+                if nobs >= min_periods:
+                    out[r, i] = weighted
+        return out
+
+    @njit(cache=True)
+    def _rolling_stats_rows_nb(x, window):
+        # Her pencere için ortalama, std (ddof=0) ve ortalama mutlak sapma tek geçişte
+        rows, n = x.shape
+        mean = np.full((rows, n), np.nan)
+        std = np.full((rows, n), np.nan)
+        mad = np.full((rows, n), np.nan)
+        for r in range(rows):
+            for i in range(window - 1, n):
+                s = 0.0
+                for j in range(i - window + 1, i + 1):
+                    s += x[r, j]
+                if s != s:
+                    continue
+                m = s / window
+                ss = 0.0
+                sa = 0.0
+                for j in range(i - window + 1, i + 1):
+                    d = x[r, j] - m
+                    ss += d * d
+                    sa += abs(d)
+                mean[r, i] = m
+                std[r, i] = np.sqrt(ss / window)
+                mad[r, i] = sa / window
+        return mean, std, mad
+
+    @njit(cache=True)
+    def _atr_rows_nb(tr, window, starts):
+        rows, n = tr.shape
+        out = np.full((rows, n), np.nan)
+        for r in range(rows):
+            start = starts[r]
+            if start < 0:
+                continue
+            out[r, start:] = 0.0
+            if n - start < window:
+                continue
+            seed = start + window - 1
+            out[r, seed] = np.nanmean(tr[r, start:seed + 1])
+            for i in range(seed + 1, n):
+                out[r, i] = (out[r, i - 1] * (window - 1) + tr[r, i]) / window
+        return out
+
+
+# --- GENEL ÇEKİRDEKLER (son eksen boyunca) ---
+def _as_rows(x) -> np.ndarray:
+    """Girdiyi (satır, zaman) biçiminde bitişik float64 diziye çevirir."""
+    arr = np.ascontiguousarray(x, dtype=np.float64)
+    return arr.reshape(-1, arr.shape[-1])
+
+
+def ewm_mean(x, alpha: float, min_periods: int, use_numba: bool = None) -> np.ndarray:
+    """pandas `ewm(alpha=..., adjust=False, min_periods=...).mean()` karşılığı."""
+    rows = _as_rows(x)
+    if _numba_enabled(use_numba):
+        out = _ewm_rows_nb(rows, alpha, min_periods)
+    else:
+        out = pd.DataFrame(rows.T).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy().T
+    return out.reshape(np.shape(x))
+
+
+def ema(x, span: int, use_numba: bool = None) -> np.ndarray:
+    return ewm_mean(x, 2.0 / (span + 1.0), span, use_numba)
+
+
+def rolling_stats(x, window: int, use_numba: bool = None):
+    """Kayan pencere ortalaması, std (ddof=0) ve ortalama mutlak sapma. Eksik pencere -> NaN."""
+    rows = _as_rows(x)
+    if _numba_enabled(use_numba):
+        mean, std, mad = _rolling_stats_rows_nb(rows, window)
+    else:
+        mean = np.full(rows.shape, np.nan)
+        std = np.full(rows.shape, np.nan)
+        mad = np.full(rows.shape, np.nan)
+        if rows.shape[-1] >= window:
+            windows = sliding_window_view(rows, window, axis=-1)
+            m = windows.mean(axis=-1)
+            dev = windows - m[..., None]
+            mean[:, window - 1:] = m
+            std[:, window - 1:] = np.sqrt((dev * dev).mean(axis=-1))
+            mad[:, window - 1:] = np.abs(dev).mean(axis=-1)
+    shape = np.shape(x)
+    return mean.reshape(shape), std.reshape(shape), mad.reshape(shape)
+
+
+def rolling_mean(x, window: int, use_numba: bool = None) -> np.ndarray:
+    return rolling_stats(x, window, use_numba)[0]
+
+
+def shift(x, periods: int = 1) -> np.ndarray:
+    """Son eksende kaydırma (pandas shift); boşalan yerler NaN."""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(x.shape, np.nan)
+    if periods < x.shape[-1]:
+        out[..., periods:] = x[..., :-periods]
+    return out
+
+
+def true_range(high, low, close) -> np.ndarray:
+    prev_close = shift(close, 1)
+    # NaN'ları atlayan maksimum (ilk gün sadece High - Low)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def first_valid(x) -> np.ndarray:
+    """Her satırdaki ilk sonlu değerin indeksi (hiç yoksa -1)."""
+    finite = np.isfinite(_as_rows(x))
+    return np.where(finite.any(axis=-1), finite.argmax(axis=-1), -1)
+
+
+def atr(high, low, close, window: int = 14, use_numba: bool = None) -> np.ndarray:
+    """
+    `ta` AverageTrueRange ile aynı: serinin ilk window-1 değeri 0, sonra Wilder ortalaması.
+    Panel girdisinde her satır kendi ilk geçerli gününden başlar (öncesi NaN).
+    """
+    tr = _as_rows(true_range(high, low, close))
+    starts = first_valid(tr)
+    if _numba_enabled(use_numba):
+        out = _atr_rows_nb(tr, window, starts)
+    else:
+        n = tr.shape[-1]
+        idx = np.arange(n)
+        seeds = starts + window - 1
+        seeded = np.full(tr.shape, np.nan)
+        for r in np.flatnonzero((starts >= 0) & (seeds < n)):
+            seeded[r, seeds[r]] = np.nanmean(tr[r, starts[r]:seeds[r] + 1])
+            seeded[r, seeds[r] + 1:] = tr[r, seeds[r] + 1:]
+        out = ewm_mean(seeded, 1.0 / window, 1, use_numba=False)
+        out = np.where(idx < seeds[:, None], 0.0, out)
+        out[(starts[:, None] < 0) | (idx < starts[:, None])] = np.nan
+    return out.reshape(np.shape(close))
+
+
+def rsi(close, window: int = 14, use_numba: bool = None) -> np.ndarray:
+    diff = close - shift(close, 1)
+    # Fiyatı olmayan günler gözlem sayılmaz (panelde henüz işlem görmeyen semboller)
+    listed = ~np.isnan(close)
+    up = np.where(listed, np.where(diff > 0, diff, 0.0), np.nan)
+    down = np.where(listed, np.where(diff < 0, -diff, 0.0), np.nan)
+    ema_up = ewm_mean(up, 1.0 / window, window, use_numba)
+    ema_down = ewm_mean(down, 1.0 / window, window, use_numba)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ema_down == 0, 100.0, 100.0 - (100.0 / (1.0 + ema_up / ema_down)))
+
+
+def obv(close, volume) -> np.ndarray:
+    signed = np.where(close < shift(close, 1), -volume, volume)
+    out = np.nancumsum(signed, axis=-1)
+    out[np.isnan(signed)] = np.nan
+    return out
+
+
+def _numba_enabled(use_numba: bool) -> bool:
+    if use_numba is None:
+        return NUMBA_AVAILABLE
+    return use_numba and NUMBA_AVAILABLE
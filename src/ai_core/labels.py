@@ -0,0 +1,53 @@
+from typing import Iterable, List
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class LabelGenerator:
+    """
+    Çoklu ufuklu hedef (etiket) üretimi.
+
+    Her ufuk h için (T+h):
+      - target_price_h:     h bar sonraki kapanış
+      - target_return_h:    log(P[t+h] / P[t])
+      - target_direction_h: getiri eşikten büyükse 1, değilse 0
+    Geleceği bilinmeyen son satırlarda etiketler NaN'dır.
+
+    Tüm ufuklar, kapanış serisi üzerindeki tek bir ileri pencere görünümünden
+    (sliding_window_view, kopyasız) birlikte okunur; özellik matrisi ufuk başına
+    yeniden üretilmez, etiketler aynı index ile yanına eklenir.
+    """
+
+    def __init__(self, horizons: Iterable[int] = (1, 5, 20), price_col: str = 'Close', threshold: float = 0.0):
+        self.horizons = sorted({int(h) for h in horizons})
+        if not self.horizons or self.horizons[0] < 1:
+            raise ValueError(f"Ufuklar pozitif tam sayı olmalı: {horizons}")
+        self.price_col = price_col
+        self.threshold = threshold
+
+    def columns(self, horizon: int = None) -> List[str]:
+        """Etiket sütunları (verilirse sadece o ufuk için)."""
+        horizons = self.horizons if horizon is None else [horizon]
+        return [f"target_{kind}_{h}" for h in horizons for kind in ("price", "return", "direction")]
+
+    def generate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """`df` ile aynı index'e sahip etiket DataFrame'i döner (df değiştirilmez)."""
+        price = df[self.price_col].to_numpy(dtype=np.float64)
+        max_h = self.horizons[-1]
+
+        # Satır t'nin penceresi: [P[t], P[t+1], ..., P[t+max_h]] (sonu NaN ile tamamlanır)
+        padded = np.concatenate([price, np.full(max_h, np.nan)])
+        windows = sliding_window_view(padded, max_h + 1)
+        future = windows[:, self.horizons]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.log(future / price[:, None])
+        direction = np.where(np.isnan(returns), np.nan, (returns > self.threshold).astype(np.float64))
+
+        labels = {}
+        for j, h in enumerate(self.horizons):
+            labels[f"target_price_{h}"] = future[:, j]
+            labels[f"target_return_{h}"] = returns[:, j]
+            labels[f"target_direction_{h}"] = direction[:, j]
+        return pd.DataFrame(labels, index=df.index)
@@ -0,0 +1,293 @@
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+import joblib
+from src.ai_core.ai_models.machine_learning import XGBoostModel
+from src.ai_core.ai_models.statistical import ProphetModel, GarchModel
+from src.ai_core.explainability.shap_explainer import ModelExplainer
+from src.ai_core.feature_engineering import FeatureEngineer
+
+
+class ModelNotFoundError(LookupError):
+    """Sembol için (güncel özellik sürümüyle) kayıtlı model yok; eğitim gerekir."""
+
+
+class ModelBundle:
+    """
+    Bir sembolün tahmin için gereken her şeyi: XGBoost (ve ufuk modelleri), Prophet,
+    GARCH, SHAP referans verisi ve özellik şeması. Kayıttan yüklenen paketlerde
+    bileşenler ilk kullanıldıklarında diskten okunur.
+    """
+    FILES = {"xgb": "xgb.pkl", "prophet": "prophet.pkl", "garch": "garch.pkl", "background": "background.pkl"}
+
+    def __init__(self, symbol: str, manifest: dict, path: str = None, components: dict = None,
+                 base: "ModelBundle" = None):
+        self.symbol = symbol
+        self.manifest = manifest
+        self.path = path
+        self._components = dict(components or {})
+        self._base = base  # Türetilmiş pakette verilmeyen bileşenlerin kaynağı
+        self._explainer = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_models(cls, symbol: str, xgb: XGBoostModel, prophet: ProphetModel, garch: GarchModel,
+                    background, feature_config: str, horizon_models: Dict[int, XGBoostModel] = None,
+                    data_end=None, cross_asset: dict = None) -> "ModelBundle":
+        """
+        Yeni eğitilmiş modellerden (henüz kaydedilmemiş) paket oluşturur.
+        `data_end`: eğitim verisinin son tarihi (artımlı güncelleme bundan sonraki barları kullanır).
+        `cross_asset`: çapraz varlık özellikleri ayarı (CrossAssetFeatures.signature); kapalıysa None.
+        """
+        horizon_models = horizon_models or {}
+        manifest = {
+            "symbol": symbol,
+            "feature_schema": [str(col) for col in xgb.feature_schema],
+            "feature_config": feature_config,
+            "feature_version": FeatureEngineer.FEATURE_VERSION,
+            "cross_asset": cross_asset,
+            "horizons": sorted(horizon_models),
+            "trained_at": datetime.now().isoformat(timespec="seconds"),
+            "data_end": str(data_end) if data_end is not None else None,
+        }
+        components = {"xgb": xgb, "prophet": prophet, "garch": garch, "background": background}
+        components.update({f"xgb_h{h}": model for h, model in horizon_models.items()})
+        return cls(symbol, manifest, components=components)
+
+    def updated(self, components: dict, **manifest) -> "ModelBundle":
+        """
+        Bu sürümden türetilmiş yeni (kaydedilmemiş) paket: verilen bileşenler değişir,
+        diğerleri bu sürümden okunur ve kayıtta dosya olarak kopyalanır (yeniden serileştirilmez).
+        """
+        manifest = {**self.manifest, **manifest, "updated_at": datetime.now().isoformat(timespec="seconds")}
+        manifest.pop("version", None)
+        return ModelBundle(self.symbol, manifest, components=components, base=self)
+
+    @property
+    def version(self) -> Optional[int]:
+        return self.manifest.get("version")
+
+    @property
+    def feature_schema(self) -> List[str]:
+        return self.manifest["feature_schema"]
+
+    @property
+    def xgb(self) -> XGBoostModel:
+        return self._component("xgb")
+
+    @property
+    def prophet(self) -> ProphetModel:
+        return self._component("prophet")
+
+    @property
+    def garch(self) -> GarchModel:
+        return self._component("garch")
+
+    @property
+    def horizon_models(self) -> Dict[int, XGBoostModel]:
+        return {h: self._component(f"xgb_h{h}") for h in self.manifest.get("horizons", [])}
+
+    @property
+    def explainer(self) -> ModelExplainer:
+        """SHAP açıklayıcısı; ilk açıklamada kayıtlı referans verisiyle kurulur."""
+        if self._explainer is None:
+            background = self._component("background")
+            self._explainer = ModelExplainer(self.xgb.model, background["X"], feature_names=background["feature_names"])
+        return self._explainer
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        for name, component in self._components.items():
+            if name == "background":
+                joblib.dump(component, os.path.join(path, self.FILES[name]))
+            else:
+                component.save(os.path.join(path, self._file(name)))
+        if self._base is not None:
+            for name in self._names():
+                if name not in self._components:
+                    shutil.copyfile(os.path.join(self._base.path, self._file(name)), os.path.join(path, self._file(name)))
+        with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        self.path = path
+        self._base = None
+
+    def _component(self, name: str):
+        if self.path is None and self._base is not None and name not in self._components:
+            return self._base._component(name)
+        with self._lock:
+            if name not in self._components:
+                file_path = os.path.join(self.path, self._file(name))
+                if name == "background":
+                    component = joblib.load(file_path)
+                else:
+                    component = {"prophet": ProphetModel, "garch": GarchModel}.get(name, XGBoostModel)()
+                    component.load(file_path)
+                self._components[name] = component
+            return self._components[name]
+
+    def _names(self) -> List[str]:
+        return list(self.FILES) + [f"xgb_h{h}" for h in self.manifest.get("horizons", [])]
+
+    def _file(self, name: str) -> str:
+        return self.FILES.get(name, f"{name}.pkl")
+
+
+class ModelRegistry:
+    """
+    `root/<SEMBOL>/v<N>/` altında sürümlü model paketleri.
+
+    Her eğitim yeni bir sürüm dizini yazar; `LATEST` işaretçisi dizin tamamen
+    yazıldıktan sonra atomik olarak güncellenir (yarım yazılmış sürüm okunmaz).
+    Sürüm numarası dizin oluşturularak alınır ve işaretçi sadece ileri gider;
+    aynı sembolü eşzamanlı kaydeden süreçler birbirinin sürümünü ezmez.
+    Yüklenen paketler sınırlı bir LRU'da sıcak tutulur; işaretçi her istekte
+    okunur, böylece başka bir süreçte eğitilen yeni sürüm de görülür.
+    """
+    LATEST = "LATEST"
+
+    def __init__(self, root: str, max_warm: int = 32, keep_versions: int = 3, cross_asset: dict = None):
+        """
+        Args:
+            cross_asset: Yüklenen paketlerden beklenen çapraz varlık ayarı (kapalıysa None);
+                farklı ayarla eğitilmiş paketin şeması bu motorun ürettiği sütunlarla uyuşmaz.
+        """
+        self.root = root
+        self.cross_asset = cross_asset
+        self.max_warm = max_warm
+        self.keep_versions = keep_versions
+        os.makedirs(root, exist_ok=True)
+
+        self._warm = OrderedDict()  # sembol -> ModelBundle
+        self._lock = threading.Lock()
+
+    def save(self, bundle: ModelBundle) -> int:
+        """Paketi yeni sürüm olarak yazar, LATEST'i günceller ve sıcak önbelleğe alır."""
+        symbol_dir = os.path.join(self.root, bundle.symbol)
+        os.makedirs(symbol_dir, exist_ok=True)
+        version, path = self._claim_version(bundle.symbol)
+        bundle.manifest["version"] = version
+        try:
+            bundle.save(path)
+        except BaseException:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        with self._pointer_lock(symbol_dir):
+            # Daha yeni bir sürüm bu arada yayımlandıysa işaretçi geri alınmaz
+            if version > (self.latest_version(bundle.symbol) or 0):
+                pointer = os.path.join(symbol_dir, self.LATEST)
+                with open(f"{pointer}.tmp", "w", encoding="utf-8") as f:
+                    f.write(str(version))
+                os.replace(f"{pointer}.tmp", pointer)
+            self._prune(bundle.symbol)
+
+        self._remember(bundle)
+        return version
+
+    def load(self, symbol: str) -> ModelBundle:
+        """
+        Sembolün son sürümünü döner (sıcaksa diskten okumadan).
+        Raises:
+            ModelNotFoundError: Kayıt yoksa, özellik sürümü eskiyse veya çapraz varlık
+                ayarı farklıysa.
+        """
+        version = self.latest_version(symbol)
+        if version is None:
+            raise ModelNotFoundError(f"{symbol} için kayıtlı model yok.")
+
+        with self._lock:
+            bundle = self._warm.get(symbol)
+            if bundle is not None and bundle.version == version:
+                self._warm.move_to_end(symbol)
+                return bundle
+
+        path = os.path.join(self.root, symbol, f"v{version}")
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("feature_version") != FeatureEngineer.FEATURE_VERSION:
+            raise ModelNotFoundError(f"{symbol} modeli eski özellik sürümüyle eğitilmiş; yeniden eğitim gerekli.")
+        if manifest.get("cross_asset") != self.cross_asset:
+            raise ModelNotFoundError(f"{symbol} modeli farklı çapraz varlık ayarıyla eğitilmiş; yeniden eğitim gerekli.")
+
+        bundle = ModelBundle(symbol, manifest, path=path)
+        self._remember(bundle)
+        return bundle
+
+    def latest_version(self, symbol: str) -> Optional[int]:
+        try:
+            with open(os.path.join(self.root, symbol, self.LATEST), encoding="utf-8") as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def versions(self, symbol: str) -> List[int]:
+        symbol_dir = os.path.join(self.root, symbol)
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(int(name[1:]) for name in os.listdir(symbol_dir)
+                      if name.startswith("v") and name[1:].isdigit())
+
+    def symbols(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.root) if self.latest_version(name) is not None)
+
+    def evict(self, symbol: str = None) -> None:
+        """Sıcak önbellekten çıkarır (diskteki sürümlere dokunmaz)."""
+        with self._lock:
+            if symbol is None:
+                self._warm.clear()
+            else:
+                self._warm.pop(symbol, None)
+
+    def _remember(self, bundle: ModelBundle) -> None:
+        with self._lock:
+            self._warm[bundle.symbol] = bundle
+            self._warm.move_to_end(bundle.symbol)
+            while len(self._warm) > self.max_warm:
+                self._warm.popitem(last=False)
+
+    def _claim_version(self, symbol: str):
+        """Sonraki boş sürüm numarasını dizinini oluşturarak alır (os.mkdir atomiktir)."""
+        version = max(self.versions(symbol), default=0) + 1
+        while True:
+            path = os.path.join(self.root, symbol, f"v{version}")
+            try:
+                os.mkdir(path)
+                return version, path
+            except FileExistsError:
+                version += 1
+
+    @contextmanager
+    def _pointer_lock(self, symbol_dir: str, timeout: float = 30.0):
+        """İşaretçi güncellemesi ve temizlik için süreçler arası kilit (kilit dizini)."""
+        lock_dir = os.path.join(symbol_dir, f"{self.LATEST}.lock")
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                os.mkdir(lock_dir)
+                break
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    # Kritik bölüm kısadır; bu kadar bekleten kilit çöken bir süreçten kalmıştır
+                    shutil.rmtree(lock_dir, ignore_errors=True)
+                    deadline = time.monotonic() + timeout
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            shutil.rmtree(lock_dir, ignore_errors=True)
+
+    def _prune(self, symbol: str) -> None:
+        """
+        Yayımlanmış sürümlerden en yeni `keep_versions` tanesi dışındakileri siler;
+        başka bir sürecin henüz yazmakta olduğu (işaretçiden yeni) sürümlere dokunmaz.
+        """
+        latest = self.latest_version(symbol) or 0
+        published = [version for version in self.versions(symbol) if version <= latest]
+        for version in published[:-self.keep_versions]:
+            shutil.rmtree(os.path.join(self.root, symbol, f"v{version}"), ignore_errors=True)
@@ -0,0 +1,69 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List
+import pandas as pd
+from src.core.logging_setup import logger
+
+
+class PriceSource(ABC):
+    """
+    DataProcessor'ın OHLCV verisini okuduğu kaynak için arayüz.
+    Dönen her DataFrame Date/Open/High/Low/Close/Adj Close/Volume sütunlarına sahiptir.
+    """
+
+    @abstractmethod
+    def load_many(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        """Bulunan sembollerin verisini döner; verisi olmayan semboller sonuçta yer almaz."""
+        pass
+
+    def load(self, symbol: str) -> pd.DataFrame:
+        return self.load_many([symbol]).get(symbol)
+
+    def versions(self, symbols: List[str]) -> Dict[str, tuple]:
+        """
+        Sembollerin veri sürüm damgaları (önbellek anahtarı için). Veri değiştiğinde
+        damga da değişmelidir. Desteklemeyen kaynaklar boş sözlük döner.
+        """
+        return {}
+
+
+class DatabasePriceSource(PriceSource):
+    """
+    price_history tablosunu (MarketService'in doldurduğu) okur.
+    Tüm semboller tek bir toplu OHLCV sorgusuyla çekilir; veritabanına
+    ulaşılamazsa boş sonuç döner ve DataProcessor dosya deposuna düşer.
+    """
+
+    def __init__(self, session_factory: Callable = None):
+        self._session_factory = session_factory
+
+    def load_many(self, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+        frames = self._query(symbols, lambda repo: repo.get_ohlcv_many(symbols))
+
+        for symbol, df in frames.items():
+            # Veritabanındaki kapanışlar zaten düzeltilmiş fiyatlardır
+            df["Adj Close"] = df["Close"]
+            frames[symbol] = df[["Date", "Open", "High", "Low", "Close", "Adj Close", "Volume"]]
+        return frames
+
+    def versions(self, symbols: List[str]) -> Dict[str, tuple]:
+        return self._query(symbols, lambda repo: repo.get_data_versions(symbols))
+
+    def _query(self, symbols: List[str], fn: Callable) -> dict:
+        if not symbols:
+            return {}
+
+        try:
+            # Bağlantı modülü import anında motor oluşturur; ihtiyaç olana kadar bekle
+            from src.infrastructure.database.price_repository import PriceRepository
+            if self._session_factory is None:
+                from src.infrastructure.database.connection import SessionLocal
+                self._session_factory = SessionLocal
+
+            db = self._session_factory()
+            try:
+                return fn(PriceRepository(db))
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Price database unavailable, falling back to local store: {e}")
+            return {}
@@ -0,0 +1,181 @@
+import os
+import glob
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class PriceStore:
+    """
+    Sembol bazlı günlük OHLCV verisini kolon bazlı (Parquet/Arrow) formatta saklar.
+    Tarih sütunu datetime64, fiyat ve hacim sütunları float64 olarak tiplenir;
+    okuma sırasında metin ayrıştırma yapılmaz. CSV sadece içe/dışa aktarım formatıdır.
+
+    Yerleşim:
+        {symbol}.parquet          -> Ana (sıkıştırılmış) geçmiş
+        {symbol}.delta/*.parquet  -> Sadece yeni barları içeren ek parçalar (append-only)
+    Ek parça sayısı eşiği aşınca ana dosyaya birleştirilir (compaction).
+    """
+    COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+    # Türkçe başlıklı CSV <-> Standart sütun isimleri
+    CSV_COLUMN_MAP = {
+        'Tarih': 'Date', 'Açılış': 'Open', 'Yüksek': 'High',
+        'Düşük': 'Low', 'Kapanış': 'Close', 'Hacim': 'Volume',
+        'Düzeltilmiş_Kapanış': 'Adj Close'
+    }
+
+    SCHEMA = pa.schema([
+        ('Date', pa.timestamp('ns')),
+        ('Open', pa.float64()),
+        ('High', pa.float64()),
+        ('Low', pa.float64()),
+        ('Close', pa.float64()),
+        ('Adj Close', pa.float64()),
+        ('Volume', pa.float64()),
+    ])
+
+    def __init__(self, store_dir: str = "dataSets/store", memory_map: bool = True,
+                 compact_threshold: int = 30):
+        self.store_dir = store_dir
+        self.memory_map = memory_map
+        self.compact_threshold = compact_threshold
+        os.makedirs(store_dir, exist_ok=True)
+
+    def path_for(self, symbol: str) -> str:
+        return os.path.join(self.store_dir, f"{symbol}.parquet")
+
+    def delta_dir_for(self, symbol: str) -> str:
+        return os.path.join(self.store_dir, f"{symbol}.delta")
+
+    def exists(self, symbol: str) -> bool:
+        return os.path.exists(self.path_for(symbol))
+
+    def version(self, symbol: str) -> tuple:
+        """
+        Sembolün kayıtlı verisinin sürüm damgası (dosya adı, mtime, boyut).
+        Ana dosya veya ek parçalar değiştiğinde değişir; kayıt yoksa boş tuple döner.
+        """
+        stamp = []
+        for path in [self.path_for(symbol)] + self._delta_files(symbol):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stamp.append((os.path.basename(path), st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def read(self, symbol: str) -> pd.DataFrame:
+        """
+        Sembolün kayıtlı verisini (ana dosya + ek parçalar) döndürür. Kayıt yoksa None döner.
+        Aynı tarih birden fazla parçada varsa en son yazılan geçerlidir (upsert).
+        """
+        path = self.path_for(symbol)
+        if not os.path.exists(path):
+            return None
+
+        df = pq.read_table(path, memory_map=self.memory_map).to_pandas()
+
+        delta_files = self._delta_files(symbol)
+        if delta_files:
+            deltas = [pq.read_table(f, memory_map=self.memory_map).to_pandas() for f in delta_files]
+            df = pd.concat([df] + deltas, ignore_index=True)
+            df.drop_duplicates(subset=['Date'], keep='last', inplace=True)
+            df.sort_values('Date', inplace=True)
+            df.reset_index(drop=True, inplace=True)
+
+        return df
+
+    def write(self, symbol: str, df: pd.DataFrame) -> None:
+        """
+        Verinin tamamını tipli şemayla yazar ve varsa ek parçaları siler.
+        Yarım kalmış yazımların dosyayı bozmaması için önce geçici dosyaya
+        yazılıp yer değiştirilir.
+        """
+        self._write_table(self.path_for(symbol), df)
+
+        for f in self._delta_files(symbol):
+            os.remove(f)
+
+    def append(self, symbol: str, new_rows: pd.DataFrame) -> None:
+        """
+        Sadece yeni barları küçük bir ek parça olarak yazar (append/upsert).
+        Yazma maliyeti geçmişin uzunluğuna değil, yeni bar sayısına bağlıdır.
+        """
+        if new_rows is None or new_rows.empty:
+            return
+
+        if not self.exists(symbol):
+            self.write(symbol, new_rows)
+            return
+
+        delta_dir = self.delta_dir_for(symbol)
+        os.makedirs(delta_dir, exist_ok=True)
+        # Dosya adı yazım sırasını korur (okumada son yazılan kazanır)
+        self._write_table(os.path.join(delta_dir, f"part-{time.time_ns()}.parquet"), new_rows)
+
+        if len(self._delta_files(symbol)) >= self.compact_threshold:
+            self.compact(symbol)
+
+    def compact(self, symbol: str) -> None:
+        """Ek parçaları ana dosyaya birleştirir."""
+        if not self._delta_files(symbol):
+            return
+        self.write(symbol, self.read(symbol))
+
+    def _delta_files(self, symbol: str) -> list:
+        return sorted(glob.glob(os.path.join(self.delta_dir_for(symbol), "part-*.parquet")))
+
+    def _write_table(self, path: str, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(self._normalize(df), schema=self.SCHEMA, preserve_index=False)
+
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    # --- CSV İÇE / DIŞA AKTARIM ---
+    def import_csv(self, symbol: str, csv_path: str) -> pd.DataFrame:
+        """
+        Türkçe başlıklı eski CSV dosyasını okuyup kolon bazlı depoya aktarır.
+        """
+        df = pd.read_csv(csv_path, encoding='utf-8-sig')
+        df.rename(columns=self.CSV_COLUMN_MAP, inplace=True)
+        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
+
+        df = self._normalize(df)
+        self.write(symbol, df)
+        return df
+
+    def export_csv(self, symbol: str, csv_path: str) -> None:
+        """
+        Depodaki veriyi Excel/Windows uyumlu, Türkçe başlıklı CSV olarak dışa aktarır.
+        """
+        df = self.read(symbol)
+        if df is None:
+            raise FileNotFoundError(f"{symbol} için kayıtlı veri bulunamadı.")
+
+        df['Date'] = df['Date'].dt.strftime('%d/%m/%Y')
+        reverse_map = {v: k for k, v in self.CSV_COLUMN_MAP.items()}
+        df.rename(columns=reverse_map, inplace=True)
+        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+
+    def _normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sütunları şema sırasına ve tiplerine getirir, tarihe göre sıralar."""
+        data = df.copy()
+
+        # Düzeltilmiş kapanış yoksa Close'u kopyala
+        if 'Adj Close' not in data.columns and 'Close' in data.columns:
+            data['Adj Close'] = data['Close']
+
+        data = data[self.COLUMNS]
+        dates = pd.to_datetime(data['Date'])
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        data['Date'] = dates.astype('datetime64[ns]')
+        for col in self.COLUMNS[1:]:
+            data[col] = data[col].astype('float64')
+
+        data.sort_values('Date', inplace=True)
+        data.reset_index(drop=True, inplace=True)
+        return data
@@ -0,0 +1,151 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List
+from threadpoolctl import threadpool_limits
+from src.ai_core.model_registry import ModelRegistry
+from src.core.config import settings
+
+# Çalışan süreç başına bir motor (süreç başlatılırken kurulur; veri/özellik önbellekleri
+# o sürecin eğittiği semboller arasında paylaşılır)
+_worker_engine = None
+_worker_limits = None
+
+
+def _init_worker(models_dir: str, threads: int, engine_kwargs: dict) -> None:
+    global _worker_engine, _worker_limits
+    # BLAS/OpenMP havuzları (numpy, sklearn, xgboost) sürecin payıyla sınırlanır
+    _worker_limits = threadpool_limits(limits=threads)
+
+    from src.ai_core.engine import AIEngine
+    _worker_engine = AIEngine(models_dir=models_dir, n_jobs=threads, **engine_kwargs)
+
+
+def _train_symbol(symbol: str):
+    started = time.perf_counter()
+    bundle = _worker_engine.train_full_pipeline(symbol)
+    return bundle.version, time.perf_counter() - started
+
+
+class TrainingOrchestrator:
+    """
+    Çok sayıda sembolü bir süreç havuzunda eğitir.
+
+    Küresel CPU bütçesi süreçlere bölünür: her süreç `bütçe // süreç` iş parçacığı
+    kullanır (XGBoost n_jobs ve threadpoolctl ile BLAS/OpenMP sınırı). Böylece her
+    kütüphanenin tüm çekirdekleri istediği aşırı abonelik olmaz. Prophet/Stan tek
+    iş parçacıklı olduğundan varsayılan olarak çekirdek başına bir süreç açılır.
+
+    Modeller ModelRegistry'e yazılır (her sembol ayrı dizin; süreçler çakışmaz).
+    İlerleme bir kontrol noktası (JSON) dosyasına her sembolden sonra yazılır; yarıda
+    kalan veya hata alan bir çalıştırma tekrarlandığında tamamlanan semboller atlanır.
+    """
+
+    def __init__(self, models_dir: str = "models", cpu_budget: int = None, workers: int = None,
+                 checkpoint_path: str = None, **engine_kwargs):
+        """
+        Args:
+            cpu_budget: Toplam çekirdek sayısı; None -> settings.TRAIN_CPU_BUDGET (0 -> tümü).
+            workers: Süreç sayısı; None -> settings.TRAIN_WORKERS (0 -> bütçe kadar,
+                sembol sayısıyla sınırlı).
+            checkpoint_path: Kontrol noktası dosyası; None -> models_dir/training_checkpoint.json.
+            engine_kwargs: Her süreçteki AIEngine'e iletilir (ör. feature_columns, horizons).
+        """
+        self.models_dir = models_dir
+        self.cpu_budget = cpu_budget or settings.TRAIN_CPU_BUDGET or os.cpu_count() or 1
+        self.workers = workers or settings.TRAIN_WORKERS or None
+        self.checkpoint_path = checkpoint_path or os.path.join(models_dir, "training_checkpoint.json")
+        self.engine_kwargs = engine_kwargs
+        self.registry = ModelRegistry(os.path.join(models_dir, "registry"))
+
+    def plan(self, n_symbols: int):
+        """(süreç sayısı, süreç başına iş parçacığı)"""
+        workers = min(self.workers or self.cpu_budget, self.cpu_budget, max(n_symbols, 1))
+        return workers, max(1, self.cpu_budget // workers)
+
+    def run(self, symbols: List[str], resume: bool = True) -> Dict:
+        """
+        Sembolleri paralel eğitir.
+
+        Args:
+            resume: Kontrol noktasında tamamlanmış (ve kayıtta bulunan) sembolleri atlar.
+        Returns:
+            dict: trained {sembol: sürüm}, failed {sembol: hata}, skipped, elapsed,
+            symbols_per_min ve sembol başına eğitim süresi (seconds).
+        """
+        symbols = list(dict.fromkeys(symbols))
+        checkpoint = self._read_checkpoint() if resume else {"completed": {}, "failed": {}}
+        skipped = [s for s in symbols if s in checkpoint["completed"] and self.registry.latest_version(s) is not None]
+        pending = [s for s in symbols if s not in skipped]
+        checkpoint["completed"] = {s: checkpoint["completed"][s] for s in skipped}
+        checkpoint["failed"] = {}
+
+        workers, threads = self.plan(len(pending))
+        print(f"🚀 {len(pending)} sembol eğitilecek ({len(skipped)} atlandı): "
+              f"{workers} süreç x {threads} iş parçacığı")
+
+        trained, failed, seconds = {}, {}, {}
+        started = time.perf_counter()
+        if pending:
+            # spawn: ebeveyndeki iş parçacığı havuzları (OpenMP vb.) çocuklara kopyalanmaz
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(self.models_dir, threads, self.engine_kwargs)) as pool:
+                futures = {pool.submit(_train_symbol, symbol): symbol for symbol in pending}
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    try:
+                        version, seconds[symbol] = future.result()
+                        trained[symbol] = checkpoint["completed"][symbol] = version
+                    except BrokenProcessPool as e:
+                        failed[symbol] = checkpoint["failed"][symbol] = f"Süreç çöktü: {e}"
+                    except Exception as e:
+                        failed[symbol] = checkpoint["failed"][symbol] = str(e)
+
+                    # Tek yazıcı: kontrol noktası her sembolden sonra atomik olarak güncellenir
+                    self._write_checkpoint(checkpoint)
+                    done = len(trained) + len(failed)
+                    rate = done / (time.perf_counter() - started) * 60
+                    print(f"   [{done}/{len(pending)}] {symbol}: "
+                          f"{'✅' if symbol in trained else '❌ ' + failed[symbol]} ({rate:.1f} sembol/dk)")
+
+        elapsed = time.perf_counter() - started
+        if not failed:
+            # Çalıştırma tamamlandı; bir sonraki çalıştırma her şeyi yeniden eğitir
+            self.clear_checkpoint()
+
+        summary = {
+            "trained": trained,
+            "failed": failed,
+            "skipped": skipped,
+            "workers": workers,
+            "threads_per_worker": threads,
+            "elapsed": elapsed,
+            "symbols_per_min": len(trained) / elapsed * 60 if trained else 0.0,
+            "seconds": seconds,
+        }
+        print(f"✅ {len(trained)} sembol eğitildi, {len(failed)} hata; "
+              f"{summary['symbols_per_min']:.1f} sembol/dk ({elapsed:.1f} sn)")
+        return summary
+
+    def clear_checkpoint(self) -> None:
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _read_checkpoint(self) -> dict:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, ValueError):
+            checkpoint = {}
+        return {"completed": checkpoint.get("completed", {}), "failed": checkpoint.get("failed", {})}
+
+    def _write_checkpoint(self, checkpoint: dict) -> None:
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
@@ -1,8 +1,17 @@
-from datetime import date, timedelta
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from src.infrastructure.database.models import Security, PriceHistory
+from sqlalchemy import and_, select, insert, update, func
+from src.ai_core.frame_cache import invalidate_frame_caches
+from src.infrastructure.database.models import Security, PriceHistory, LatestQuote
 from src.infrastructure.external_services.market_data_provider import MarketDataProvider
+from src.infrastructure.external_services.rate_limiter import RateLimiter
+from src.core.config import settings
+from src.core.trading_calendar import bist_calendar
 from src.core.logging_setup import logger
 
 class MarketService:
@@ -10,9 +19,11 @@ class MarketService:
     Application service that coordinates fetching data from the provider
     and saving it to the database.
     """
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, provider: MarketDataProvider = None):
         self.db = db
-        self.provider = MarketDataProvider()
+        self.provider = provider or MarketDataProvider()
+        self.rate_limiter = RateLimiter(settings.MARKET_FETCH_RATE)
+        self.calendar = bist_calendar
 
     def get_ticker_info(self, symbol: str):
         return self.provider.get_current_price(symbol)
@@ -22,90 +33,260 @@ class MarketService:
         Fetches data for the symbol and updates the PriceHistory table.
         """
         # 1. Get or Create Security
+        security = self._get_or_create_security(symbol)
+
+        # 2. Determine Fetch Period
+        fetch_period = self._get_fetch_period(security)
+        if fetch_period is None:
+            logger.info(f"{symbol} is up to date, skipping fetch.")
+            quote = self.db.get(LatestQuote, security.id)
+            return float(quote.last_close) if quote else None
+        logger.info(f"Fetching data for {symbol} (Period: {fetch_period})...")
+
+        # 3. Fetch Data
+        hist = self.provider.get_history(symbol, period=fetch_period)
+
+        # 4. Write to DB
+        return self._write_history(security, hist, fetch_period)
+
+    def update_all_tickers(self, max_workers: int = None, batch_size: int = None) -> Dict[str, Any]:
+        """
+        Updates all securities currently in the database.
+
+        Fetching runs concurrently: securities are grouped by fetch period, split
+        into multi-ticker batches and downloaded by a bounded thread pool behind a
+        shared rate limiter. This thread stays the only DB writer and commits in
+        batches, so the whole refresh takes roughly as long as the slowest fetch.
+
+        Returns a summary with per-symbol fetch/write latency.
+        """
+        max_workers = max_workers or settings.MARKET_FETCH_WORKERS
+        batch_size = batch_size or settings.MARKET_BATCH_SIZE
+        started = time.perf_counter()
+
+        securities = self.db.query(Security).all()
+        logger.info(f"--- Updating Market Data ({len(securities)} Securities) ---")
+
+        groups = defaultdict(list)
+        for sec in securities:
+            groups[self._get_fetch_period(sec)].append(sec)
+
+        # Securities that already hold the last completed session need no network call
+        skipped = groups.pop(None, [])
+        if skipped:
+            logger.info(f"{len(skipped)} securities already up to date, skipping fetch.")
+
+        jobs = []
+        for fetch_period, group in groups.items():
+            for i in range(0, len(group), batch_size):
+                jobs.append((fetch_period, group[i:i + batch_size]))
+
+        latency = {}
+        pending_commit = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(self._fetch_batch, [sec.symbol for sec in chunk], fetch_period): (fetch_period, chunk)
+                for fetch_period, chunk in jobs
+            }
+
+            # Single writer: results are written here as soon as each batch arrives
+            for future in as_completed(futures):
+                fetch_period, chunk = futures[future]
+                frames, fetch_seconds = future.result()
+
+                for sec in chunk:
+                    write_started = time.perf_counter()
+                    self._write_history(sec, frames.get(sec.symbol, pd.DataFrame()), fetch_period, commit=False)
+                    latency[sec.symbol] = {
+                        "fetch": fetch_seconds,
+                        "write": time.perf_counter() - write_started
+                    }
+
+                    pending_commit.append(sec.symbol)
+                    if len(pending_commit) >= settings.MARKET_COMMIT_EVERY:
+                        self._commit_written(pending_commit)
+                        pending_commit = []
+
+        self._commit_written(pending_commit)
+
+        summary = {
+            "symbols": len(securities),
+            "skipped": len(skipped),
+            "requests": len(jobs),
+            "elapsed": time.perf_counter() - started,
+            "latency": latency,
+            "slowest": max(latency, key=lambda s: latency[s]["fetch"] + latency[s]["write"]) if latency else None,
+            "cache": self.provider.cache.stats() if getattr(self.provider, "cache", None) else None
+        }
+        self._log_refresh_summary(summary)
+        logger.info("--- Update Completed ---")
+        return summary
+
+    def _fetch_batch(self, symbols: List[str], fetch_period: str):
+        """Runs on a worker thread: fetches one batch, never touches the DB session."""
+        self.rate_limiter.acquire()
+        started = time.perf_counter()
+        logger.info(f"Fetching data for {len(symbols)} symbols (Period: {fetch_period})...")
+        try:
+            frames = self.provider.get_history_many(symbols, period=fetch_period)
+        except Exception as e:
+            logger.error(f"Error fetching batch {symbols}: {e}")
+            frames = {}
+        return frames, time.perf_counter() - started
+
+    def _commit_written(self, symbols: List[str]) -> None:
+        """Commits the batch and drops in-process cached frames of the written symbols."""
+        self.db.commit()
+        invalidate_frame_caches(symbols)
+
+    def _refresh_latest_quote(self, security: Security) -> None:
+        """
+        Keeps latest_quotes in sync with price_history so portfolio pages can read
+        last/previous close with a single join instead of one ordered scan per holding.
+        updated_at is bumped on every write (even when the last two closes are unchanged)
+        because it doubles as the cache version stamp of the security's history.
+        """
+        last_two = self.db.execute(
+            select(PriceHistory.date, PriceHistory.close_price)
+            .where(PriceHistory.security_id == security.id)
+            .order_by(PriceHistory.date.desc())
+            .limit(2)
+        ).all()
+        if not last_two:
+            return
+
+        quote = self.db.get(LatestQuote, security.id)
+        if quote is None:
+            quote = LatestQuote(security_id=security.id)
+            self.db.add(quote)
+
+        quote.last_close = last_two[0].close_price
+        quote.prev_close = last_two[1].close_price if len(last_two) > 1 else None
+        quote.as_of_date = last_two[0].date
+        quote.updated_at = datetime.now()
+
+    def _log_refresh_summary(self, summary: Dict[str, Any]) -> None:
+        logger.info(
+            f"Refresh summary: {summary['symbols']} symbols ({summary['skipped']} up to date), {summary['requests']} requests, "
+            f"{summary['elapsed']:.2f}s total"
+        )
+        if summary.get("cache"):
+            cache = summary["cache"]
+            logger.info(f"Response cache: {cache['hits']} hits / {cache['misses']} misses ({cache['hit_rate']:.0%})")
+        for symbol, lat in sorted(summary["latency"].items(), key=lambda x: -(x[1]["fetch"] + x[1]["write"])):
+            logger.info(f"  {symbol:<10} fetch {lat['fetch']:.2f}s  write {lat['write']:.3f}s")
+
+    def _get_or_create_security(self, symbol: str) -> Security:
         security = self.db.query(Security).filter(Security.symbol == symbol).first()
         if not security:
             security = Security(symbol=symbol, name=symbol)
             self.db.add(security)
             self.db.commit()
             logger.info(f"New security defined: {symbol}")
+        return security
 
-        # 2. Determine Fetch Period
-        existing_count = self.db.query(PriceHistory).filter(
-            PriceHistory.security_id == security.id
-        ).count()
+    def _get_fetch_period(self, security: Security) -> Optional[str]:
+        """
+        Returns the yfinance period to fetch, or None when the stored history
+        already contains the last completed BIST session (weekends, holidays
+        and pre-close hours then cost no network call).
+        """
+        existing_count, last_date = self.db.execute(
+            select(func.count(), func.max(PriceHistory.date)).where(
+                PriceHistory.security_id == security.id
+            )
+        ).one()
 
-        # If data is scarce (new stock), fetch 2 years, otherwise last 5 days
-        fetch_period = "2y" if existing_count < 200 else "5d"
-        logger.info(f"Fetching data for {symbol} (Period: {fetch_period})...")
+        # If data is scarce (new stock), fetch 2 years
+        if existing_count < 200:
+            return "2y"
 
-        # 3. Fetch Data
-        hist = self.provider.get_history(symbol, period=fetch_period)
-        
-        if hist.empty:
+        if self.calendar.is_up_to_date(last_date):
+            return None
+
+        # Otherwise catch up with the last 5 days
+        return "5d"
+
+    def _write_history(self, security: Security, hist: pd.DataFrame, fetch_period: str, commit: bool = True):
+        """
+        Writes fetched bars for a security into PriceHistory.
+        With commit=False the rows are written inside a savepoint and left for the
+        caller to commit, so a failing symbol does not discard the rest of the batch.
+        Bars dated after the last completed session (today's bar before the close)
+        are dropped: stored history would otherwise count as up to date and the
+        partial close would never be refreshed.
+        Returns the last close price, or None if nothing could be written.
+        """
+        symbol = security.symbol
+        if hist is None or hist.empty:
             logger.warning(f"No data returned for {symbol}")
             return None
-        
-        # 4. Write to DB
-        added_count = 0
-        updated_count = 0
 
+        hist = hist[hist.index.date <= self.calendar.last_completed_session()]
+        if hist.empty:
+            logger.info(f"{symbol}: only an unfinished session returned, nothing to write.")
+            quote = self.db.get(LatestQuote, security.id)
+            return float(quote.last_close) if quote else None
+
+        savepoint = None if commit else self.db.begin_nested()
         try:
-            for index, row in hist.iterrows():
-                date_val = index.date()
-                
-                # Check if record exists
-                existing_record = self.db.query(PriceHistory).filter(
+            bars = pd.DataFrame({
+                "date": hist.index.date,
+                "open_price": hist["Open"].astype(float).values,
+                "high_price": hist["High"].astype(float).values,
+                "low_price": hist["Low"].astype(float).values,
+                "close_price": hist["Close"].astype(float).values,
+                "volume": hist["Volume"].astype("int64").values
+            })
+
+            # One query for every stored date in the fetched range
+            existing_ids = dict(self.db.execute(
+                select(PriceHistory.date, PriceHistory.id).where(
                     and_(
                         PriceHistory.security_id == security.id,
-                        PriceHistory.date == date_val
+                        PriceHistory.date.between(bars["date"].min(), bars["date"].max())
                     )
-                ).first()
-
-                if existing_record:
-                    # Update if it's today or we are in short catch-up mode
-                    if date_val == date.today() or fetch_period == "5d":
-                        existing_record.close_price = float(row["Close"])
-                        existing_record.high_price = float(row["High"])
-                        existing_record.low_price = float(row["Low"])
-                        existing_record.open_price = float(row["Open"])
-                        existing_record.volume = int(row["Volume"])
-                        updated_count += 1
-                else:
-                    new_price = PriceHistory(
-                        security_id=security.id,
-                        date=date_val,
-                        open_price=float(row["Open"]),
-                        high_price=float(row["High"]),
-                        low_price=float(row["Low"]),
-                        close_price=float(row["Close"]),
-                        volume=int(row["Volume"])
-                    )
-                    self.db.add(new_price)
-                    added_count += 1
+                )
+            ).all())
 
-            self.db.commit()
+            # Vectorized diff: unseen dates are inserted; stored ones are refreshed
+            # only if it's today or we are in short catch-up mode
+            is_existing = bars["date"].isin(existing_ids.keys())
+            new_rows = bars[~is_existing].assign(security_id=security.id)
+            if fetch_period == "5d":
+                changed_rows = bars[is_existing]
+            else:
+                changed_rows = bars[is_existing & (bars["date"] == date.today())]
+            changed_rows = changed_rows.assign(id=changed_rows["date"].map(existing_ids)).drop(columns=["date"])
+
+            if not new_rows.empty:
+                self.db.execute(insert(PriceHistory), new_rows.to_dict("records"))
+            if not changed_rows.empty:
+                # ORM bulk UPDATE by primary key (executemany)
+                self.db.execute(update(PriceHistory), changed_rows.to_dict("records"))
+
+            added_count = len(new_rows)
+            updated_count = len(changed_rows)
+
+            self._refresh_latest_quote(security)
+
+            if savepoint is None:
+                self._commit_written([symbol])
+            else:
+                savepoint.commit()
             
             last_price = hist["Close"].iloc[-1]
             logger.info(f"{symbol}: {added_count} new, {updated_count} updated. Last Price: {last_price:.2f}")
             return last_price
 
         except Exception as e:
-            self.db.rollback()
+            if savepoint is None:
+                self.db.rollback()
+            else:
+                savepoint.rollback()
             logger.error(f"Error updating {symbol}: {e}")
             return None
 
-    def update_all_tickers(self):
-        """
-        Updates all securities currently in the database.
-        """
-        securities = self.db.query(Security).all()
-        logger.info(f"--- Updating Market Data ({len(securities)} Securities) ---")
-        
-        for sec in securities:
-            self.update_price_history(sec.symbol)
-            
-        logger.info("--- Update Completed ---")
-
     def validate_symbol_date(self, symbol: str, target_date: date):
         """
         Checks if data exists for the symbol around the target date.
@@ -14,6 +14,31 @@ class Settings:
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_NAME: str = os.getenv("DB_NAME", "yatirim_db")
     
+    # Market data refresh
+    MARKET_FETCH_WORKERS: int = int(os.getenv("MARKET_FETCH_WORKERS", "4"))
+    MARKET_FETCH_RATE: float = float(os.getenv("MARKET_FETCH_RATE", "2.0"))  # requests per second
+    MARKET_BATCH_SIZE: int = int(os.getenv("MARKET_BATCH_SIZE", "20"))  # symbols per request
+    MARKET_COMMIT_EVERY: int = int(os.getenv("MARKET_COMMIT_EVERY", "10"))  # symbols per DB commit
+    MARKET_CACHE_ENABLED: bool = os.getenv("MARKET_CACHE_ENABLED", "1") == "1"
+    MARKET_CACHE_PATH: str = os.getenv("MARKET_CACHE_PATH", "dataSets/cache/market_responses.sqlite")
+    
+    # AI pipeline price source: "db" (price_history, falls back to local files) or "file"
+    AI_PRICE_SOURCE: str = os.getenv("AI_PRICE_SOURCE", "db")
+    FRAME_CACHE_MAX_ENTRIES: int = int(os.getenv("FRAME_CACHE_MAX_ENTRIES", "64"))
+    FRAME_CACHE_MAX_MB: int = int(os.getenv("FRAME_CACHE_MAX_MB", "256"))
+    FRAME_CACHE_VERSION_TTL: float = float(os.getenv("FRAME_CACHE_VERSION_TTL", "30"))  # seconds without re-checking data version
+    FEATURE_ENGINE: str = os.getenv("FEATURE_ENGINE", "ta")  # "ta" or "numpy" (vectorized/numba kernels)
+    FEATURE_COMPACT: bool = os.getenv("FEATURE_COMPACT", "0") == "1"  # float32 feature matrices, ndarray model inputs
+    CROSS_ASSET_FEATURES: bool = os.getenv("CROSS_ASSET_FEATURES", "0") == "1"  # BIST100 / USDTRY / sector returns
+    CROSS_ASSET_TTL: float = float(os.getenv("CROSS_ASSET_TTL", "600"))  # seconds reference series are reused
+    SECTOR_BASKETS_PATH: str = os.getenv("SECTOR_BASKETS_PATH", "dataSets/sectors.json")  # {"sector": ["SYM", ...]}
+    AI_HORIZONS: tuple = tuple(int(h) for h in os.getenv("AI_HORIZONS", "").split(",") if h.strip())  # return models (bars ahead), e.g. "1,5,20"
+    TRAIN_CPU_BUDGET: int = int(os.getenv("TRAIN_CPU_BUDGET", "0"))  # cores for batch training; 0 = all
+    TRAIN_WORKERS: int = int(os.getenv("TRAIN_WORKERS", "0"))  # training processes; 0 = one per core (capped by symbols)
+    XGB_UPDATE_WINDOW: int = int(os.getenv("XGB_UPDATE_WINDOW", "250"))  # recent rows used by incremental updates
+    XGB_UPDATE_ROUNDS: int = int(os.getenv("XGB_UPDATE_ROUNDS", "10"))  # boosting rounds added per update
+    XGB_REFIT_AFTER: int = int(os.getenv("XGB_REFIT_AFTER", "20"))  # incremental updates before a full refit
+    
     @property
     def DATABASE_URL(self) -> str:
         return f"mysql+mysqlconnector://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}/{self.DB_NAME}"
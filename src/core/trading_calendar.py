@@ -0,0 +1,46 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+import holidays
+
+
+class BistCalendar:
+    """
+    Borsa Istanbul trading calendar.
+    Knows weekends and Turkish public holidays (via the `holidays` package, the
+    same source Prophet uses) and treats a day's bar as complete only after the
+    closing session has ended.
+    """
+    TIMEZONE = ZoneInfo("Europe/Istanbul")
+    SESSION_CLOSE = time(18, 10)  # Continuous trading ends 18:00, closing auction ~18:10
+
+    def __init__(self, session_close: time = None):
+        self.session_close = session_close or self.SESSION_CLOSE
+        self._holidays = holidays.Turkey()  # Years are expanded lazily on lookup
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self._holidays
+
+    def previous_trading_day(self, day: date) -> date:
+        """Latest trading day strictly before `day`."""
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    def last_completed_session(self, now: datetime = None) -> date:
+        """Date of the most recent session whose closing price is final."""
+        now = now.astimezone(self.TIMEZONE) if now and now.tzinfo else (now or datetime.now(self.TIMEZONE))
+        today = now.date()
+
+        if self.is_trading_day(today) and now.time() >= self.session_close:
+            return today
+        return self.previous_trading_day(today)
+
+    def is_up_to_date(self, last_date: date, now: datetime = None) -> bool:
+        """True when stored data already contains the last completed session."""
+        if isinstance(last_date, datetime):
+            last_date = last_date.date()
+        return last_date >= self.last_completed_session(now)
+
+
+bist_calendar = BistCalendar()
@@ -17,7 +17,9 @@ def get_db():
         db.close()
 
 def init_db():
-    """Initializes the database by creating all tables"""
+    """Initializes the database by creating all tables and applying pending index migrations"""
     # Import models to ensure they are registered with Base.metadata
     from src.infrastructure.database import models
+    from src.infrastructure.database.migrations import apply_schema_migrations
     Base.metadata.create_all(bind=engine)
+    apply_schema_migrations(engine, Base.metadata)
@@ -0,0 +1,82 @@
+from sqlalchemy import inspect, select, delete, func, and_
+from sqlalchemy.engine import Engine
+from src.core.logging_setup import logger
+
+
+def apply_schema_migrations(engine: Engine, metadata) -> None:
+    """
+    Lightweight schema migration: creates indexes declared on the models that
+    are missing from an existing database (create_all only adds them to new tables).
+    Duplicate rows are removed before a unique index is created.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        existing_indexes |= {uc["name"] for uc in inspector.get_unique_constraints(table.name)}
+
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+
+            with engine.begin() as conn:
+                if index.unique:
+                    removed = _remove_duplicates(conn, table, list(index.columns))
+                    if removed:
+                        logger.warning(f"Removed {removed} duplicate rows from {table.name} before adding {index.name}")
+                index.create(bind=conn)
+            logger.info(f"Schema migration: created index {index.name} on {table.name}")
+
+    _backfill_latest_quotes(engine, metadata)
+
+
+def _backfill_latest_quotes(engine: Engine, metadata) -> None:
+    """Fills latest_quotes once from price_history for databases created before the table existed."""
+    quotes = metadata.tables["latest_quotes"]
+    prices = metadata.tables["price_history"]
+
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(quotes)).scalar():
+            return
+
+        rows = []
+        security_ids = conn.execute(select(prices.c.security_id).distinct()).scalars().all()
+        for security_id in security_ids:
+            last_two = conn.execute(
+                select(prices.c.date, prices.c.close_price)
+                .where(prices.c.security_id == security_id)
+                .order_by(prices.c.date.desc())
+                .limit(2)
+            ).all()
+            rows.append({
+                "security_id": security_id,
+                "last_close": last_two[0].close_price,
+                "prev_close": last_two[1].close_price if len(last_two) > 1 else None,
+                "as_of_date": last_two[0].date
+            })
+
+        if rows:
+            conn.execute(quotes.insert(), rows)
+            logger.info(f"Schema migration: backfilled latest_quotes for {len(rows)} securities")
+
+
+def _remove_duplicates(conn, table, columns) -> int:
+    """Keeps the newest row (highest primary key) of every duplicate group."""
+    pk = list(table.primary_key.columns)[0]
+
+    duplicates = conn.execute(
+        select(*columns, func.max(pk).label("keep_id"))
+        .group_by(*columns)
+        .having(func.count() > 1)
+    ).all()
+
+    removed = 0
+    for row in duplicates:
+        conditions = [col == row[i] for i, col in enumerate(columns)]
+        result = conn.execute(delete(table).where(and_(*conditions, pk != row.keep_id)))
+        removed += result.rowcount
+    return removed
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Enum, DECIMAL, Text, Float, Integer
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, Enum, DECIMAL, Text, Float, Integer, Index
 from sqlalchemy.dialects.mysql import BIGINT
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -38,11 +38,17 @@ class Security(Base):
 
     # Relations
     prices = relationship("PriceHistory", back_populates="security")
+    latest_quote = relationship("LatestQuote", back_populates="security", uselist=False)
     predictions = relationship("AiPrediction", back_populates="security")
 
 # --- 3. PRICE HISTORY ---
 class PriceHistory(Base):
     __tablename__ = 'price_history'
+    __table_args__ = (
+        # One bar per security per day; also serves latest-price / as-of lookups
+        # (security_id = ? ORDER BY date DESC) as an index seek
+        Index('uq_price_history_security_date', 'security_id', 'date', unique=True),
+    )
     
     id = Column(BIGINT(unsigned=True), primary_key=True)
     security_id = Column(Integer, ForeignKey('securities.id'), nullable=False)
@@ -55,9 +61,26 @@ class PriceHistory(Base):
 
     security = relationship("Security", back_populates="prices")
 
+# --- 3b. LATEST QUOTES ---
+class LatestQuote(Base):
+    """Last and previous close per security, maintained by MarketService ingestion."""
+    __tablename__ = 'latest_quotes'
+
+    security_id = Column(Integer, ForeignKey('securities.id'), primary_key=True)
+    last_close = Column(DECIMAL(10, 4), nullable=False)
+    prev_close = Column(DECIMAL(10, 4))
+    as_of_date = Column(Date, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    security = relationship("Security", back_populates="latest_quote")
+
 # --- 4. TRANSACTIONS ---
 class Transaction(Base):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Historical balance checks filter by (user, security, side) up to a trade date
+        Index('ix_transactions_user_security_side_date', 'user_id', 'security_id', 'side', 'trade_date'),
+    )
     
     id = Column(BIGINT(unsigned=True), primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,161 @@
+from datetime import date
+from typing import Dict, List
+import pandas as pd
+from sqlalchemy import select, func, type_coerce, Float
+from sqlalchemy.orm import Session
+from src.infrastructure.database.models import Security, PriceHistory, LatestQuote
+
+
+class PriceRepository:
+    """
+    Read-side access to price_history.
+    Every call issues a single Core SELECT and builds the pandas result directly
+    from the row tuples, without hydrating ORM objects. DECIMAL columns are
+    coerced to float by the driver layer.
+    """
+    OHLCV_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_close_matrix(self, symbols: List[str], start: date = None, end: date = None,
+                         last_n: int = None) -> pd.DataFrame:
+        """
+        Returns a wide close-price matrix (index: date, columns: symbol, float64).
+        `last_n` keeps only the most recent N bars of each symbol (window function,
+        requires MySQL 8+ / SQLite 3.25+).
+        """
+        if not symbols:
+            return pd.DataFrame()
+
+        close = type_coerce(PriceHistory.close_price, Float).label("close")
+        stmt = select(Security.symbol, PriceHistory.date, close).join(
+            Security, Security.id == PriceHistory.security_id
+        ).where(Security.symbol.in_(symbols))
+        stmt = self._apply_date_range(stmt, start, end)
+
+        if last_n:
+            rank = func.row_number().over(
+                partition_by=PriceHistory.security_id,
+                order_by=PriceHistory.date.desc()
+            ).label("rn")
+            ranked = stmt.add_columns(rank).subquery()
+            stmt = select(ranked.c.symbol, ranked.c.date, ranked.c.close).where(ranked.c.rn <= last_n)
+
+        rows = self.db.execute(stmt).all()
+        if not rows:
+            return pd.DataFrame()
+
+        long_df = pd.DataFrame.from_records(rows, columns=["symbol", "date", "close"])
+        wide = long_df.pivot(index="date", columns="symbol", values="close")
+        wide.index = pd.to_datetime(wide.index)
+        wide.index.name = None
+        wide.columns.name = None
+        wide.sort_index(inplace=True)
+
+        # Keep the caller's symbol order
+        return wide[[s for s in symbols if s in wide.columns]].astype("float64")
+
+    def get_ohlcv(self, symbol: str, start: date = None, end: date = None) -> pd.DataFrame:
+        """
+        Returns daily bars for one symbol in ascending date order with
+        Date/Open/High/Low/Close/Volume columns (float64, NaN for missing values).
+        """
+        stmt = select(
+            PriceHistory.date,
+            type_coerce(PriceHistory.open_price, Float),
+            type_coerce(PriceHistory.high_price, Float),
+            type_coerce(PriceHistory.low_price, Float),
+            type_coerce(PriceHistory.close_price, Float),
+            PriceHistory.volume,
+        ).join(
+            Security, Security.id == PriceHistory.security_id
+        ).where(Security.symbol == symbol).order_by(PriceHistory.date.asc())
+        stmt = self._apply_date_range(stmt, start, end)
+
+        rows = self.db.execute(stmt).all()
+        return self._to_ohlcv_frame(rows)
+
+    def get_ohlcv_many(self, symbols: List[str], start: date = None, end: date = None) -> Dict[str, pd.DataFrame]:
+        """
+        Same as get_ohlcv for several symbols in one SELECT.
+        Symbols without any bars are left out of the result.
+        """
+        if not symbols:
+            return {}
+
+        stmt = select(
+            Security.symbol,
+            PriceHistory.date,
+            type_coerce(PriceHistory.open_price, Float),
+            type_coerce(PriceHistory.high_price, Float),
+            type_coerce(PriceHistory.low_price, Float),
+            type_coerce(PriceHistory.close_price, Float),
+            PriceHistory.volume,
+        ).join(
+            Security, Security.id == PriceHistory.security_id
+        ).where(Security.symbol.in_(symbols)).order_by(Security.symbol, PriceHistory.date.asc())
+        stmt = self._apply_date_range(stmt, start, end)
+
+        rows = self.db.execute(stmt).all()
+        if not rows:
+            return {}
+
+        long_df = self._to_ohlcv_frame([row[1:] for row in rows])
+        long_df["symbol"] = [row[0] for row in rows]
+        return {
+            symbol: group.drop(columns="symbol").reset_index(drop=True)
+            for symbol, group in long_df.groupby("symbol", sort=False)
+        }
+
+    def get_data_versions(self, symbols: List[str]) -> Dict[str, tuple]:
+        """
+        Returns a per-symbol stamp that changes whenever the symbol's bars are written,
+        so it can key caches.
+
+        MarketService refreshes latest_quotes (and its updated_at) on every write to a
+        security's history, so the stamp is one primary-key row per symbol instead of
+        an aggregate over the whole history. Symbols without a latest_quotes row fall
+        back to (last_date, row_count, close_sum, volume_sum) from price_history.
+        """
+        if not symbols:
+            return {}
+
+        quotes = select(
+            Security.symbol, LatestQuote.as_of_date, LatestQuote.updated_at, LatestQuote.last_close
+        ).join(
+            LatestQuote, LatestQuote.security_id == Security.id
+        ).where(Security.symbol.in_(symbols))
+        stamps = {symbol: ("quote",) + tuple(stamp) for symbol, *stamp in self.db.execute(quotes).all()}
+
+        missing = [symbol for symbol in symbols if symbol not in stamps]
+        if not missing:
+            return stamps
+
+        stmt = select(
+            Security.symbol,
+            func.max(PriceHistory.date),
+            func.count(PriceHistory.id),
+            func.sum(PriceHistory.close_price),
+            func.sum(PriceHistory.volume),
+        ).join(
+            Security, Security.id == PriceHistory.security_id
+        ).where(Security.symbol.in_(missing)).group_by(Security.symbol)
+
+        stamps.update({symbol: tuple(stamp) for symbol, *stamp in self.db.execute(stmt).all()})
+        return stamps
+
+    def _to_ohlcv_frame(self, rows) -> pd.DataFrame:
+        df = pd.DataFrame.from_records(rows, columns=self.OHLCV_COLUMNS)
+        df["Date"] = pd.to_datetime(df["Date"])
+        for col in self.OHLCV_COLUMNS[1:]:
+            df[col] = df[col].astype("float64")
+        return df
+
+    @staticmethod
+    def _apply_date_range(stmt, start: date, end: date):
+        if start is not None:
+            stmt = stmt.where(PriceHistory.date >= start)
+        if end is not None:
+            stmt = stmt.where(PriceHistory.date <= end)
+        return stmt
@@ -1,17 +1,44 @@
 import yfinance as yf
-from datetime import date, timedelta
-from typing import Optional, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Callable
 import pandas as pd
+from src.core.config import settings
 from src.core.logging_setup import logger
+from src.core.trading_calendar import bist_calendar
+from src.infrastructure.external_services.response_cache import ResponseCache, get_default_cache
 
 class MarketDataProvider:
     """
     Infrastructure service for fetching market data using yfinance.
+    Responses go through a persistent TTL cache (see ResponseCache) so repeated
+    lookups within the TTL never touch the network.
     """
-    
-    @staticmethod
-    def _normalize_symbol(symbol: str) -> str:
-        if ".IS" in symbol or symbol == "USDTRY":
+
+    def __init__(self, cache: ResponseCache = None):
+        if cache is None and settings.MARKET_CACHE_ENABLED:
+            cache = get_default_cache()
+        self.cache = cache
+
+    def _cached(self, endpoint: str, key_parts: tuple, fetch_fn: Callable[[], Any], ttl: int = None) -> Any:
+        if self.cache is None:
+            return fetch_fn()
+        return self.cache.get_or_fetch(endpoint, key_parts, fetch_fn, ttl=ttl)
+
+    def _history_ttl(self, end: date) -> Optional[int]:
+        # A range that ends before today can no longer change
+        if self.cache is not None and end is not None and end <= datetime.now(bist_calendar.TIMEZONE).date():
+            return self.cache.ttls["history_closed"]
+        return None
+
+    # Non-equity references used by the AI pipeline (cross-asset features)
+    YAHOO_ALIASES = {"USDTRY": "USDTRY=X"}
+
+    @classmethod
+    def _normalize_symbol(cls, symbol: str) -> str:
+        if symbol in cls.YAHOO_ALIASES:
+            return cls.YAHOO_ALIASES[symbol]
+        # Already a Yahoo ticker (BIST suffix, FX pair or index)
+        if ".IS" in symbol or "=" in symbol or symbol.startswith("^"):
             return symbol
         return f"{symbol}.IS"
 
@@ -19,6 +46,9 @@ class MarketDataProvider:
         """
         Fetches the latest daily data for a symbol.
         """
+        return self._cached("current_price", (symbol,), lambda: self._fetch_current_price(symbol))
+
+    def _fetch_current_price(self, symbol: str) -> Optional[Dict[str, Any]]:
         yf_symbol = self._normalize_symbol(symbol)
         try:
             ticker = yf.Ticker(yf_symbol)
@@ -44,6 +74,13 @@ class MarketDataProvider:
         """
         Fetches historical data.
         """
+        return self._cached(
+            "history", (symbol, period, str(start), str(end)),
+            lambda: self._fetch_history(symbol, period, start, end),
+            ttl=self._history_ttl(end) if start and end else None
+        )
+
+    def _fetch_history(self, symbol: str, period: str, start: date, end: date) -> pd.DataFrame:
         yf_symbol = self._normalize_symbol(symbol)
         try:
             ticker = yf.Ticker(yf_symbol)
@@ -56,18 +93,86 @@ class MarketDataProvider:
             logger.error(f"Error fetching history for {symbol}: {e}")
             return pd.DataFrame() # Return empty DF on error
 
+    def get_history_many(self, symbols: List[str], period: str = "1y", start: date = None, end: date = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetches historical data for several symbols with a single multi-ticker request.
+        The wide result is split back into one frame per symbol (same shape as get_history).
+        """
+        if not symbols:
+            return {}
+
+        return self._cached(
+            "history_many", (tuple(sorted(symbols)), period, str(start), str(end)),
+            lambda: self._fetch_history_many(symbols, period, start, end),
+            ttl=self._history_ttl(end) if start and end else None
+        )
+
+    def _fetch_history_many(self, symbols: List[str], period: str, start: date, end: date) -> Dict[str, pd.DataFrame]:
+        yf_symbols = {self._normalize_symbol(s): s for s in symbols}
+        try:
+            if start and end:
+                wide = yf.download(list(yf_symbols), start=start, end=end, group_by="ticker",
+                                   auto_adjust=True, actions=False, progress=False, threads=True)
+            else:
+                wide = yf.download(list(yf_symbols), period=period, group_by="ticker",
+                                   auto_adjust=True, actions=False, progress=False, threads=True)
+        except Exception as e:
+            logger.error(f"Error fetching batch history for {len(symbols)} symbols: {e}")
+            return {s: pd.DataFrame() for s in symbols}
+
+        return self._split_wide_frame(wide, yf_symbols)
+
+    @staticmethod
+    def _split_wide_frame(wide: pd.DataFrame, yf_symbols: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+        """
+        Splits a (ticker, field) column frame into per-symbol OHLCV frames.
+        Rows where a symbol has no data (e.g. listed later) are dropped.
+        """
+        frames = {}
+        for yf_symbol, symbol in yf_symbols.items():
+            if wide.empty:
+                frames[symbol] = pd.DataFrame()
+                continue
+
+            if isinstance(wide.columns, pd.MultiIndex):
+                if yf_symbol not in wide.columns.get_level_values(0):
+                    frames[symbol] = pd.DataFrame()
+                    continue
+                frame = wide[yf_symbol]
+            else:
+                # Single ticker downloads may come back without the ticker level
+                frame = wide
+
+            frame = frame.dropna(how="all")
+            frame.columns.name = None
+            frames[symbol] = frame
+        return frames
+
     def get_first_trade_date(self, symbol: str) -> Optional[date]:
         """
         Finds the first available trade date.
         """
+        return self._cached("first_trade_date", (symbol,), lambda: self._fetch_first_trade_date(symbol))
+
+    def _fetch_first_trade_date(self, symbol: str) -> Optional[date]:
         yf_symbol = self._normalize_symbol(symbol)
         try:
             ticker = yf.Ticker(yf_symbol)
+
+            # The chart metadata carries the listing date; a short request is enough to get it
+            hist = ticker.history(period="5d")
+            first_trade = (ticker.history_metadata or {}).get("firstTradeDate")
+            if first_trade:
+                return datetime.fromtimestamp(first_trade, bist_calendar.TIMEZONE).date()
+
+            if hist.empty:
+                return None
+
+            # Metadata missing: fall back to the full history
             hist = ticker.history(period="max")
-            
             if hist.empty:
                 return None
-            
+
             return hist.index[0].date()
         except Exception:
             return None
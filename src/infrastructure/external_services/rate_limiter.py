@@ -0,0 +1,26 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces outgoing requests to at most
+    `rate` calls per second across all worker threads.
+    """
+    def __init__(self, rate: float):
+        self.min_interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """Blocks until the caller is allowed to issue the next request."""
+        if self.min_interval == 0.0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,84 @@
+import os
+from datetime import date
+from typing import Optional, Dict, Any, List
+import pandas as pd
+from src.infrastructure.external_services.market_data_provider import MarketDataProvider
+
+
+class RecordedMarketDataProvider(MarketDataProvider):
+    """
+    Offline stand-in for MarketDataProvider that replays recorded responses.
+    Useful for exercising batch/refresh code paths without network access.
+    Every call is counted in `calls` so batching behaviour can be verified.
+    """
+
+    PERIOD_OFFSETS = {
+        "1d": pd.DateOffset(days=1), "5d": pd.DateOffset(days=5),
+        "1mo": pd.DateOffset(months=1), "3mo": pd.DateOffset(months=3),
+        "6mo": pd.DateOffset(months=6), "1y": pd.DateOffset(years=1),
+        "2y": pd.DateOffset(years=2), "5y": pd.DateOffset(years=5),
+        "10y": pd.DateOffset(years=10),
+    }
+
+    def __init__(self, recordings: Dict[str, pd.DataFrame]):
+        # {symbol: DataFrame indexed by date with Open/High/Low/Close/Volume}
+        self.recordings = {s: df.sort_index() for s, df in recordings.items()}
+        self.calls = []
+
+    @classmethod
+    def from_directory(cls, path: str) -> "RecordedMarketDataProvider":
+        """Loads recordings saved with `save_recordings` ({symbol}.parquet files)."""
+        recordings = {}
+        for file_name in os.listdir(path):
+            if file_name.endswith(".parquet"):
+                recordings[file_name[:-len(".parquet")]] = pd.read_parquet(os.path.join(path, file_name))
+        return cls(recordings)
+
+    @staticmethod
+    def save_recordings(frames: Dict[str, pd.DataFrame], path: str) -> None:
+        """Stores responses from a live provider so they can be replayed later."""
+        os.makedirs(path, exist_ok=True)
+        for symbol, df in frames.items():
+            df.to_parquet(os.path.join(path, f"{symbol}.parquet"))
+
+    def _slice(self, symbol: str, period: str, start: date, end: date) -> pd.DataFrame:
+        df = self.recordings.get(symbol)
+        if df is None or df.empty:
+            return pd.DataFrame()
+
+        if start and end:
+            return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+        if period == "max" or period not in self.PERIOD_OFFSETS:
+            return df
+        return df[df.index > df.index[-1] - self.PERIOD_OFFSETS[period]]
+
+    def get_current_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        self.calls.append(("get_current_price", [symbol]))
+        hist = self._slice(symbol, "1d", None, None)
+        if hist.empty:
+            return None
+
+        latest = hist.iloc[-1]
+        return {
+            "date": latest.name.date(),
+            "open": float(latest["Open"]),
+            "high": float(latest["High"]),
+            "low": float(latest["Low"]),
+            "close": float(latest["Close"]),
+            "volume": int(latest["Volume"])
+        }
+
+    def get_history(self, symbol: str, period: str = "1y", start: date = None, end: date = None) -> pd.DataFrame:
+        self.calls.append(("get_history", [symbol]))
+        return self._slice(symbol, period, start, end)
+
+    def get_history_many(self, symbols: List[str], period: str = "1y", start: date = None, end: date = None) -> Dict[str, pd.DataFrame]:
+        self.calls.append(("get_history_many", list(symbols)))
+        return {s: self._slice(s, period, start, end) for s in symbols}
+
+    def get_first_trade_date(self, symbol: str) -> Optional[date]:
+        self.calls.append(("get_first_trade_date", [symbol]))
+        df = self.recordings.get(symbol)
+        if df is None or df.empty:
+            return None
+        return df.index[0].date()
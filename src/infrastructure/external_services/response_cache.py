@@ -0,0 +1,175 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+import pandas as pd
+from src.core.config import settings
+from src.core.logging_setup import logger
+
+
+class ResponseCache:
+    """
+    Persistent (SQLite) cache for market data provider responses.
+
+    - Per-endpoint TTLs (seconds)
+    - Single-flight: identical concurrent requests wait for the first one
+      instead of all hitting the network
+    - Hit / miss counters per endpoint
+
+    Empty or failed responses (None / empty DataFrame) are kept only for the
+    short "negative" TTL so unknown symbols are not re-requested on every rerun
+    while transient errors still recover quickly.
+    """
+    DEFAULT_TTLS = {
+        "current_price": 60,
+        "history": 600,
+        "history_closed": 7 * 24 * 3600,  # Ranges that end in the past do not change
+        "history_many": 600,
+        "first_trade_date": 30 * 24 * 3600,
+        "negative": 60,
+    }
+
+    def __init__(self, path: str = None, ttls: Dict[str, int] = None):
+        self.path = path or settings.MARKET_CACHE_PATH
+        self.ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+
+        self._locks_guard = threading.Lock()
+        self._key_locks = {}  # key -> [lock, holders + waiters]; dropped when unused
+        self._stats_lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT, value BLOB, expires_at REAL)"
+            )
+
+    def get_or_fetch(self, endpoint: str, key_parts: tuple, fetch_fn: Callable[[], Any],
+                     ttl: int = None) -> Any:
+        """
+        Returns the cached response for (endpoint, key_parts) or calls fetch_fn once,
+        even when several threads ask for the same key at the same time.
+        `ttl` overrides the endpoint's default TTL for this entry.
+        """
+        key = self._make_key(endpoint, key_parts)
+
+        found, value = self._get(key)
+        if found:
+            self._count(endpoint, "hits")
+            return value
+
+        with self._key_lock(key):
+            # Another thread may have filled the entry while we were waiting
+            found, value = self._get(key)
+            if found:
+                self._count(endpoint, "hits")
+                return value
+
+            self._count(endpoint, "misses")
+            value = fetch_fn()
+            if self._is_empty(value):
+                ttl = self.ttls["negative"]
+            elif ttl is None:
+                ttl = self.ttls.get(endpoint, self.ttls["history"])
+            self._set(key, endpoint, value, ttl)
+            return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per endpoint plus the overall hit rate."""
+        with self._stats_lock:
+            per_endpoint = {k: dict(v) for k, v in self._stats.items()}
+
+        hits = sum(v["hits"] for v in per_endpoint.values())
+        misses = sum(v["misses"] for v in per_endpoint.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "endpoints": per_endpoint
+        }
+
+    def clear(self, endpoint: str = None) -> None:
+        with self._connect() as conn:
+            if endpoint:
+                conn.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            else:
+                conn.execute("DELETE FROM responses")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per operation keeps the cache thread-safe
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _get(self, key: str):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return False, None
+
+        try:
+            return True, pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry: {e}")
+            return False, None
+
+    def _set(self, key: str, endpoint: str, value: Any, ttl: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, endpoint, pickle.dumps(value), time.time() + ttl)
+            )
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        """Holds the per-key lock; the entry is removed once no thread holds or waits for it."""
+        with self._locks_guard:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def _count(self, endpoint: str, field: str) -> None:
+        with self._stats_lock:
+            self._stats[endpoint][field] += 1
+
+    @staticmethod
+    def _make_key(endpoint: str, key_parts: tuple) -> str:
+        return hashlib.sha1(f"{endpoint}:{key_parts!r}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _is_empty(value: Any) -> bool:
+        if value is None:
+            return True
+        if isinstance(value, pd.DataFrame):
+            return value.empty
+        if isinstance(value, dict) and all(isinstance(v, pd.DataFrame) for v in value.values()):
+            return all(v.empty for v in value.values())
+        return False
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ResponseCache:
+    """Process-wide cache shared by every MarketDataProvider (so single-flight spans them all)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -782,7 +782,11 @@ class ConsoleMenu:
             elif choice == '4': self.ai_analysis_menu()
             elif choice == '5':
                  print("Güncelleniyor...")
-                 self.market_service.update_all_tickers()
+                 summary = self.market_service.update_all_tickers()
+                 print(f"\n{summary['symbols']} hisse ({summary['skipped']} zaten güncel), {summary['requests']} istek, toplam {summary['elapsed']:.2f} sn")
+                 if summary['slowest']:
+                     slowest = summary['latency'][summary['slowest']]
+                     print(f"En yavaş: {summary['slowest']} (indirme {slowest['fetch']:.2f} sn)")
                  input("Bitti. Menüye dönmek için Enter...")
             elif choice == '6': self.visualization_menu()
             elif choice == '7': self.optimization_menu() 
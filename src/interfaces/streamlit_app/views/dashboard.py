@@ -8,8 +8,8 @@ def render_dashboard(services, user):
     # 1. Update Market Data Button
     if st.button("🔄 Piyasa Verilerini Güncelle"):
         with st.spinner("Piyasa verileri güncelleniyor..."):
-            services['market'].update_all_tickers()
-        st.success("Veriler güncellendi!")
+            summary = services['market'].update_all_tickers()
+        st.success(f"Veriler güncellendi! ({summary['symbols']} hisse, {summary['elapsed']:.1f} sn)")
         st.rerun()
 
     # 2. Get Data
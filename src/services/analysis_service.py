@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from src.infrastructure.database.models import AiPrediction, Security
 from src.ai_core.engine import AIEngine
+from src.ai_core.model_registry import ModelNotFoundError
 from src.services.risk_manager import RiskManager 
 from src.infrastructure.database.models import User
 from datetime import date, timedelta
@@ -17,12 +18,12 @@ class AnalysisService:
         try:
             print(f"🚀 Analiz Başlatılıyor: {symbol}...")
             
-            # 1. AI Motorunu Çalıştır (Dosya sisteminden okur, DB'den bağımsızdır)
-            # Eğer CSV yoksa burada hata fırlatır ve catch bloğuna düşer.
+            # 1. AI Motorunu Çalıştır (Fiyatları price_history'den, yoksa yerel depodan okur)
+            # Veri hiç bulunamazsa burada hata fırlatır ve catch bloğuna düşer.
             try:
-                # Önce tahmin etmeyi dene, model yoksa eğitir
+                # Önce kayıtlı modelle tahmin etmeyi dene, model yoksa eğitir
                 result = self.engine.predict_next_day(symbol)
-            except:
+            except ModelNotFoundError:
                 self.engine.train_full_pipeline(symbol)
                 result = self.engine.predict_next_day(symbol)
             
@@ -2,7 +2,8 @@ import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
 from sqlalchemy.orm import Session
-from src.infrastructure.database.models import PortfolioHolding, PriceHistory, Security
+from src.infrastructure.database.models import PortfolioHolding, LatestQuote
+from src.infrastructure.database.price_repository import PriceRepository
 
 class PortfolioOptimizer:
     """
@@ -11,6 +12,7 @@ class PortfolioOptimizer:
     """
     def __init__(self, db: Session):
         self.db = db
+        self.prices = PriceRepository(db)
         self.risk_free_rate = 0.30  # Türkiye için temsili risksiz faiz oranı (%30)
 
     def optimize_portfolio(self, user_id):
@@ -116,35 +118,21 @@ class PortfolioOptimizer:
         }
 
     def _get_historical_data(self, symbols, days):
-        """Veritabanından toplu fiyat verisi çeker ve DataFrame yapar."""
-        data = {}
-        for sym in symbols:
-            sec = self.db.query(Security).filter(Security.symbol == sym).first()
-            history = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == sec.id
-            ).order_by(PriceHistory.date.desc()).limit(days).all()
-            
-            if not history: continue
-            
-            # Tarih ve Fiyat (Eskiden yeniye)
-            dates = [h.date for h in history][::-1]
-            prices = [float(h.close_price) for h in history][::-1]
-            data[sym] = pd.Series(data=prices, index=pd.to_datetime(dates))
-            
-        df = pd.DataFrame(data)
-        df.sort_index(inplace=True)
+        """Veritabanından toplu fiyat verisi çeker ve DataFrame yapar (Tek sorgu)."""
+        df = self.prices.get_close_matrix(symbols, last_n=days)
         return df.dropna()
 
     def _calculate_current_weights(self, holdings):
         """Mevcut portföyün ağırlıklarını hesaplar."""
         vals = []
         # En son fiyatları çekmek lazım ama hız için maliyetten değil, 
-        # en son kaydedilen fiyattan hesaplayalım.
+        # en son kaydedilen fiyattan hesaplayalım (latest_quotes üzerinden tek sorgu).
+        last_closes = dict(self.db.query(LatestQuote.security_id, LatestQuote.last_close).filter(
+            LatestQuote.security_id.in_([h.security_id for h in holdings])
+        ).all())
         for h in holdings:
-            last_price = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            p = float(last_price.close_price) if last_price else float(h.avg_cost)
+            last_close = last_closes.get(h.security_id)
+            p = float(last_close) if last_close is not None else float(h.avg_cost)
             vals.append(float(h.quantity) * p)
             
         total = sum(vals)
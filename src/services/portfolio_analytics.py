@@ -1,8 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, desc, and_
 from datetime import datetime, timedelta
 import pandas as pd
-from src.infrastructure.database.models import PortfolioHolding, Transaction, PriceHistory, Security
+from src.infrastructure.database.models import PortfolioHolding, Transaction, PriceHistory, Security, LatestQuote
 
 class PortfolioAnalyticsService:
     """
@@ -14,7 +14,9 @@ class PortfolioAnalyticsService:
 
     def generate_dashboard(self, user_id):
         # 1. Portföy verilerini çek
-        holdings = self.db.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).all()
+        # Güncel fiyatlar latest_quotes tablosundan tek join ile gelir
+        # (MarketService her güncellemede bu tabloyu tazeler)
+        holdings = self._query_holdings_with_quotes(user_id)
         if not holdings:
             return {"error": "Portföy boş."}
 
@@ -23,14 +25,8 @@ class PortfolioAnalyticsService:
         positions = []
 
         # 2. Her hisse için hesaplama yap
-        for h in holdings:
-            # Güncel fiyatı al (MarketDataService üzerinden güncellenmiş olmalı)
-            # En son fiyatı bulmak için PriceHistory'e bakıyoruz
-            last_price_row = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            
-            current_price = float(last_price_row.close_price) if last_price_row else float(h.avg_cost)
+        for h, last_close in holdings:
+            current_price = float(last_close) if last_close is not None else float(h.avg_cost)
             
             qty = float(h.quantity)
             avg_cost = float(h.avg_cost)
@@ -76,15 +72,9 @@ class PortfolioAnalyticsService:
 
     def _get_active_holdings(self, user_id):
         """Aktif portföyü ve güncel fiyatları çeker."""
-        holdings = self.db.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).all()
         data = []
-        for h in holdings:
-            # En güncel fiyatı al
-            last_price_row = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            
-            current_price = float(last_price_row.close_price) if last_price_row else float(h.avg_cost)
+        for h, last_close in self._query_holdings_with_quotes(user_id):
+            current_price = float(last_close) if last_close is not None else float(h.avg_cost)
             
             data.append({
                 "security_id": h.security_id,
@@ -96,6 +86,14 @@ class PortfolioAnalyticsService:
             })
         return data
 
+    def _query_holdings_with_quotes(self, user_id):
+        """Portföy satırlarını son kapanış fiyatı ve sembolle birlikte tek sorguda çeker."""
+        return self.db.query(PortfolioHolding, LatestQuote.last_close).outerjoin(
+            LatestQuote, LatestQuote.security_id == PortfolioHolding.security_id
+        ).options(
+            joinedload(PortfolioHolding.security)
+        ).filter(PortfolioHolding.user_id == user_id).all()
+
     def _get_historical_price(self, security_id, days_ago):
         """Belirtilen gün kadar önceki kapanış fiyatını (veya en yakın tarihi) bulur."""
         target_date = datetime.now().date() - timedelta(days=days_ago)
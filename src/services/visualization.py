@@ -2,8 +2,9 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import os
-from sqlalchemy.orm import Session
-from src.infrastructure.database.models import PortfolioHolding, PriceHistory, Security
+from sqlalchemy.orm import Session, joinedload
+from src.infrastructure.database.models import PortfolioHolding, LatestQuote
+from src.infrastructure.database.price_repository import PriceRepository
 
 class PortfolioVisualizationService:
     """
@@ -12,6 +13,7 @@ class PortfolioVisualizationService:
     """
     def __init__(self, db: Session):
         self.db = db
+        self.prices = PriceRepository(db)
         # Profesyonel görünüm ayarları
         plt.style.use('seaborn-v0_8-darkgrid')
         self.save_dir = "reports/graphs"
@@ -19,15 +21,15 @@ class PortfolioVisualizationService:
 
     def _get_portfolio_data(self, user_id):
         """Portföydeki hisseleri ve ağırlıklarını çeker."""
-        holdings = self.db.query(PortfolioHolding).filter(PortfolioHolding.user_id == user_id).all()
+        # Güncel fiyatlar latest_quotes tablosundan tek join ile gelir
+        holdings = self.db.query(PortfolioHolding, LatestQuote.last_close).outerjoin(
+            LatestQuote, LatestQuote.security_id == PortfolioHolding.security_id
+        ).options(
+            joinedload(PortfolioHolding.security)
+        ).filter(PortfolioHolding.user_id == user_id).all()
         data = []
-        for h in holdings:
-            # Güncel fiyat
-            last_price = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == h.security_id
-            ).order_by(PriceHistory.date.desc()).first()
-            
-            price = float(last_price.close_price) if last_price else float(h.avg_cost)
+        for h, last_close in holdings:
+            price = float(last_close) if last_close is not None else float(h.avg_cost)
             market_val = float(h.quantity) * price
             cost_val = float(h.quantity) * float(h.avg_cost)
             
@@ -42,27 +44,9 @@ class PortfolioVisualizationService:
         return pd.DataFrame(data)
 
     def _get_price_history_df(self, symbols, days=365):
-        """Birden fazla hissenin fiyat geçmişini DataFrame olarak döner (Pivot table)."""
-        data = {}
-        for sym in symbols:
-            sec = self.db.query(Security).filter(Security.symbol == sym).first()
-            if not sec: continue
-            
-            history = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == sec.id
-            ).order_by(PriceHistory.date.desc()).limit(days).all()
-            
-            # Tarihleri ve kapanışları al
-            dates = [h.date for h in history]
-            prices = [float(h.close_price) for h in history]
-            
-            # Series oluştur
-            s = pd.Series(data=prices, index=pd.to_datetime(dates))
-            data[sym] = s
-            
-        df = pd.DataFrame(data)
-        df.sort_index(inplace=True) # Eskiden yeniye
-        return df
+        """Birden fazla hissenin fiyat geçmişini DataFrame olarak döner (Pivot table, tek sorgu)."""
+        # Eskiden yeniye sıralı, sütunlar semboller
+        return self.prices.get_close_matrix(symbols, last_n=days)
 
     def save_plot(self, fig, filename):
         """Grafiği diske kaydeder."""
@@ -163,14 +147,13 @@ class PortfolioVisualizationService:
         fig, axes = plt.subplots(rows, cols, figsize=(15, 5 * rows))
         axes = axes.flatten() # Tek boyutlu diziye çevir
         
+        # Tüm hisselerin fiyatları tek sorguda
+        df_prices = self._get_price_history_df(symbols, days)
+        
         for i, sym in enumerate(symbols):
-            sec = self.db.query(Security).filter(Security.symbol == sym).first()
-            history = self.db.query(PriceHistory).filter(
-                PriceHistory.security_id == sec.id
-            ).order_by(PriceHistory.date.desc()).limit(days).all()
-            
-            dates = [h.date for h in history][::-1] # Eskiden yeniye
-            prices = [float(h.close_price) for h in history][::-1]
+            series = df_prices[sym].dropna() if sym in df_prices.columns else pd.Series(dtype="float64")
+            dates = series.index # Eskiden yeniye
+            prices = series.values
             
             ax = axes[i]
             ax.plot(dates, prices, color='#3498db', linewidth=2)
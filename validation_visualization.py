@@ -9,10 +9,13 @@ from sklearn.metrics import mean_squared_error, mean_absolute_percentage_error,
 from datetime import timedelta
 
 # Proje modülleri
-from src.data.database import get_db
-from src.data.models import Security, PriceHistory
+from src.infrastructure.database.connection import get_db
+from src.infrastructure.database.models import Security
+from src.infrastructure.database.price_repository import PriceRepository
 from src.ai_core.ai_models.machine_learning import XGBoostModel
-from src.ai_core.feature_engineering import FeatureEngineer
+from src.ai_core.feature_engineering import FeatureEngineer, feature_matrix
+from src.ai_core.feature_cache import FeatureCache
+from src.ai_core.labels import LabelGenerator
 
 # Görselleştirme Ayarları
 sns.set_style("whitegrid")
@@ -20,10 +23,13 @@ plt.rcParams["figure.figsize"] = (12, 6)
 plt.rcParams["font.size"] = 12
 
 class ValidationModule:
-    def __init__(self, symbol: str, db: Session):
+    def __init__(self, symbol: str, db: Session, horizon: int = 1):
         self.symbol = symbol.upper()
         self.db = db
         self.fe = FeatureEngineer(use_lags=True)
+        self.features = FeatureCache(self.fe, cache_dir="models/feature_cache")
+        self.horizon = horizon  # Hedef: T+horizon kapanış fiyatı
+        self.labels = LabelGenerator(horizons=[horizon])
         self.model = XGBoostModel() # Validasyon için XGBoost kullanacağız (Hibrit simülasyonu aşağıda)
         self.output_dir = f"reports/validation_{self.symbol}"
         os.makedirs(self.output_dir, exist_ok=True)
@@ -35,35 +41,25 @@ class ValidationModule:
         if not security:
             raise ValueError(f"{self.symbol} veritabanında bulunamadı!")
 
-        prices = self.db.query(PriceHistory).filter(
-            PriceHistory.security_id == security.id
-        ).order_by(PriceHistory.date.asc()).all()
+        # Tek sorgu, ORM nesnesi oluşturmadan
+        df = PriceRepository(self.db).get_ohlcv(self.symbol)
 
-        if not prices:
+        if df.empty:
             raise ValueError(f"{self.symbol} için fiyat geçmişi bulunamadı!")
 
-        data = []
-        for p in prices:
-            data.append({
-                "Date": pd.to_datetime(p.date),
-                "Open": float(p.open_price) if p.open_price else 0,
-                "High": float(p.high_price) if p.high_price else 0,
-                "Low": float(p.low_price) if p.low_price else 0,
-                "Close": float(p.close_price),
-                "Volume": int(p.volume) if p.volume else 0
-            })
-        
-        df = pd.DataFrame(data).set_index("Date")
-        return df
+        # Eksik OHLV değerleri 0 kabul edilir
+        df[["Open", "High", "Low", "Volume"]] = df[["Open", "High", "Low", "Volume"]].fillna(0)
+        return df.set_index("Date")
 
     def prepare_data(self, df):
         """Öznitelik mühendisliği ve Train/Test ayrımı (Bölüm 6.1)."""
         # Feature Engineering uygula
-        df_features = self.fe.create_features(df.copy())
+        df_features = self.features.get_features(self.symbol, df)
         
         # Hedef değişkeni oluştur (Yarınki fiyat)
-        # Tezinizde belirtilen yapı: Y_t = P_{t+1}
-        df_features["Target"] = df_features["Close"].shift(-1)
+        # Tezinizde belirtilen yapı: Y_t = P_{t+1} (horizon > 1 ise P_{t+h})
+        labels = self.labels.generate(df)
+        df_features["Target"] = labels[f"target_price_{self.horizon}"]
         df_features.dropna(inplace=True)
 
         # Kronolojik Ayrım (%80 Train, %20 Test) - Walk-Forward Validation
@@ -72,10 +68,16 @@ class ValidationModule:
         train_df = df_features.iloc[:split_idx]
         test_df = df_features.iloc[split_idx:]
         
-        X_train = train_df.drop(columns=["Target", "Close"]) # Close anlık fiyattır, Target gelecektir
+        # Close anlık fiyattır, Target gelecektir
+        self.feature_cols = [col for col in df_features.columns if col not in ("Target", "Close")]
+        if self.model.compact:
+            # Kompakt mod: ara DataFrame kopyası yerine doğrudan float32 matrisler
+            X_train = feature_matrix(train_df, self.feature_cols)
+            X_test = feature_matrix(test_df, self.feature_cols)
+        else:
+            X_train = train_df.drop(columns=["Target", "Close"])
+            X_test = test_df.drop(columns=["Target", "Close"])
         y_train = train_df["Target"]
-        
-        X_test = test_df.drop(columns=["Target", "Close"])
         y_test = test_df["Target"]
         
         # Tarihleri saklayalım (Grafik için)
@@ -145,12 +147,16 @@ class ValidationModule:
         # Explainer oluştur
         explainer = shap.TreeExplainer(self.model.model)
         # Eğitim setinden örneklem al (Hız için)
-        X_sample = X_train.sample(n=min(500, len(X_train)), random_state=42)
+        if isinstance(X_train, pd.DataFrame):
+            X_sample = X_train.sample(n=min(500, len(X_train)), random_state=42)
+        else:
+            rows = np.random.default_rng(42).choice(len(X_train), size=min(500, len(X_train)), replace=False)
+            X_sample = X_train[np.sort(rows)]
         shap_values = explainer.shap_values(X_sample)
         
         # Summary Plot
         plt.figure()
-        shap.summary_plot(shap_values, X_sample, show=False)
+        shap.summary_plot(shap_values, X_sample, feature_names=self.feature_cols, show=False)
         plt.title(f"{self.symbol} - SHAP Özellik Önem Düzeyleri", fontsize=14)
         plt.tight_layout()
         plt.savefig(f"{self.output_dir}/{self.symbol}_shap_summary.png")